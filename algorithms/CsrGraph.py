@@ -0,0 +1,65 @@
+from array import array
+from itertools import chain
+from typing import Union
+
+from models.CompactGraph import CompactGraph
+from models.Graph import Graph
+
+
+class CsrGraph:
+    # Read-only adjacency over dense integer node ids in compressed sparse row
+    # form, built once per graph version for the algorithms in this package.
+    # Row i of offsets/targets/weights lists the edges leaving node i, sorted
+    # by target; in_offsets/in_sources/in_weights list the edges entering it.
+    # An undirected edge appears in the rows of both of its ends (a self-loop
+    # once), so both row sets are the same arrays.
+    def __init__(self, names: list[str], offsets: array, targets: array, weights: array,
+                 in_offsets: array, in_sources: array, in_weights: array,
+                 is_directed: bool, is_weighted: bool, version: int):
+        self.names = names
+        self.index = {name: position for position, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.in_offsets = in_offsets
+        self.in_sources = in_sources
+        self.in_weights = in_weights
+        self.is_directed = is_directed
+        self.is_weighted = is_weighted
+        self.version = version
+        self.min_weight = min(weights) if weights else 0
+
+    def number_of_nodes(self) -> int:
+        return len(self.names)
+
+    def number_of_edges(self) -> int:
+        return len(self.targets)
+
+    def out_degree(self, node: int) -> int:
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def neighbors(self, node: int) -> array:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    @staticmethod
+    def from_graph(graph: Union[Graph, CompactGraph]) -> "CsrGraph":
+        if graph.is_compact and graph.is_directed and not graph.pending_changes and not graph.free_indices \
+                and len(graph.offsets) == len(graph.index_to_name) + 1:
+            # A freshly compacted graph already holds these columns, and they
+            # are never written in place, so they are shared rather than copied
+            return CsrGraph(list(graph.index_to_name), graph.offsets, graph.targets, graph.weights,
+                            graph.in_offsets, graph.in_sources, graph.in_weights,
+                            graph.is_directed, graph.is_weighted, graph.version)
+        names, sources, destinations, weights = graph.export_arrays()
+        size = len(names)
+        if graph.is_directed:
+            out_columns = CompactGraph.build_columns(size, False, lambda: zip(sources, destinations, weights))
+            in_columns = CompactGraph.build_columns(size, True, lambda: zip(sources, destinations, weights))
+        else:
+            def both_directions():
+                return chain(zip(sources, destinations, weights),
+                             ((destination, source, weight)
+                              for source, destination, weight in zip(sources, destinations, weights)
+                              if source != destination))
+            out_columns = in_columns = CompactGraph.build_columns(size, False, both_directions)
+        return CsrGraph(names, *out_columns, *in_columns, graph.is_directed, graph.is_weighted, graph.version)
@@ -0,0 +1,105 @@
+from array import array
+from typing import Callable, Optional
+
+from algorithms.CsrGraph import CsrGraph
+from algorithms.shortest_path import UNREACHABLE, distances_from
+
+# Landmarks consulted per query; the ones giving the best bound at the source
+ACTIVE_LANDMARKS = 4
+
+
+class LandmarkIndex:
+    # Distance tables for ALT (A*, landmarks, triangle inequality) searches.
+    # For each landmark L, from_landmarks holds d(L, v) and to_landmarks holds
+    # d(v, L) for every node id v; an undirected graph shares one table for
+    # both. By the triangle inequality d(v, t) >= d(L, t) - d(L, v) and
+    # d(v, t) >= d(v, L) - d(t, L), which gives A* a lower bound on the
+    # distance left to the target. The tables are only valid for the graph
+    # version they were built from.
+    def __init__(self, names: list[str], landmarks: list[int], from_landmarks: list[array],
+                 to_landmarks: list[array], is_directed: bool, version: int):
+        self.names = names
+        self.landmarks = landmarks
+        self.from_landmarks = from_landmarks
+        self.to_landmarks = to_landmarks
+        self.is_directed = is_directed
+        self.version = version
+
+    def number_of_nodes(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def build(graph: CsrGraph, count: int) -> "LandmarkIndex":
+        # Landmarks are chosen farthest first: the highest-degree node, then
+        # each time the node farthest from every landmark so far. Nodes no
+        # landmark reaches count as farthest, so other components get one.
+        size = graph.number_of_nodes()
+        closest = array("q", [UNREACHABLE]) * size
+        landmarks, from_landmarks, to_landmarks = [], [], []
+        for _ in range(min(count, size)):
+            if landmarks:
+                landmark = max(range(size), key=closest.__getitem__)
+                if closest[landmark] == 0:
+                    break
+            else:
+                landmark = max(range(size), key=graph.out_degree)
+            from_landmark = distances_from(graph, landmark)
+            to_landmark = distances_from(graph, landmark, reverse=True) if graph.is_directed else from_landmark
+            closest = array("q", map(min, closest, from_landmark, to_landmark))
+            landmarks.append(landmark)
+            from_landmarks.append(from_landmark)
+            to_landmarks.append(to_landmark)
+        return LandmarkIndex(graph.names, landmarks, from_landmarks, to_landmarks,
+                             graph.is_directed, graph.version)
+
+    def for_graph(self, graph: CsrGraph) -> Optional["LandmarkIndex"]:
+        # The index, with tables ordered by the graph's node ids, or None if it
+        # was built for a different version of the graph
+        if self.version != graph.version or len(self.names) != graph.number_of_nodes():
+            return None
+        if self.names is graph.names:
+            return self
+        if self.names == graph.names:
+            self.names = graph.names
+            return self
+        positions = [graph.index.get(name) for name in self.names]
+        if None in positions:
+            return None
+        order = array("i", [0]) * len(positions)
+        for node, position in enumerate(positions):
+            order[position] = node
+
+        def reorder(tables: list[array]) -> list[array]:
+            return [array("q", map(table.__getitem__, order)) for table in tables]
+
+        from_landmarks = reorder(self.from_landmarks)
+        to_landmarks = reorder(self.to_landmarks) if self.is_directed else from_landmarks
+        return LandmarkIndex(graph.names, [positions[landmark] for landmark in self.landmarks],
+                             from_landmarks, to_landmarks, self.is_directed, self.version)
+
+    def estimator(self, source: int, target: int, active: int = ACTIVE_LANDMARKS) -> Callable[[int], int]:
+        # A lower bound on d(node, target) using the landmarks that bound
+        # d(source, target) best. It is UNREACHABLE when a landmark proves the
+        # node cannot reach the target at all.
+        tables = [(from_landmark, to_landmark, from_landmark[target], to_landmark[target])
+                  for from_landmark, to_landmark in zip(self.from_landmarks, self.to_landmarks)]
+
+        def bound(table: tuple) -> int:
+            from_landmark, to_landmark, from_target, to_target = table
+            return max(from_target - from_landmark[source], to_landmark[source] - to_target)
+
+        tables = sorted(tables, key=bound, reverse=True)[:active]
+        ceiling = UNREACHABLE // 2
+
+        def estimate(node: int) -> int:
+            best = 0
+            for from_landmark, to_landmark, from_target, to_target in tables:
+                remaining = from_target - from_landmark[node]
+                if remaining > best:
+                    best = remaining
+                remaining = to_landmark[node] - to_target
+                if remaining > best:
+                    best = remaining
+            return best if best < ceiling else UNREACHABLE
+
+        return estimate
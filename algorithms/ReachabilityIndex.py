@@ -0,0 +1,203 @@
+from array import array
+from typing import Optional
+
+from algorithms.CsrGraph import CsrGraph
+
+# Memory the transitive closure bitsets may take before the index falls back
+# to interval labels and search
+CLOSURE_MEMORY_LIMIT = 64 << 20
+# Interval labelings kept for condensations searched instead
+LABELINGS = 4
+
+
+class ReachabilityIndex:
+    # Reachability over the condensation of a directed graph. Nodes in one
+    # strongly connected component reach each other, and components are
+    # numbered in reverse topological order, so an edge between components
+    # always goes from a higher number to a lower one and a component never
+    # reaches a higher-numbered one. The transitive closure is kept as one
+    # integer bitset per component when it fits in CLOSURE_MEMORY_LIMIT; a
+    # bitset is only as long as the highest component it reaches, so sparse
+    # dependency graphs stay small. Otherwise components are searched,
+    # pruned by that order and by interval labels (GRAIL): for each of a few
+    # DFS orders, post[c]
+    # is c's finishing number and low[c] the smallest one c reaches, so
+    # c reaches d only if low[c] <= low[d] and post[d] <= post[c]. The first
+    # DFS also proves reachability when d finished inside c's DFS subtree,
+    # which started when the finishing counter was start[c].
+    def __init__(self, component: array, count: int, offsets: array, targets: array,
+                 closure: Optional[list[int]], version: int):
+        self.component = component
+        self.count = count
+        self.offsets = offsets
+        self.targets = targets
+        self.closure = closure
+        self.version = version
+        self.labels: list[tuple[array, array]] = []
+        self.start = array("i")
+        if closure is None:
+            for salt in range(LABELINGS):
+                post, low, start = self._label(salt)
+                self.labels.append((post, low))
+                if not salt:
+                    self.start = start
+
+    @staticmethod
+    def build(graph: CsrGraph) -> "ReachabilityIndex":
+        component, count = strongly_connected_components(graph)
+        successors: list[set[int]] = [set() for _ in range(count)]
+        offsets, targets = graph.offsets, graph.targets
+        for node in range(graph.number_of_nodes()):
+            source = component[node]
+            for position in range(offsets[node], offsets[node + 1]):
+                destination = component[targets[position]]
+                if destination != source:
+                    successors[source].add(destination)
+        condensed_offsets = array("q", [0]) * (count + 1)
+        condensed_targets = array("i")
+        for source, destinations in enumerate(successors):
+            condensed_targets.extend(sorted(destinations))
+            condensed_offsets[source + 1] = len(condensed_targets)
+        # Successors are numbered lower, so their closures are done first
+        closure = []
+        size = 0
+        for destinations in successors:
+            bits = 0
+            for destination in destinations:
+                bits |= closure[destination] | 1 << destination
+            closure.append(bits)
+            size += bits.bit_length() >> 3
+            if size > CLOSURE_MEMORY_LIMIT:
+                closure = None
+                break
+        return ReachabilityIndex(component, count, condensed_offsets, condensed_targets, closure, graph.version)
+
+    def reachable(self, source: int, target: int) -> bool:
+        source, target = self.component[source], self.component[target]
+        if source == target:
+            return True
+        if source < target:
+            return False
+        if self.closure is not None:
+            return bool(self.closure[source] >> target & 1)
+        if not self._may_reach(source, target):
+            return False
+        tree_post, start = self.labels[0][0], self.start
+        target_post = tree_post[target]
+        if start[source] <= target_post <= tree_post[source]:
+            return True
+        # Rows are sorted, so walking them backwards leaves the successor
+        # closest to the target in topological order on top of the stack
+        offsets, targets = self.offsets, self.targets
+        seen = {source}
+        stack = [source]
+        while stack:
+            current = stack.pop()
+            for position in range(offsets[current + 1] - 1, offsets[current] - 1, -1):
+                successor = targets[position]
+                if successor == target or start[successor] <= target_post <= tree_post[successor]:
+                    return True
+                if successor > target and successor not in seen and self._may_reach(successor, target):
+                    seen.add(successor)
+                    stack.append(successor)
+        return False
+
+    def _may_reach(self, source: int, target: int) -> bool:
+        for post, low in self.labels:
+            if post[target] > post[source] or low[source] > low[target]:
+                return False
+        return True
+
+    def _label(self, salt: int) -> tuple[array, array, array]:
+        # One DFS over the condensation. Roots and successors are visited in
+        # an order that differs per salt, so the labelings prune differently.
+        count, offsets, targets = self.count, self.offsets, self.targets
+        visited = bytearray(count)
+        post = array("i", [0]) * count
+        start = array("i", [0]) * count
+        counter = 0
+        roots = range(count - 1, -1, -1) if salt % 2 == 0 else range(count)
+        for root in roots:
+            if visited[root]:
+                continue
+            visited[root] = 1
+            start[root] = counter
+            work = [(root, 0)]
+            while work:
+                node, step = work[-1]
+                first, degree = offsets[node], offsets[node + 1] - offsets[node]
+                shift = (node * 2654435761 + salt) % degree if degree else 0
+                while step < degree:
+                    successor = targets[first + (step + shift) % degree]
+                    step += 1
+                    if not visited[successor]:
+                        work[-1] = (node, step)
+                        visited[successor] = 1
+                        start[successor] = counter
+                        work.append((successor, 0))
+                        break
+                else:
+                    work.pop()
+                    post[node] = counter
+                    counter += 1
+        # Successors are numbered lower, so their low values are final first
+        low = array("i", post)
+        for node in range(count):
+            for position in range(offsets[node], offsets[node + 1]):
+                successor_low = low[targets[position]]
+                if successor_low < low[node]:
+                    low[node] = successor_low
+        return post, low, start
+
+
+def strongly_connected_components(graph: CsrGraph) -> tuple[array, int]:
+    # Iterative Tarjan. Returns each node's component number and the number
+    # of components; a component is numbered only after every component it
+    # reaches, which gives the reverse topological order.
+    size = graph.number_of_nodes()
+    offsets, targets = graph.offsets, graph.targets
+    order = array("i", [-1]) * size
+    low = array("i", [0]) * size
+    on_stack = bytearray(size)
+    component = array("i", [-1]) * size
+    stack = []
+    counter = count = 0
+    for root in range(size):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, offsets[root])]
+        while work:
+            node, position = work[-1]
+            end = offsets[node + 1]
+            while position < end:
+                neighbor = targets[position]
+                position += 1
+                if order[neighbor] == -1:
+                    work[-1] = (node, position)
+                    order[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = 1
+                    work.append((neighbor, offsets[neighbor]))
+                    break
+                if on_stack[neighbor] and order[neighbor] < low[node]:
+                    low[node] = order[neighbor]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == order[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component[member] = count
+                        if member == node:
+                            break
+                    count += 1
+    return component, count
@@ -0,0 +1,33 @@
+from typing import Union
+
+from models.CompactGraph import CompactGraph
+from models.Graph import Graph
+
+
+class SnapshotAdjacency:
+    # Adjacency of a pinned Graph or CompactGraph snapshot, read in place by
+    # node index for traversals that only touch part of the graph. Unlike a
+    # CsrGraph nothing is built up front; each row is collected and sorted
+    # when the traversal reaches it, so rows come in the same order as in
+    # the CSR view. Indices of removed nodes are never reached.
+    def __init__(self, view: Union[Graph, CompactGraph]):
+        self.index = view.nodes_to_index
+        self.names = view.index_to_name if view.is_compact else _NodeNames(view.index_to_node)
+        self.neighbors = view.neighbor_indices
+
+    def number_of_nodes(self) -> int:
+        # Index slots, free ones included
+        return len(self.names)
+
+
+class _NodeNames:
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes: list):
+        self.nodes = nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __getitem__(self, index: int) -> str:
+        return self.nodes[index].name
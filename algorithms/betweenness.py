@@ -0,0 +1,163 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappop, heappush
+from operator import add
+from random import Random
+from typing import Optional, Sequence
+
+from algorithms.CsrGraph import CsrGraph
+
+# (offsets, targets, weights or None) of the graph scored by a worker process,
+# set once per worker by the pool initializer. Forked workers share the
+# parent's arrays copy-on-write; other start methods receive one copy each.
+_shared_rows: Optional[tuple] = None
+
+
+def betweenness_centrality(graph: CsrGraph, sample: Optional[int] = None, workers: int = 1,
+                           seed: Optional[int] = None) -> tuple[array, int, int]:
+    # Brandes' algorithm: one shortest path search per source, then the
+    # dependencies are accumulated back in reverse order of distance. Scores
+    # are normalized by (n - 1)(n - 2), the number of pairs a node can be
+    # between. With a sample, only that many random sources are searched
+    # and the scores are scaled up to estimate the exact ones. Sources are
+    # split across worker processes, each returning one partial score table.
+    # Returns the scores, the number of sources searched and of workers used.
+    size = graph.number_of_nodes()
+    sources: Sequence[int] = range(size)
+    if sample is not None and sample < size:
+        sources = Random(seed).sample(sources, sample)
+    rows = (graph.offsets, graph.targets, graph.weights if graph.is_weighted else None)
+    workers = max(min(workers, len(sources)), 1)
+    if workers == 1:
+        scores = accumulate_dependencies(rows, size, sources)
+    else:
+        # Striding keeps costly and cheap sources spread over all workers
+        with ProcessPoolExecutor(max_workers=workers, initializer=_share_rows, initargs=(rows,)) as pool:
+            partials = pool.map(_accumulate_shared, [sources[worker::workers] for worker in range(workers)])
+            scores = next(partials)
+            for partial in partials:
+                scores = array("d", map(add, scores, partial))
+    if size > 2 and sources:
+        scale = 1.0 / ((size - 1) * (size - 2)) * size / len(sources)
+        for node in range(size):
+            scores[node] *= scale
+    return scores, len(sources), workers
+
+
+def _share_rows(rows: tuple):
+    global _shared_rows
+    _shared_rows = rows
+
+
+def _accumulate_shared(sources: Sequence[int]) -> array:
+    return accumulate_dependencies(_shared_rows, len(_shared_rows[0]) - 1, sources)
+
+
+def accumulate_dependencies(rows: tuple, size: int, sources: Sequence[int]) -> array:
+    # Unnormalized betweenness summed over the given sources. Shortest paths
+    # are counted forward from each source; a node's successors on them are
+    # the row entries one edge further away, so the backward pass needs only
+    # the out-rows. Weighted searches first settle distances in Dijkstra
+    # order. Zero-weight edges can join nodes at the same distance, so paths
+    # are then counted in a topological order of the shortest path edges,
+    # which needs the graph to have no zero-weight cycle. Per-source state is
+    # reset only for the nodes the search reached.
+    offsets, targets, weights = rows
+    scores = array("d", bytes(8 * size))
+    sigma = array("d", bytes(8 * size))
+    delta = array("d", bytes(8 * size))
+    distance = array("q", [-1]) * size
+    settled = bytearray(size)
+    pending = array("q", [0]) * size
+    for source in sources:
+        distance[source] = 0
+        sigma[source] = 1.0
+        order = [source]
+        if weights is None:
+            for node in order:
+                next_distance = distance[node] + 1
+                node_sigma = sigma[node]
+                for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                    if distance[neighbor] == -1:
+                        distance[neighbor] = next_distance
+                        order.append(neighbor)
+                    if distance[neighbor] == next_distance:
+                        sigma[neighbor] += node_sigma
+            for node in reversed(order):
+                next_distance = distance[node] + 1
+                dependency = 0.0
+                for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                    if distance[neighbor] == next_distance:
+                        dependency += (1.0 + delta[neighbor]) / sigma[neighbor]
+                delta[node] = sigma[node] * dependency
+        else:
+            reached = []
+            heap = [(0, source)]
+            while heap:
+                node_distance, node = heappop(heap)
+                if settled[node]:
+                    continue
+                settled[node] = 1
+                reached.append(node)
+                first, last = offsets[node], offsets[node + 1]
+                for neighbor, weight in zip(targets[first:last], weights[first:last]):
+                    candidate = node_distance + weight
+                    if distance[neighbor] == -1 or candidate < distance[neighbor]:
+                        distance[neighbor] = candidate
+                        heappush(heap, (candidate, neighbor))
+            # pending counts the shortest path edges into each node; a node
+            # joins the order once all of them were counted
+            for node in reached:
+                node_distance = distance[node]
+                first, last = offsets[node], offsets[node + 1]
+                for neighbor, weight in zip(targets[first:last], weights[first:last]):
+                    if neighbor != node and distance[neighbor] == node_distance + weight:
+                        pending[neighbor] += 1
+            for node in order:
+                node_distance, node_sigma = distance[node], sigma[node]
+                first, last = offsets[node], offsets[node + 1]
+                for neighbor, weight in zip(targets[first:last], weights[first:last]):
+                    if neighbor != node and distance[neighbor] == node_distance + weight:
+                        sigma[neighbor] += node_sigma
+                        pending[neighbor] -= 1
+                        if not pending[neighbor]:
+                            order.append(neighbor)
+            for node in reversed(order):
+                node_distance = distance[node]
+                dependency = 0.0
+                first, last = offsets[node], offsets[node + 1]
+                for neighbor, weight in zip(targets[first:last], weights[first:last]):
+                    if neighbor != node and distance[neighbor] == node_distance + weight:
+                        dependency += (1.0 + delta[neighbor]) / sigma[neighbor]
+                delta[node] = sigma[node] * dependency
+            for node in reached:
+                distance[node] = -1
+                settled[node] = pending[node] = 0
+        for node in order:
+            if node != source:
+                scores[node] += delta[node]
+            distance[node] = -1
+            sigma[node] = delta[node] = 0.0
+    return scores
+
+
+def has_zero_weight_cycle(graph: CsrGraph) -> bool:
+    # Whether edges of weight 0 form a cycle, which gives shortest paths no
+    # order to be counted in. An undirected zero-weight edge is one such
+    # cycle; self-loops are never on a shortest path and are skipped.
+    size = graph.number_of_nodes()
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    incoming = array("q", [0]) * size
+    for node in range(size):
+        for position in range(offsets[node], offsets[node + 1]):
+            if not weights[position] and targets[position] != node:
+                incoming[targets[position]] += 1
+    order = [node for node in range(size) if not incoming[node]]
+    for node in order:
+        for position in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[position]
+            if not weights[position] and neighbor != node:
+                incoming[neighbor] -= 1
+                if not incoming[neighbor]:
+                    order.append(neighbor)
+    return len(order) < size
@@ -0,0 +1,135 @@
+from array import array
+from heapq import nlargest
+from typing import Optional, Sequence
+
+from algorithms.CsrGraph import CsrGraph
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; the loops below are used without it
+    numpy = None
+
+HAS_NUMPY = numpy is not None
+
+DEFAULT_DAMPING = 0.85
+DEFAULT_ITERATIONS = 100
+DEFAULT_TOLERANCE = 1e-6
+
+# Scores come back as (scores indexed by node id, iterations run, converged).
+# Iteration stops once the summed change over all nodes is below
+# tolerance * number of nodes.
+
+
+class EdgeArrays:
+    # NumPy copy of a graph's edges for vectorized power iteration, built
+    # once per graph version. sources/targets list every CSR edge, and
+    # transition is each edge's share of its source's total out-weight.
+    def __init__(self, graph: CsrGraph):
+        size = graph.number_of_nodes()
+        offsets = numpy.frombuffer(graph.offsets, dtype=graph.offsets.typecode)
+        self.size = size
+        self.sources = numpy.repeat(numpy.arange(size), numpy.diff(offsets))
+        self.targets = numpy.frombuffer(graph.targets, dtype=graph.targets.typecode).astype(numpy.intp)
+        self.weights = numpy.frombuffer(graph.weights, dtype=graph.weights.typecode).astype(numpy.float64)
+        out_weight = numpy.bincount(self.sources, weights=self.weights, minlength=size)
+        self.dangling = out_weight == 0
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            self.transition = numpy.where(self.dangling[self.sources], 0.0, self.weights / out_weight[self.sources])
+        self.version = graph.version
+
+
+def pagerank(graph: CsrGraph, edges: Optional[EdgeArrays] = None, max_iterations: int = DEFAULT_ITERATIONS,
+             tolerance: float = DEFAULT_TOLERANCE, damping: float = DEFAULT_DAMPING) -> tuple[Sequence[float], int, bool]:
+    # Edges are followed in proportion to their weight; the rank of nodes
+    # without out-edges is spread evenly over all nodes
+    size = graph.number_of_nodes()
+    if size == 0:
+        return [], 0, True
+    if edges is not None:
+        scores = numpy.full(size, 1.0 / size)
+        for iteration in range(1, max_iterations + 1):
+            previous = scores
+            spread = (damping * previous[edges.dangling].sum() + 1.0 - damping) / size
+            scores = damping * numpy.bincount(edges.targets, weights=previous[edges.sources] * edges.transition,
+                                              minlength=size) + spread
+            if numpy.abs(scores - previous).sum() < size * tolerance:
+                return scores, iteration, True
+        return scores, max_iterations, False
+
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    out_weight = [sum(weights[offsets[node]:offsets[node + 1]]) for node in range(size)]
+    dangling = [node for node in range(size) if out_weight[node] == 0]
+    scores = [1.0 / size] * size
+    for iteration in range(1, max_iterations + 1):
+        previous = scores
+        spread = (damping * sum(previous[node] for node in dangling) + 1.0 - damping) / size
+        scores = [spread] * size
+        for node in range(size):
+            if out_weight[node]:
+                share = damping * previous[node] / out_weight[node]
+                for position in range(offsets[node], offsets[node + 1]):
+                    scores[targets[position]] += share * weights[position]
+        if sum(abs(score - last) for score, last in zip(scores, previous)) < size * tolerance:
+            return scores, iteration, True
+    return scores, max_iterations, False
+
+
+def eigenvector_centrality(graph: CsrGraph, edges: Optional[EdgeArrays] = None,
+                           max_iterations: int = DEFAULT_ITERATIONS,
+                           tolerance: float = DEFAULT_TOLERANCE) -> tuple[Sequence[float], int, bool]:
+    # Power iteration on x + A^T x, normalized to unit length each round, so
+    # a node scores by the weighted scores of the nodes with edges into it
+    size = graph.number_of_nodes()
+    if size == 0:
+        return [], 0, True
+    if edges is not None:
+        scores = numpy.full(size, 1.0 / size)
+        for iteration in range(1, max_iterations + 1):
+            previous = scores
+            scores = previous + numpy.bincount(edges.targets, weights=previous[edges.sources] * edges.weights,
+                                               minlength=size)
+            norm = numpy.sqrt((scores * scores).sum()) or 1.0
+            scores = scores / norm
+            if numpy.abs(scores - previous).sum() < size * tolerance:
+                return scores, iteration, True
+        return scores, max_iterations, False
+
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    scores = [1.0 / size] * size
+    for iteration in range(1, max_iterations + 1):
+        previous = scores
+        scores = list(previous)
+        for node in range(size):
+            score = previous[node]
+            for position in range(offsets[node], offsets[node + 1]):
+                scores[targets[position]] += score * weights[position]
+        norm = sum(score * score for score in scores) ** 0.5 or 1.0
+        scores = [score / norm for score in scores]
+        if sum(abs(score - last) for score, last in zip(scores, previous)) < size * tolerance:
+            return scores, iteration, True
+    return scores, max_iterations, False
+
+
+def degree_centrality(graph: CsrGraph) -> Sequence[float]:
+    # Edges at a node over the n - 1 it could have; directed graphs count
+    # edges in both directions
+    size = graph.number_of_nodes()
+    scale = 1.0 / (size - 1) if size > 1 else 1.0
+    degrees = array("q", (graph.offsets[node + 1] - graph.offsets[node] for node in range(size)))
+    if graph.is_directed:
+        in_offsets = graph.in_offsets
+        for node in range(size):
+            degrees[node] += in_offsets[node + 1] - in_offsets[node]
+    return [degree * scale for degree in degrees]
+
+
+def top_scores(scores: Sequence[float], limit: Optional[int] = None) -> list[tuple[int, float]]:
+    # (node id, score) pairs, highest first and ties by node id
+    size = len(scores)
+    if limit is None or limit > size:
+        limit = size
+    if numpy is not None and isinstance(scores, numpy.ndarray):
+        order = numpy.argsort(-scores, kind="stable")[:limit]
+        return [(int(node), float(scores[node])) for node in order]
+    order = nlargest(limit, range(size), key=lambda node: (scores[node], -node))
+    return [(node, scores[node]) for node in order]
@@ -0,0 +1,133 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Iterator, Optional
+
+from algorithms.CsrGraph import CsrGraph
+
+# Walks generated per batch. Each batch draws from its own generator seeded
+# by (seed, batch number), so the output depends only on the seed, never on
+# how batches were spread over workers.
+WALK_BATCH = 1024
+# Batches queued per worker before the oldest result must be written
+BATCHES_IN_FLIGHT = 4
+
+_shared_walker: Optional["RandomWalker"] = None
+
+
+class RandomWalker:
+    # Weighted random walks over a CSR view. Each row gets a Vose alias
+    # table (probability and alias row position per edge), so picking the
+    # next edge costs two random numbers whatever the degree. Nodes whose
+    # edges all weigh 0 get degree 0 and end the walk like nodes without
+    # edges. With node2vec's return parameter p and in-out parameter q, a
+    # drawn edge is accepted with probability bias / max bias, where bias is
+    # 1/p to go back, 1 to a neighbor of the previous node and 1/q otherwise;
+    # adjacency is a binary search in the previous node's sorted row.
+    def __init__(self, graph: CsrGraph, length: int, p: float = 1.0, q: float = 1.0, seed: int = 0):
+        self.names = graph.names
+        self.offsets = graph.offsets
+        self.targets = graph.targets
+        self.length = length
+        self.seed = seed
+        self.biases = None if p == 1 and q == 1 else (1 / p, 1.0, 1 / q)
+        self.degree = array("q", (graph.offsets[node + 1] - graph.offsets[node]
+                                  for node in range(graph.number_of_nodes())))
+        self.probability: Optional[array] = None
+        self.alias: Optional[array] = None
+        if graph.is_weighted:
+            self._build_alias_tables(graph.weights)
+
+    def _build_alias_tables(self, weights: array):
+        offsets = self.offsets
+        probability = self.probability = array("d", bytes(8 * len(weights)))
+        alias = self.alias = array("i", bytes(4 * len(weights)))
+        for node in range(len(self.degree)):
+            first, degree = offsets[node], self.degree[node]
+            total = sum(weights[first:first + degree])
+            if not total:
+                self.degree[node] = 0
+                continue
+            scaled = [weight * degree / total for weight in weights[first:first + degree]]
+            small = [index for index, value in enumerate(scaled) if value < 1]
+            large = [index for index, value in enumerate(scaled) if value >= 1]
+            while small and large:
+                less, more = small.pop(), large[-1]
+                probability[first + less] = scaled[less]
+                alias[first + less] = more
+                scaled[more] -= 1 - scaled[less]
+                if scaled[more] < 1:
+                    small.append(large.pop())
+            for index in small + large:
+                probability[first + index] = 1.0
+
+    def batch(self, number: int, walks: int) -> str:
+        # Walks number * WALK_BATCH up to walks, one per line as node names.
+        # Walk i starts at node i mod n, so every round covers each node once.
+        random = Random(f"{self.seed}/{number}").random
+        offsets, targets, degrees, length = self.offsets, self.targets, self.degree, self.length
+        probability, alias, biases = self.probability, self.alias, self.biases
+        if biases is not None:
+            highest = max(biases)
+            back, near, far = (bias / highest for bias in biases)
+        names = self.names
+        lines = []
+        for index in range(number * WALK_BATCH, min((number + 1) * WALK_BATCH, walks)):
+            node = index % len(degrees)
+            walk = [node]
+            previous = -1
+            while len(walk) < length:
+                degree = degrees[node]
+                if not degree:
+                    break
+                first = offsets[node]
+                position = first + int(random() * degree)
+                if probability is not None and random() >= probability[position]:
+                    position = first + alias[position]
+                step = targets[position]
+                if biases is not None and previous != -1:
+                    if step == previous:
+                        accept = back
+                    else:
+                        end = offsets[previous + 1]
+                        found = bisect_left(targets, step, offsets[previous], end)
+                        accept = near if found < end and targets[found] == step else far
+                    if accept < 1 and random() >= accept:
+                        continue
+                previous, node = node, step
+                walk.append(node)
+            lines.append(" ".join([names[node] for node in walk]))
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def generate_walks(graph: CsrGraph, walks_per_node: int, length: int, p: float = 1.0, q: float = 1.0,
+                   seed: int = 0, workers: int = 1) -> Iterator[str]:
+    # Text of all walks, one batch at a time in batch order, so callers can
+    # stream it to a file. Workers get the walker once when they start and
+    # at most BATCHES_IN_FLIGHT batches each are pending at any time.
+    walker = RandomWalker(graph, length, p, q, seed)
+    walks = graph.number_of_nodes() * walks_per_node
+    batches = range((walks + WALK_BATCH - 1) // WALK_BATCH)
+    if workers <= 1 or len(batches) <= 1:
+        for number in batches:
+            yield walker.batch(number, walks)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_share_walker, initargs=(walker,)) as pool:
+        pending = deque()
+        for number in batches:
+            pending.append(pool.submit(_walk_shared, number, walks))
+            if len(pending) >= workers * BATCHES_IN_FLIGHT:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _share_walker(walker: RandomWalker):
+    global _shared_walker
+    _shared_walker = walker
+
+
+def _walk_shared(number: int, walks: int) -> str:
+    return _shared_walker.batch(number, walks)
@@ -0,0 +1,226 @@
+from array import array
+from heapq import heappop, heappush
+from math import inf
+from typing import Callable, Optional
+
+from algorithms.CsrGraph import CsrGraph
+
+# A path is returned as (cost, [node ids from source to target]), or None when
+# the target is unreachable or every path costs more than max_cost.
+Path = Optional[tuple[int, list[int]]]
+
+# Distance table entry for nodes that cannot be reached
+UNREACHABLE = 1 << 62
+
+
+def shortest_path(graph: CsrGraph, source: int, target: int, algorithm: str = "",
+                  max_cost: Optional[int] = None, estimate: Optional[Callable[[int], int]] = None) -> Path:
+    # BFS counts hops and ignores weights. ASTAR needs an estimate of the
+    # remaining distance to the target and is the default when one is given;
+    # otherwise unweighted graphs use BFS and weighted ones bidirectional
+    # Dijkstra.
+    if not algorithm:
+        algorithm = "ASTAR" if estimate is not None else "BIDIRECTIONAL" if graph.is_weighted else "BFS"
+    algorithm = algorithm.upper()
+    if algorithm == "ASTAR" and estimate is not None:
+        return astar(graph, source, target, estimate, max_cost)
+    if algorithm == "BFS":
+        return bidirectional_bfs(graph, source, target, max_cost)
+    if algorithm == "DIJKSTRA":
+        return dijkstra(graph, source, target, max_cost)
+    return bidirectional_dijkstra(graph, source, target, max_cost)
+
+
+def bidirectional_bfs(graph: CsrGraph, source: int, target: int, max_hops: Optional[int] = None) -> Path:
+    # Expands the smaller frontier one whole level at a time. The first level
+    # that meets the other side holds the shortest path, but not necessarily
+    # at the first meeting, so the level is finished before choosing.
+    if source == target:
+        return 0, [source]
+    sides = [
+        ({source: -1}, {source: 0}, [source], graph.offsets, graph.targets),
+        ({target: -1}, {target: 0}, [target], graph.in_offsets, graph.in_sources)
+    ]
+    depth = [0, 0]
+    while sides[0][2] and sides[1][2]:
+        if max_hops is not None and depth[0] + depth[1] >= max_hops:
+            return None
+        side = 0 if len(sides[0][2]) <= len(sides[1][2]) else 1
+        parents, depths, frontier, offsets, targets = sides[side]
+        other_depths = sides[1 - side][1]
+        next_depth = depth[side] + 1
+        next_frontier = []
+        best = inf
+        meeting = None
+        for node in frontier:
+            for position in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[position]
+                if neighbor in depths:
+                    continue
+                parents[neighbor] = node
+                depths[neighbor] = next_depth
+                next_frontier.append(neighbor)
+                other = other_depths.get(neighbor)
+                if other is not None and next_depth + other < best:
+                    best = next_depth + other
+                    meeting = neighbor
+        if meeting is not None:
+            if max_hops is not None and best > max_hops:
+                return None
+            return best, _join_paths(sides[0][0], sides[1][0], meeting)
+        sides[side] = (parents, depths, next_frontier, offsets, targets)
+        depth[side] = next_depth
+    return None
+
+
+def dijkstra(graph: CsrGraph, source: int, target: int, max_cost: Optional[int] = None) -> Path:
+    # Stops as soon as the target is settled; edges that would exceed
+    # max_cost are never relaxed.
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = {source: 0}
+    parents = {source: -1}
+    heap = [(0, source)]
+    while heap:
+        distance, node = heappop(heap)
+        if distance > distances[node]:
+            continue
+        if node == target:
+            return distance, _walk_back(parents, target)[::-1]
+        for position in range(offsets[node], offsets[node + 1]):
+            candidate = distance + weights[position]
+            if max_cost is not None and candidate > max_cost:
+                continue
+            neighbor = targets[position]
+            if candidate < distances.get(neighbor, inf):
+                distances[neighbor] = candidate
+                parents[neighbor] = node
+                heappush(heap, (candidate, neighbor))
+    return None
+
+
+def bidirectional_dijkstra(graph: CsrGraph, source: int, target: int, max_cost: Optional[int] = None) -> Path:
+    # Searches forward from the source and backward from the target, always
+    # advancing the side with the smaller tentative distance, and stops once
+    # the two heap minimums together reach the best path seen so far.
+    if source == target:
+        return 0, [source]
+    sides = [
+        ({source: 0}, {source: -1}, [(0, source)], graph.offsets, graph.targets, graph.weights),
+        ({target: 0}, {target: -1}, [(0, target)], graph.in_offsets, graph.in_sources, graph.in_weights)
+    ]
+    forward_heap, backward_heap = sides[0][2], sides[1][2]
+    limit = inf if max_cost is None else max_cost
+    best = inf
+    meeting = None
+    while forward_heap and backward_heap:
+        if forward_heap[0][0] + backward_heap[0][0] >= min(best, limit + 1):
+            break
+        side = 0 if forward_heap[0][0] <= backward_heap[0][0] else 1
+        distances, parents, heap, offsets, targets, weights = sides[side]
+        other_distances = sides[1 - side][0]
+        distance, node = heappop(heap)
+        if distance > distances[node]:
+            continue
+        for position in range(offsets[node], offsets[node + 1]):
+            candidate = distance + weights[position]
+            if candidate > limit:
+                continue
+            neighbor = targets[position]
+            if candidate < distances.get(neighbor, inf):
+                distances[neighbor] = candidate
+                parents[neighbor] = node
+                heappush(heap, (candidate, neighbor))
+                other = other_distances.get(neighbor)
+                if other is not None and candidate + other < best:
+                    best = candidate + other
+                    meeting = neighbor
+    if meeting is None or best > limit:
+        return None
+    return best, _join_paths(sides[0][1], sides[1][1], meeting)
+
+
+def astar(graph: CsrGraph, source: int, target: int, estimate: Callable[[int], int],
+          max_cost: Optional[int] = None) -> Path:
+    # Dijkstra ordered by distance plus estimate(node), a lower bound on the
+    # node's remaining distance to the target. Nodes whose estimate is
+    # UNREACHABLE or more cannot reach the target and are never queued.
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    limit = inf if max_cost is None else max_cost
+    distances = {source: 0}
+    parents = {source: -1}
+    estimates = {source: estimate(source)}
+    if estimates[source] >= UNREACHABLE:
+        return None
+    heap = [(estimates[source], 0, source)]
+    while heap:
+        bound, distance, node = heappop(heap)
+        if distance > distances[node]:
+            continue
+        if node == target:
+            return distance, _walk_back(parents, target)[::-1]
+        if bound > limit:
+            return None
+        for position in range(offsets[node], offsets[node + 1]):
+            candidate = distance + weights[position]
+            if candidate > limit:
+                continue
+            neighbor = targets[position]
+            if candidate < distances.get(neighbor, inf):
+                remaining = estimates.get(neighbor)
+                if remaining is None:
+                    remaining = estimates[neighbor] = estimate(neighbor)
+                if remaining >= UNREACHABLE:
+                    continue
+                distances[neighbor] = candidate
+                parents[neighbor] = node
+                heappush(heap, (candidate + remaining, candidate, neighbor))
+    return None
+
+
+def distances_from(graph: CsrGraph, source: int, reverse: bool = False) -> array:
+    # Distance from the source to every node, or from every node to the
+    # source when reverse is set, as a table indexed by node id
+    if reverse:
+        offsets, targets, weights = graph.in_offsets, graph.in_sources, graph.in_weights
+    else:
+        offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = array("q", [UNREACHABLE]) * graph.number_of_nodes()
+    distances[source] = 0
+    if not graph.is_weighted:
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for position in range(offsets[node], offsets[node + 1]):
+                    neighbor = targets[position]
+                    if distances[neighbor] == UNREACHABLE:
+                        distances[neighbor] = depth
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return distances
+    heap = [(0, source)]
+    while heap:
+        distance, node = heappop(heap)
+        if distance > distances[node]:
+            continue
+        for position in range(offsets[node], offsets[node + 1]):
+            candidate = distance + weights[position]
+            neighbor = targets[position]
+            if candidate < distances[neighbor]:
+                distances[neighbor] = candidate
+                heappush(heap, (candidate, neighbor))
+    return distances
+
+
+def _walk_back(parents: dict[int, int], node: int) -> list[int]:
+    path = []
+    while node != -1:
+        path.append(node)
+        node = parents[node]
+    return path
+
+
+def _join_paths(forward_parents: dict[int, int], backward_parents: dict[int, int], meeting: int) -> list[int]:
+    return _walk_back(forward_parents, meeting)[::-1] + _walk_back(backward_parents, meeting)[1:]
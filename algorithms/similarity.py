@@ -0,0 +1,76 @@
+from array import array
+from heapq import nlargest
+from math import log
+from typing import Sequence
+
+from algorithms.CsrGraph import CsrGraph
+
+# Similarity of two nodes by the out-neighbors they share (neighbors, for
+# undirected graphs). Candidates are found in two hops, out from the source
+# to a neighbor and back along that neighbor's in-edges, so only nodes with
+# at least one common neighbor are ever scored. Degrees come straight from
+# the CSR offsets; parallel edges of weighted graphs are first merged, so a
+# neighbor counts once however many edges lead to it.
+
+
+def similar_nodes(graph: CsrGraph, sources: Sequence[int], metric: str,
+                  limit: int) -> list[list[tuple[int, float, int]]]:
+    # For each source, up to limit (node, score, common neighbors) triples,
+    # best first and ties by node id. metric is JACCARD (common over all
+    # neighbors of either), COMMON or ADAMIC_ADAR (common neighbors weighted
+    # by 1 / log of their in-degree). The counters and the Adamic-Adar
+    # weights are shared by all sources of a batch.
+    offsets, targets = graph.offsets, graph.targets
+    in_offsets, in_sources = graph.in_offsets, graph.in_sources
+    if graph.is_weighted:
+        offsets, targets = _distinct_rows(offsets, targets)
+        if graph.is_directed:
+            in_offsets, in_sources = _distinct_rows(in_offsets, in_sources)
+        else:
+            in_offsets, in_sources = offsets, targets
+    size = graph.number_of_nodes()
+    adamic_adar = metric == "ADAMIC_ADAR"
+    common = array("q", [0]) * size
+    weighted = array("d", bytes(8 * size)) if adamic_adar else common
+    inverse_log: dict[int, float] = {}
+    results = []
+    for source in sources:
+        touched = []
+        for neighbor in targets[offsets[source]:offsets[source + 1]]:
+            first, last = in_offsets[neighbor], in_offsets[neighbor + 1]
+            if adamic_adar:
+                weight = inverse_log.get(neighbor)
+                if weight is None:
+                    weight = inverse_log[neighbor] = 1.0 / log(last - first) if last - first > 1 else 0.0
+            for candidate in in_sources[first:last]:
+                if candidate != source:
+                    if not common[candidate]:
+                        touched.append(candidate)
+                    common[candidate] += 1
+                    if adamic_adar:
+                        weighted[candidate] += weight
+        if metric == "JACCARD":
+            degree = offsets[source + 1] - offsets[source]
+            scored = ((common[node] / (degree + offsets[node + 1] - offsets[node] - common[node]), -node)
+                      for node in touched)
+        else:
+            scored = ((weighted[node], -node) for node in touched)
+        results.append([(-node, score, common[-node]) for score, node in nlargest(limit, scored)])
+        for node in touched:
+            common[node] = 0
+            weighted[node] = 0
+    return results
+
+
+def _distinct_rows(offsets: array, others: array) -> tuple[array, array]:
+    # Rows are sorted, so repeats of a neighbor are adjacent
+    distinct_offsets = array("q", [0]) * len(offsets)
+    distinct = array(others.typecode)
+    for node in range(len(offsets) - 1):
+        previous = -1
+        for other in others[offsets[node]:offsets[node + 1]]:
+            if other != previous:
+                distinct.append(other)
+                previous = other
+        distinct_offsets[node + 1] = len(distinct)
+    return distinct_offsets, distinct
@@ -0,0 +1,67 @@
+from typing import Iterator, Optional, Union
+
+from algorithms.CsrGraph import CsrGraph
+from algorithms.SnapshotAdjacency import SnapshotAdjacency
+
+# Traversals yield (node id, depth) pairs as nodes are discovered, so callers
+# can stream them or stop early. Edges are followed in their direction, and
+# visited nodes are marked in a bytearray indexed by node id: one byte per
+# node rather than a packed bitmap, so a check is a single index, with no
+# shift or mask. Graphs are a CsrGraph or a SnapshotAdjacency; only their
+# neighbors() rows are read.
+
+
+def bfs(graph: Union[CsrGraph, SnapshotAdjacency], start: int,
+        max_depth: Optional[int] = None) -> Iterator[tuple[int, int]]:
+    # Expands one frontier at a time; only the current and next frontier are
+    # held, and the last level allowed by max_depth is never stored
+    neighbors = graph.neighbors
+    visited = bytearray(graph.number_of_nodes())
+    visited[start] = 1
+    yield start, 0
+    frontier = [start]
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        keep = max_depth is None or depth < max_depth
+        next_frontier = []
+        for node in frontier:
+            for neighbor in neighbors(node):
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    if keep:
+                        next_frontier.append(neighbor)
+                    yield neighbor, depth
+        frontier = next_frontier
+
+
+def dfs(graph: Union[CsrGraph, SnapshotAdjacency], start: int,
+        max_depth: Optional[int] = None) -> Iterator[tuple[int, int]]:
+    # Preorder, visiting neighbors in row order. The stack holds one
+    # (node, depth, row iterator) entry per level, so it never grows past
+    # the current path. max_depth bounds the depth of the DFS tree.
+    neighbors = graph.neighbors
+    visited = bytearray(graph.number_of_nodes())
+    visited[start] = 1
+    yield start, 0
+    stack = [(start, 0, iter(neighbors(start) if max_depth is None or max_depth > 0 else ()))]
+    while stack:
+        _, depth, row = stack[-1]
+        for neighbor in row:
+            if not visited[neighbor]:
+                break
+        else:
+            stack.pop()
+            continue
+        visited[neighbor] = 1
+        yield neighbor, depth + 1
+        # Rows of nodes at max_depth are never read
+        below = max_depth is None or depth + 1 < max_depth
+        stack.append((neighbor, depth + 1, iter(neighbors(neighbor) if below else ())))
+
+
+def k_hop_neighbors(graph: Union[CsrGraph, SnapshotAdjacency], node: int, hops: int) -> Iterator[tuple[int, int]]:
+    # Nodes reachable in 1 to hops edges, each with its hop distance
+    traversal = bfs(graph, node, hops)
+    next(traversal)
+    return traversal
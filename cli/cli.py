@@ -1,8 +1,12 @@
 import logging
-from typing import List, Callable, Dict
+import os
+import time
+from typing import List, Callable, Dict, Iterable
 from prompt_toolkit import PromptSession
 from prompt_toolkit.completion import WordCompleter
 from prompt_toolkit.styles import Style
+from cli.output import BufferedOutput, ConsoleOutput
+from repository.Checkpointer import Checkpointer
 from repository.GraphRepository import GraphRepository
 from service.GraphService import GraphService
 from utils.constants import (
@@ -15,25 +19,54 @@ from utils.constants import (
     NO_EDGES_FOUND, FAILED_TO_LOAD_GRAPH, GRAPH_CREATED, NODE_ADDED,
     EDGE_ADDED, EDGE_REMOVED, GRAPH_LOADED, NODE_REMOVED, GRAPH_SAVED, AVAILABLE_GRAPHS,
     NODES_IN_GRAPH, EDGES_IN_GRAPH, GRAPH_INFO, DIRECTED_INFO,
-    WEIGHTED_INFO, NODES_COUNT, EDGES_COUNT, HELP_TEXT
+    WEIGHTED_INFO, NODES_COUNT, EDGES_COUNT, HELP_TEXT,
+    BULK_ADD_NODES_CMD, BULK_ADD_EDGES_CMD, NODES_BULK_ADDED, EDGES_BULK_ADDED,
+    CHECKPOINT_CMD, CHECKPOINT_DONE, EXEC_CMD, SCRIPT_EXECUTED, SCRIPT_FAILED,
+    SCRIPT_NOT_FOUND, SCRIPT_ALREADY_RUNNING, invalid_command_message_tooltip,
+    LOCK_STATS_CMD, LOCK_STATS_HEADER, LOCK_STATS_LINE,
+    CHECKPOINT_STATUS_CMD, CHECKPOINT_STATUS_HEADER, CHECKPOINT_SCHEDULE, CHECKPOINT_TOTALS,
+    CHECKPOINT_LAST, CHECKPOINT_NEVER, CHECKPOINT_LAST_FAILURE, CHECKPOINT_PENDING,
+    checkpoint_interval, checkpoint_dirty_records,
+    SHORTEST_PATH_CMD, PATH_FOUND, NO_PATH_FOUND, NO_PATH_WITHIN,
+    BUILD_DISTANCE_INDEX_CMD, DISTANCE_INDEX_BUILT, DEFAULT_LANDMARKS,
+    TRAVERSE_CMD, NEIGHBORS_CMD, TRAVERSAL_HEADER, TRAVERSAL_DONE, NEIGHBORS_HEADER, NEIGHBORS_DONE,
+    COMPONENTS_CMD, CONNECTED_CMD, COMPONENTS_FOUND, NODES_CONNECTED, NODES_NOT_CONNECTED,
+    REACHABLE_CMD, BUILD_REACHABILITY_INDEX_CMD, NODE_REACHABLE, NODE_NOT_REACHABLE, REACHABILITY_INDEX_BUILT,
+    PAGERANK_CMD, CENTRALITY_CMD, DEFAULT_ITERATIONS, DEFAULT_TOLERANCE,
+    MEASURE_NAMES, SCORES_HEADER, SCORES_CONVERGED, SCORES_NOT_CONVERGED,
+    BETWEENNESS_CMD, BETWEENNESS_DONE, TRIANGLES_CMD, CLUSTERING_CMD, TRIANGLES_FOUND, NODE_CLUSTERING,
+    AVERAGE_CLUSTERING, SIMILAR_CMD, SIMILAR_HEADER, SIMILAR_DONE, DEFAULT_SIMILAR,
+    RANDOM_WALKS_CMD, RANDOM_WALKS_WRITTEN
 )
 from utils.error import Error
 from validators.graph_validators import (
     validate_add_edge, validate_add_node, validate_create_graph,
     validate_delete_node, validate_delete_edge, validate_list_nodes,
     validate_list_edges, validate_describe_graph, validate_load_graph,
-    validate_save_graph
+    validate_save_graph, validate_bulk_add_nodes, validate_bulk_add_edges, validate_exec,
+    validate_shortest_path, validate_build_distance_index, validate_traverse, validate_neighbors,
+    validate_components, validate_connected, validate_reachable, validate_build_reachability_index,
+    validate_pagerank, validate_centrality, validate_betweenness,
+    validate_triangles, validate_clustering, validate_similar,
+    validate_random_walks
 )
 from utils.config import get_save_file_path
+from utils.file import iter_file_lines
 
 class GraphDBLiteCLI:
     def __init__(self):
         self.repository = GraphRepository(load_from_disk=True)
         self.service = GraphService(self.repository)
+        self.checkpointer = Checkpointer(self.repository, checkpoint_interval, checkpoint_dirty_records)
+        self.checkpointer.start()
         self.commands = [
             CREATE_GRAPH_CMD, ADD_NODE_CMD, ADD_EDGE_CMD, DEL_NODE_CMD, DEL_EDGE_CMD,
             LIST_GRAPHS_CMD, LIST_NODES_CMD, LIST_EDGES_CMD, DESCRIBE_GRAPH_CMD,
-            LOAD_GRAPH_CMD, SAVE_GRAPH_CMD, HELP_CMD, EXIT_CMD, CLEAR_CMD
+            LOAD_GRAPH_CMD, SAVE_GRAPH_CMD, BULK_ADD_NODES_CMD, BULK_ADD_EDGES_CMD, SHORTEST_PATH_CMD,
+            TRAVERSE_CMD, NEIGHBORS_CMD, COMPONENTS_CMD, CONNECTED_CMD,
+            REACHABLE_CMD, BUILD_REACHABILITY_INDEX_CMD, BUILD_DISTANCE_INDEX_CMD, PAGERANK_CMD, CENTRALITY_CMD,
+            BETWEENNESS_CMD, TRIANGLES_CMD, CLUSTERING_CMD, SIMILAR_CMD,
+            RANDOM_WALKS_CMD, CHECKPOINT_CMD, CHECKPOINT_STATUS_CMD, LOCK_STATS_CMD, EXEC_CMD, HELP_CMD, EXIT_CMD, CLEAR_CMD
         ]
         self.completer = WordCompleter(self.commands, ignore_case=True)
         self.style = Style.from_dict({
@@ -56,33 +89,56 @@ class GraphDBLiteCLI:
             DESCRIBE_GRAPH_CMD: self.handle_describe_graph,
             LOAD_GRAPH_CMD: self.handle_load_graph,
             SAVE_GRAPH_CMD: self.handle_save_graph,
+            BULK_ADD_NODES_CMD: self.handle_bulk_add_nodes,
+            BULK_ADD_EDGES_CMD: self.handle_bulk_add_edges,
+            SHORTEST_PATH_CMD: self.handle_shortest_path,
+            TRAVERSE_CMD: self.handle_traverse,
+            NEIGHBORS_CMD: self.handle_neighbors,
+            COMPONENTS_CMD: self.handle_components,
+            CONNECTED_CMD: self.handle_connected,
+            REACHABLE_CMD: self.handle_reachable,
+            BUILD_REACHABILITY_INDEX_CMD: self.handle_build_reachability_index,
+            BUILD_DISTANCE_INDEX_CMD: self.handle_build_distance_index,
+            PAGERANK_CMD: self.handle_pagerank,
+            CENTRALITY_CMD: self.handle_centrality,
+            BETWEENNESS_CMD: self.handle_betweenness,
+            TRIANGLES_CMD: self.handle_triangles,
+            CLUSTERING_CMD: self.handle_clustering,
+            SIMILAR_CMD: self.handle_similar,
+            RANDOM_WALKS_CMD: self.handle_random_walks,
+            CHECKPOINT_CMD: self.handle_checkpoint,
+            CHECKPOINT_STATUS_CMD: self.handle_checkpoint_status,
+            LOCK_STATS_CMD: self.handle_lock_stats,
+            EXEC_CMD: self.handle_exec,
             HELP_CMD: self.show_help_command,
             CLEAR_CMD: self.clear_command,
             EXIT_CMD: self.exit_command
         }
         self.should_exit = False
+        self.output = ConsoleOutput()
+        self.active_scripts: set[str] = set()
 
     def print_error(self, message: str):
-        print(f"\033[91mERROR: {message}\033[0m")
+        self.output.message("error", message)
 
     def print_success(self, message: str):
-        print(f"\033[92mSUCCESS: {message}\033[0m")
+        self.output.message("success", message)
 
     def print_info(self, message: str):
-        print(f"\033[94mINFO: {message}\033[0m")
+        self.output.message("info", message)
 
     def print_warning(self, message: str):
-        print(f"\033[93mWARNING: {message}\033[0m")
+        self.output.message("warning", message)
 
     def show_help(self):
-        print(HELP_TEXT)
+        self.output.line(HELP_TEXT)
 
     def show_help_command(self, args: List[str]) -> bool:
         self.show_help()
         return True
 
     def clear_command(self, args: List[str]) -> bool:
-        print("\033[2J\033[H")
+        self.output.clear()
         return True
 
     def exit_command(self, args: List[str]) -> bool:
@@ -91,6 +147,7 @@ class GraphDBLiteCLI:
 
     def graceful_shutdown(self):
         try:
+            self.checkpointer.stop()
             graphs = self.service.list_graphs()
             if graphs:
                 self.print_info("Saving all graphs to disk...")
@@ -101,10 +158,51 @@ class GraphDBLiteCLI:
                     self.print_success(f"Successfully saved {len(graphs)} graph(s) to disk")
             else:
                 self.print_info("No graphs to save")
+            self.service.close()
         except Exception as e:
             self.print_error(f"Error during shutdown: {str(e)}")
             logging.error(f"Error during graceful shutdown: {e}")
 
+    def execute_command(self, command: str) -> bool:
+        if not command.strip():
+            return True
+        cmd, args = self.parse_command(command)
+        handler = self.command_map.get(cmd)
+        if handler:
+            try:
+                return handler(args)
+            except Exception as e:
+                self.print_error(f"Unexpected error: {str(e)}")
+                logging.error(f"Error processing command '{command}': {e}")
+                return False
+        else:
+            self.print_error(f"Unknown command: {cmd}")
+            self.print_info(invalid_command_message_tooltip)
+            return False
+
+    def run_script(self, lines: Iterable[str], stop_on_error: bool = True) -> tuple[int, int]:
+        # Blank lines and lines starting with '#' are skipped. EXIT ends the
+        # script; the first failing command ends it too unless stop_on_error
+        # is off.
+        self.should_exit = False
+        succeeded = failed = 0
+        for line_number, line in enumerate(lines, start=1):
+            command = line.strip()
+            if not command or command.startswith("#"):
+                continue
+            self.output.begin_command(command, line_number)
+            success = self.execute_command(command)
+            self.output.end_command(success or self.should_exit)
+            if self.should_exit:
+                break
+            if success:
+                succeeded += 1
+            else:
+                failed += 1
+                if stop_on_error:
+                    break
+        return succeeded, failed
+
     def parse_command(self, command: str) -> tuple[str, List[str]]:
         parts = command.strip().split()
         if not parts:
@@ -123,11 +221,11 @@ class GraphDBLiteCLI:
         alias = args[0]
         is_directed = "DIRECTED" in [arg.upper() for arg in args[1:]]
         is_weighted = "WEIGHTED" in [arg.upper() for arg in args[1:]]
-        existing_graph = self.service.get_graph(alias)
-        if not isinstance(existing_graph, Error):
+        is_compact = "COMPACT" in [arg.upper() for arg in args[1:]]
+        if self.service.graph_exists(alias):
             self.print_error(GRAPH_ALREADY_EXISTS.format(alias=alias))
             return False
-        self.service.create_graph(alias, is_directed, is_weighted)
+        self.service.create_graph(alias, is_directed, is_weighted, is_compact)
         self.print_success(GRAPH_CREATED.format(alias=alias, directed=is_directed, weighted=is_weighted))
         return True
 
@@ -210,7 +308,7 @@ class GraphDBLiteCLI:
             return True
         self.print_info(AVAILABLE_GRAPHS)
         for graph_alias in graphs:
-            print(f"  - {graph_alias}")
+            self.output.line(f"  - {graph_alias}")
         return True
 
     def handle_list_nodes(self, args: List[str]) -> bool:
@@ -232,7 +330,7 @@ class GraphDBLiteCLI:
             return True
         self.print_info(NODES_IN_GRAPH.format(alias=graph_alias))
         for node in result:
-            print(f"  - {node}")
+            self.output.line(f"  - {node}")
         return True
 
     def handle_list_edges(self, args: List[str]) -> bool:
@@ -260,9 +358,9 @@ class GraphDBLiteCLI:
                 source = edge.get('source', 'Unknown')
                 destination = edge.get('destination', 'Unknown')
                 weight = edge.get('weight', '1')
-                print(f"  - {source} -> {destination} (weight: {weight})")
+                self.output.line(f"  - {source} -> {destination} (weight: {weight})")
             else:
-                print(f"  - {edge}")
+                self.output.line(f"  - {edge}")
         return True
 
     def handle_describe_graph(self, args: List[str]) -> bool:
@@ -275,16 +373,12 @@ class GraphDBLiteCLI:
         if isinstance(result, Error):
             self.print_error(result.message)
             return False
-        alias, is_directed, is_weighted = result
+        alias, is_directed, is_weighted, node_count, edge_count = result
         self.print_info(GRAPH_INFO.format(alias=alias))
-        print(DIRECTED_INFO.format(directed=is_directed))
-        print(WEIGHTED_INFO.format(weighted=is_weighted))
-        nodes_result = self.service.list_nodes(graph_alias)
-        if not isinstance(nodes_result, Error):
-            print(NODES_COUNT.format(count=len(nodes_result)))
-        edges_result = self.service.list_edges(graph_alias, "", "")
-        if not isinstance(edges_result, Error):
-            print(EDGES_COUNT.format(count=len(edges_result)))
+        self.output.line(DIRECTED_INFO.format(directed=is_directed))
+        self.output.line(WEIGHTED_INFO.format(weighted=is_weighted))
+        self.output.line(NODES_COUNT.format(count=node_count))
+        self.output.line(EDGES_COUNT.format(count=edge_count))
         return True
 
     def handle_load_graph(self, args: List[str]) -> bool:
@@ -317,5 +411,446 @@ class GraphDBLiteCLI:
         self.print_success(GRAPH_SAVED.format(alias=graph_alias, filename=filename))
         return True
 
+    def handle_bulk_add_nodes(self, args: List[str]) -> bool:
+        validation_result = validate_bulk_add_nodes(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias, node_names = args[0], args[1:]
+        existing_graph = self.service.get_graph(graph_alias)
+        if isinstance(existing_graph, Error):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        result = self.service.add_nodes_bulk(graph_alias, node_names)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        self.print_success(NODES_BULK_ADDED.format(added=result, skipped=len(node_names) - result, alias=graph_alias))
+        return True
+
+    def handle_bulk_add_edges(self, args: List[str]) -> bool:
+        validation_result = validate_bulk_add_edges(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        existing_graph = self.service.get_graph(graph_alias)
+        if isinstance(existing_graph, Error):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        if args[1].upper() == "FROM":
+            result = self.service.add_edges_bulk_from_file(graph_alias, args[2])
+        else:
+            result = self.service.add_edges_bulk(graph_alias, [token.split(":") for token in args[1:]])
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        created, added, duplicates = result
+        self.print_success(EDGES_BULK_ADDED.format(added=added, created=created, duplicates=duplicates, alias=graph_alias))
+        return True
+
+    @staticmethod
+    def parse_options(args: List[str]) -> Dict[str, str]:
+        # KEYWORD value pairs, already checked by the command's validator
+        return {keyword.upper(): value for keyword, value in zip(args[::2], args[1::2])}
+
+    def handle_shortest_path(self, args: List[str]) -> bool:
+        validation_result = validate_shortest_path(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias, source, target = args[:3]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        options = self.parse_options(args[3:])
+        max_cost = int(options["MAXCOST"]) if "MAXCOST" in options else None
+        result = self.service.shortest_path(graph_alias, source, target, options.get("ALGORITHM", ""), max_cost)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        if result is None:
+            if max_cost is None:
+                self.print_info(NO_PATH_FOUND.format(source=source, target=target, alias=graph_alias))
+            else:
+                self.print_info(NO_PATH_WITHIN.format(source=source, target=target, alias=graph_alias,
+                                                      max_cost=max_cost))
+            return True
+        cost, path = result
+        self.print_success(PATH_FOUND.format(source=source, target=target, alias=graph_alias,
+                                             cost=cost, hops=len(path) - 1))
+        self.output.line(f"  {' -> '.join(path)}")
+        return True
+
+    def handle_traverse(self, args: List[str]) -> bool:
+        validation_result = validate_traverse(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias, start, order = args[0], args[1], args[2].upper()
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        options = self.parse_options(args[3:])
+        max_depth = int(options["DEPTH"]) if "DEPTH" in options else None
+        limit = int(options["LIMIT"]) if "LIMIT" in options else None
+        result = self.service.traverse(graph_alias, start, order, max_depth, limit)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        self.print_info(TRAVERSAL_HEADER.format(alias=graph_alias, start=start, order=order))
+        count = 0
+        for node, depth in result:
+            self.output.line(f"  {node} (depth {depth})")
+            count += 1
+        self.print_success(TRAVERSAL_DONE.format(count=count))
+        return True
+
+    def handle_neighbors(self, args: List[str]) -> bool:
+        validation_result = validate_neighbors(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias, node = args[:2]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        hops = int(self.parse_options(args[2:]).get("HOPS", 1))
+        result = self.service.neighbors(graph_alias, node, hops)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        self.print_info(NEIGHBORS_HEADER.format(hops=hops, node=node, alias=graph_alias))
+        count = 0
+        for neighbor, distance in result:
+            self.output.line(f"  {neighbor} ({distance} hop(s))")
+            count += 1
+        self.print_success(NEIGHBORS_DONE.format(count=count, hops=hops, node=node))
+        return True
+
+    def handle_components(self, args: List[str]) -> bool:
+        validation_result = validate_components(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        result = self.service.count_components(graph_alias)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        count, nodes = result
+        kind = "weakly connected" if self.service.is_directed(graph_alias) else "connected"
+        self.print_success(COMPONENTS_FOUND.format(alias=graph_alias, count=count, kind=kind, nodes=nodes))
+        return True
+
+    def handle_connected(self, args: List[str]) -> bool:
+        validation_result = validate_connected(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias, node1, node2 = args
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        result = self.service.connected(graph_alias, node1, node2)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        kind = "weakly connected" if self.service.is_directed(graph_alias) else "connected"
+        message = NODES_CONNECTED if result else NODES_NOT_CONNECTED
+        self.print_success(message.format(node1=node1, node2=node2, kind=kind, alias=graph_alias))
+        return True
+
+    def handle_reachable(self, args: List[str]) -> bool:
+        validation_result = validate_reachable(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias, source, target = args
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        result = self.service.reachable(graph_alias, source, target)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        message = NODE_REACHABLE if result else NODE_NOT_REACHABLE
+        self.print_success(message.format(source=source, target=target, alias=graph_alias))
+        return True
+
+    def handle_build_reachability_index(self, args: List[str]) -> bool:
+        validation_result = validate_build_reachability_index(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        started = time.perf_counter()
+        result = self.service.build_reachability_index(graph_alias)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        mode = "full closure" if result.closure is not None else "searched in topological order"
+        self.print_success(REACHABILITY_INDEX_BUILT.format(alias=graph_alias, components=result.count, mode=mode,
+                                                           seconds=time.perf_counter() - started))
+        return True
+
+    def handle_build_distance_index(self, args: List[str]) -> bool:
+        validation_result = validate_build_distance_index(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        landmarks = int(self.parse_options(args[1:]).get("LANDMARKS", DEFAULT_LANDMARKS))
+        started = time.perf_counter()
+        result = self.service.build_distance_index(graph_alias, landmarks)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        self.print_success(DISTANCE_INDEX_BUILT.format(alias=graph_alias, landmarks=len(result.landmarks),
+                                                       nodes=result.number_of_nodes(),
+                                                       seconds=time.perf_counter() - started))
+        return True
+
+    def handle_pagerank(self, args: List[str]) -> bool:
+        validation_result = validate_pagerank(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        return self.rank_nodes(args[0], "PAGERANK", args[1:])
+
+    def handle_centrality(self, args: List[str]) -> bool:
+        validation_result = validate_centrality(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        return self.rank_nodes(args[0], args[1].upper(), args[2:])
+
+    def rank_nodes(self, graph_alias: str, measure: str, option_args: List[str]) -> bool:
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        options = self.parse_options(option_args)
+        max_iterations = int(options.get("ITER", DEFAULT_ITERATIONS))
+        tolerance = float(options.get("TOL", DEFAULT_TOLERANCE))
+        top = int(options["TOP"]) if "TOP" in options else None
+        result = self.service.centrality(graph_alias, measure, max_iterations, tolerance, top)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        ranking, nodes, iterations, converged = result
+        self.print_scores(graph_alias, measure, ranking, nodes)
+        if not converged:
+            self.print_warning(SCORES_NOT_CONVERGED.format(iterations=iterations))
+        elif measure != "DEGREE":
+            self.print_success(SCORES_CONVERGED.format(iterations=iterations))
+        return True
+
+    def handle_betweenness(self, args: List[str]) -> bool:
+        validation_result = validate_betweenness(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        options = self.parse_options(args[1:])
+        sample = int(options["SAMPLE"]) if "SAMPLE" in options else None
+        workers = int(options.get("WORKERS", 1))
+        top = int(options["TOP"]) if "TOP" in options else None
+        started = time.perf_counter()
+        result = self.service.betweenness(graph_alias, sample, workers, top)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        ranking, nodes, sources, workers = result
+        self.print_scores(graph_alias, "BETWEENNESS", ranking, nodes)
+        self.print_success(BETWEENNESS_DONE.format(sources=sources, nodes=nodes, workers=workers,
+                                                   seconds=time.perf_counter() - started))
+        return True
+
+    def handle_triangles(self, args: List[str]) -> bool:
+        validation_result = validate_triangles(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        result = self.service.triangles(graph_alias)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        count, nodes = result
+        note = " (edge directions ignored)" if self.service.is_directed(graph_alias) else ""
+        self.print_success(TRIANGLES_FOUND.format(alias=graph_alias, count=count, nodes=nodes, note=note))
+        return True
+
+    def handle_clustering(self, args: List[str]) -> bool:
+        validation_result = validate_clustering(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        node = args[1] if len(args) > 1 else None
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        result = self.service.clustering(graph_alias, node)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        if node is None:
+            coefficient, nodes = result
+            self.print_success(AVERAGE_CLUSTERING.format(alias=graph_alias, coefficient=coefficient, nodes=nodes))
+        else:
+            coefficient, triangles = result
+            self.print_success(NODE_CLUSTERING.format(node=node, alias=graph_alias, coefficient=coefficient,
+                                                      triangles=triangles))
+        return True
+
+    def handle_similar(self, args: List[str]) -> bool:
+        validation_result = validate_similar(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        nodes_end = 1
+        while nodes_end < len(args) and args[nodes_end].upper() not in ("METRIC", "TOP"):
+            nodes_end += 1
+        options = self.parse_options(args[nodes_end:])
+        metric = options.get("METRIC", "JACCARD").upper()
+        limit = int(options.get("TOP", DEFAULT_SIMILAR))
+        started = time.perf_counter()
+        result = self.service.similar(graph_alias, args[1:nodes_end], metric, limit)
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        for node, ranking in result:
+            self.print_info(SIMILAR_HEADER.format(node=node, alias=graph_alias, metric=metric, count=len(ranking)))
+            for other, score, common in ranking:
+                self.output.line(f"  {other}: {score:.6g} ({common} common neighbor(s))")
+        self.print_success(SIMILAR_DONE.format(count=len(result), seconds=time.perf_counter() - started))
+        return True
+
+    def handle_random_walks(self, args: List[str]) -> bool:
+        validation_result = validate_random_walks(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        graph_alias = args[0]
+        if not self.service.graph_exists(graph_alias):
+            self.print_error(GRAPH_DOES_NOT_EXIST.format(alias=graph_alias))
+            return False
+        options = self.parse_options(args[1:])
+        length = int(options["LENGTH"])
+        filename = options["TO"]
+        seed = int(options["SEED"]) if "SEED" in options else None
+        started = time.perf_counter()
+        result = self.service.random_walks(graph_alias, int(options["NUM"]), length, filename,
+                                           float(options.get("P", 1)), float(options.get("Q", 1)), seed,
+                                           int(options.get("WORKERS", 1)))
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        walks, seed = result
+        self.print_success(RANDOM_WALKS_WRITTEN.format(walks=walks, length=length, alias=graph_alias,
+                                                       filename=filename, seed=seed,
+                                                       seconds=time.perf_counter() - started))
+        return True
+
+    def print_scores(self, graph_alias: str, measure: str, ranking: List[tuple[str, float]], nodes: int):
+        self.print_info(SCORES_HEADER.format(measure=MEASURE_NAMES[measure], alias=graph_alias,
+                                             count=len(ranking), nodes=nodes))
+        for node, score in ranking:
+            self.output.line(f"  {node}: {score:.6g}")
+
+    def handle_checkpoint(self, args: List[str]) -> bool:
+        result = self.service.checkpoint()
+        if isinstance(result, Error):
+            self.print_error(result.message)
+            return False
+        written, records = result
+        self.print_success(CHECKPOINT_DONE.format(written=written, total=len(self.service.list_graphs()), records=records))
+        return True
+
+    def handle_checkpoint_status(self, args: List[str]) -> bool:
+        status = self.service.checkpoint_status()
+        checkpointer = self.checkpointer
+        self.print_info(CHECKPOINT_STATUS_HEADER)
+        self.output.line(CHECKPOINT_SCHEDULE.format(
+            state="running" if checkpointer.running else "stopped",
+            interval=f"{checkpointer.interval:g} s" if checkpointer.interval > 0 else "off",
+            records=checkpointer.dirty_records if checkpointer.dirty_records > 0 else "off"
+        ))
+        self.output.line(CHECKPOINT_TOTALS.format(**status))
+        last = status["last"]
+        if last is None:
+            self.output.line(CHECKPOINT_NEVER)
+        else:
+            self.output.line(CHECKPOINT_LAST.format(
+                finished=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(last["finished"])),
+                trigger="background" if last["background"] else "manual",
+                seconds=last["seconds"], bytes=last["bytes"], written=last["written"],
+                graphs=last["graphs"], records=last["records"]
+            ))
+        if status["last_error"] is not None:
+            self.output.line(CHECKPOINT_LAST_FAILURE.format(message=status["last_error"]))
+        self.output.line(CHECKPOINT_PENDING.format(pending=status["pending"]))
+        return True
+
+    def handle_lock_stats(self, args: List[str]) -> bool:
+        self.print_info(LOCK_STATS_HEADER)
+        for name, stats in self.service.lock_stats():
+            self.output.line(LOCK_STATS_LINE.format(
+                name=name, wait_ms=stats["wait_seconds"] * 1000, max_wait_ms=stats["max_wait_seconds"] * 1000, **stats
+            ))
+        return True
+
+    def handle_exec(self, args: List[str]) -> bool:
+        validation_result = validate_exec(args)
+        if isinstance(validation_result, Error):
+            self.print_error(validation_result.message)
+            return False
+        filename = args[0]
+        stop_on_error = len(args) == 1
+        if not os.path.isfile(filename):
+            self.print_error(SCRIPT_NOT_FOUND.format(filename=filename))
+            return False
+        script_path = os.path.realpath(filename)
+        if script_path in self.active_scripts:
+            self.print_error(SCRIPT_ALREADY_RUNNING.format(filename=filename))
+            return False
+        outer_output = self.output
+        if not outer_output.buffered:
+            self.output = BufferedOutput(colored=True)
+        self.active_scripts.add(script_path)
+        try:
+            succeeded, failed = self.run_script(iter_file_lines(filename), stop_on_error)
+        finally:
+            self.active_scripts.discard(script_path)
+            self.should_exit = False
+            if self.output is not outer_output:
+                self.output.flush()
+                self.output = outer_output
+        if failed:
+            self.print_error(SCRIPT_FAILED.format(filename=filename, succeeded=succeeded, failed=failed))
+            return False
+        self.print_success(SCRIPT_EXECUTED.format(filename=filename, succeeded=succeeded))
+        return True
+
     def load_graphs(self):
         self.service.load_graphs()
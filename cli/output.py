@@ -0,0 +1,114 @@
+import json
+import sys
+from typing import Optional, TextIO
+
+LEVEL_COLORS = {
+    "error": "\033[91m",
+    "success": "\033[92m",
+    "info": "\033[94m",
+    "warning": "\033[93m"
+}
+RESET_COLOR = "\033[0m"
+CLEAR_SCREEN = "\033[2J\033[H"
+
+
+def format_message(level: str, message: str, colored: bool) -> str:
+    text = f"{level.upper()}: {message}"
+    if colored:
+        return f"{LEVEL_COLORS[level]}{text}{RESET_COLOR}"
+    return text
+
+
+class ConsoleOutput:
+    # Interactive output: every message is printed, colored, as soon as it is produced.
+    buffered = False
+
+    def message(self, level: str, message: str):
+        print(format_message(level, message, colored=True))
+
+    def line(self, text: str):
+        print(text)
+
+    def clear(self):
+        print(CLEAR_SCREEN)
+
+    def begin_command(self, command: str, line_number: int):
+        pass
+
+    def end_command(self, success: bool):
+        pass
+
+    def flush(self):
+        pass
+
+
+class BufferedOutput:
+    # Collects output in memory and writes it in one block when flushed, or
+    # earlier once flush_lines lines have piled up.
+    buffered = True
+
+    def __init__(self, stream: Optional[TextIO] = None, colored: bool = False, flush_lines: int = 65536):
+        self.stream = stream
+        self.colored = colored
+        self.flush_lines = flush_lines
+        self.lines: list[str] = []
+
+    def _write(self, text: str):
+        self.lines.append(text)
+        if len(self.lines) >= self.flush_lines:
+            self.flush()
+
+    def message(self, level: str, message: str):
+        self._write(format_message(level, message, self.colored))
+
+    def line(self, text: str):
+        self._write(text)
+
+    def clear(self):
+        pass
+
+    def begin_command(self, command: str, line_number: int):
+        pass
+
+    def end_command(self, success: bool):
+        pass
+
+    def flush(self):
+        if not self.lines:
+            return
+        stream = self.stream or sys.stdout
+        stream.write("\n".join(self.lines) + "\n")
+        stream.flush()
+        self.lines = []
+
+
+class JsonLinesOutput(BufferedOutput):
+    # One JSON object per command with its line number, text, outcome, status
+    # messages and any listed output. Messages produced outside a command
+    # (for example while shutting down) become records of their own.
+    def __init__(self, stream: Optional[TextIO] = None, flush_lines: int = 65536):
+        super().__init__(stream, colored=False, flush_lines=flush_lines)
+        self.records: list[dict] = []
+
+    def message(self, level: str, message: str):
+        if self.records:
+            self.records[-1]["messages"].append({"level": level, "message": message})
+        else:
+            self._emit({"level": level, "message": message})
+
+    def line(self, text: str):
+        if self.records:
+            self.records[-1]["output"].append(text)
+        else:
+            self._emit({"output": text})
+
+    def begin_command(self, command: str, line_number: int):
+        self.records.append({"line": line_number, "command": command, "ok": False, "messages": [], "output": []})
+
+    def end_command(self, success: bool):
+        record = self.records.pop()
+        record["ok"] = success
+        self._emit(record)
+
+    def _emit(self, record: dict):
+        self._write(json.dumps(record, separators=(",", ":")))
@@ -1,28 +1,19 @@
+import argparse
+import asyncio
 import logging
 import signal
 import sys
 from prompt_toolkit import PromptSession
-from utils.constants import (
-    WELCOME_MESSAGE, HELP_PROMPT, GOODBYE_MESSAGE, USE_EXIT_MESSAGE, invalid_command_message_tooltip
-)
+from typing import Optional
+from utils.constants import WELCOME_MESSAGE, HELP_PROMPT, GOODBYE_MESSAGE, USE_EXIT_MESSAGE
+from utils.file import iter_file_lines
 from cli.cli import GraphDBLiteCLI
+from cli.output import BufferedOutput, JsonLinesOutput
+from server.GraphServer import GraphServer
+from utils.constants import DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT
 
 def process_command(cli: GraphDBLiteCLI, command: str) -> bool:
-    if not command.strip():
-        return True
-    cmd, args = cli.parse_command(command)
-    handler = cli.command_map.get(cmd)
-    if handler:
-        try:
-            return handler(args)
-        except Exception as e:
-            cli.print_error(f"Unexpected error: {str(e)}")
-            logging.error(f"Error processing command '{command}': {e}")
-            return False
-    else:
-        cli.print_error(f"Unknown command: {cmd}")
-        cli.print_info(invalid_command_message_tooltip)
-        return False
+    return cli.execute_command(command)
 
 def run(cli: GraphDBLiteCLI):
     signal.signal(signal.SIGINT, lambda signum, frame: cli.graceful_shutdown())
@@ -53,9 +44,57 @@ def run(cli: GraphDBLiteCLI):
     
     print(GOODBYE_MESSAGE)
 
-def main():
+def run_batch(cli: GraphDBLiteCLI, filename: str, stop_on_error: bool = True, output_format: str = "text") -> bool:
+    # Runs commands from a file ('-' for stdin) without rendering a prompt.
+    # Output is buffered and written in large blocks, as plain text or as
+    # one JSON object per command.
+    cli.output = JsonLinesOutput() if output_format == "json" else BufferedOutput()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    failed = 0
+    try:
+        lines = sys.stdin if filename == "-" else iter_file_lines(filename)
+        _, failed = cli.run_script(lines, stop_on_error)
+    except OSError as e:
+        cli.print_error(f"Failed to read script {filename}: {e}")
+        failed += 1
+    finally:
+        cli.graceful_shutdown()
+        cli.output.flush()
+    return failed == 0
+
+def run_server(cli: GraphDBLiteCLI, host: str, port: int, unix_path: Optional[str] = None):
+    server = GraphServer(cli, host, port, unix_path)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cli.graceful_shutdown()
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="GraphDBLite - Lightweight Graph Database")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="run commands from FILE (or stdin) without the interactive prompt")
+    parser.add_argument("--continue-on-error", action="store_true",
+                        help="keep running a batch after a command fails")
+    parser.add_argument("--output", choices=("text", "json"), default="text",
+                        help="batch output format: plain text or one JSON object per command")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve commands over a local socket instead of the interactive prompt")
+    parser.add_argument("--host", default=DEFAULT_SERVER_HOST, help="TCP host to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVER_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket at PATH instead of TCP")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[list[str]] = None):
+    args = parse_args(argv)
     cli = GraphDBLiteCLI()
-    cli.load_graphs()
+    if args.batch is not None:
+        succeeded = run_batch(cli, args.batch, not args.continue_on_error, args.output)
+        sys.exit(0 if succeeded else 1)
+    if args.serve:
+        run_server(cli, args.host, args.port, args.unix)
+        return
     try:
         run(cli)
     except KeyboardInterrupt:
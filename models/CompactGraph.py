@@ -0,0 +1,429 @@
+import copy
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, Optional, Union
+from models.GraphEdge import GraphEdge
+from models.GraphNode import GraphNode
+from models.UnionFind import UnionFind
+from utils.error import Error
+
+DEFAULT_MERGE_THRESHOLD = 4096
+
+
+class CompactGraph:
+    # Edges live in two CSR column sets (outgoing rows keyed by source, incoming
+    # rows keyed by destination) holding integer node ids and typed weights.
+    # Mutations land in a small delta buffer plus tombstones and are folded back
+    # into the CSR columns by compact() once the buffer grows large enough.
+    def __init__(self, alias: str, is_directed: bool = False, is_weighted: bool = False):
+        self.nodes_to_index: dict[str, int] = {}
+        self.index_to_name: list[Optional[str]] = []
+        self.free_indices: list[int] = []
+        self.offsets = array("q", [0])
+        self.targets = array("i")
+        self.weights = array("q")
+        self.in_offsets = array("q", [0])
+        self.in_sources = array("i")
+        self.in_weights = array("q")
+        self.delta_out: dict[int, set[tuple[int, int]]] = {}
+        self.delta_in: dict[int, set[tuple[int, int]]] = {}
+        self.tombstones: set[tuple[int, int, int]] = set()
+        self.pending_changes: int = 0
+        self.edge_count: int = 0
+        self.merge_threshold: int = DEFAULT_MERGE_THRESHOLD
+        self.is_directed: bool = is_directed
+        self.is_weighted: bool = is_weighted
+        self.is_compact: bool = True
+        self.alias: str = alias
+        self.version: int = 0
+        self.saved_version: int = -1
+        self.shared: bool = False
+        # Weakly connected components, see components()
+        self.union_find: Optional[UnionFind] = None
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactGraph):
+            return False
+        return self.alias == other.alias
+
+    def __hash__(self):
+        return hash(self.alias)
+
+    @property
+    def is_dirty(self) -> bool:
+        return self.version != self.saved_version
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes_to_index)
+
+    def number_of_edges(self) -> int:
+        return self.edge_count
+
+    @property
+    def nodes(self) -> Iterator[GraphNode]:
+        return (GraphNode(name) for name in self.nodes_to_index)
+
+    @property
+    def edges(self) -> Iterator[GraphEdge]:
+        names = self.index_to_name
+        return (GraphEdge(GraphNode(names[source]), GraphNode(names[destination]), weight)
+                for source, destination, weight in self.iter_edges())
+
+    def node_exists(self, name: str) -> bool:
+        return name in self.nodes_to_index
+
+    def neighbor_indices(self, index: int) -> list[int]:
+        # Indices of the nodes a node has edges to, either end for undirected
+        # graphs, in index order
+        neighbors = [destination for destination, _ in self._out_edges(index)]
+        if not self.is_directed:
+            neighbors.extend(source for source, _ in self._in_edges(index) if source != index)
+        neighbors.sort()
+        return neighbors
+
+    def snapshot(self) -> "CompactGraph":
+        # Returns a read-only view sharing this graph's columns and buffers.
+        # The CSR columns are never written in place; the next write copies
+        # the node maps and the delta buffer, which compaction keeps small.
+        view = copy.copy(self)
+        self.shared = True
+        return view
+
+    def release_snapshots(self):
+        self.shared = False
+
+    def _detach(self):
+        self.nodes_to_index = dict(self.nodes_to_index)
+        self.index_to_name = list(self.index_to_name)
+        self.free_indices = list(self.free_indices)
+        self.delta_out = {index: set(pending) for index, pending in self.delta_out.items()}
+        self.delta_in = {index: set(pending) for index, pending in self.delta_in.items()}
+        self.tombstones = set(self.tombstones)
+        if self.union_find is not None:
+            self.union_find = self.union_find.copy()
+        self.shared = False
+
+    def add_node(self, node_name: str) -> Union[None, Error]:
+        if node_name in self.nodes_to_index:
+            return Error(1, f"Node {node_name} already exists")
+        if self.shared:
+            self._detach()
+        if self.free_indices:
+            index = self.free_indices.pop()
+            self.index_to_name[index] = node_name
+        else:
+            index = len(self.index_to_name)
+            self.index_to_name.append(node_name)
+        self.nodes_to_index[node_name] = index
+        if self.union_find is not None:
+            self.union_find.add(index)
+        self.version += 1
+        return None
+
+    def _resolve(self, node1_name: str, node2_name: str, weight) -> Union[tuple[int, int, int], Error]:
+        if node1_name not in self.nodes_to_index:
+            return Error(1, f"Node {node1_name} does not exist")
+        if node2_name not in self.nodes_to_index:
+            return Error(1, f"Node {node2_name} does not exist")
+
+        if not self.is_weighted:
+            weight = 1
+
+        if self.is_weighted and weight == "":
+            return Error(1, "Weight is required for weighted graph")
+
+        weight_int = int(weight) if isinstance(weight, str) else weight
+        return self.nodes_to_index[node1_name], self.nodes_to_index[node2_name], weight_int
+
+    def edge_exists(self, node1_name: str, node2_name: str, weight=None) -> bool:
+        source = self.nodes_to_index.get(node1_name)
+        destination = self.nodes_to_index.get(node2_name)
+        if source is None or destination is None:
+            return False
+        if weight is not None:
+            return self._has_edge(source, destination, weight)
+        return any(other == destination for other, _ in self._out_edges(source, destination))
+
+    def add_edge(self, node1_name: str, node2_name: str, weight="") -> Union[None, Error]:
+        resolved = self._resolve(node1_name, node2_name, weight)
+        if isinstance(resolved, Error):
+            return resolved
+        if not self._insert_edge(*resolved):
+            return Error(1, f"Edge from {node1_name} to {node2_name} already exists")
+        self._after_mutation()
+        return None
+
+    def _insert_edge(self, source: int, destination: int, weight_int: int) -> bool:
+        if self._has_edge(source, destination, weight_int):
+            return False
+        if self.shared:
+            self._detach()
+        key = (source, destination, weight_int)
+        if key in self.tombstones:
+            self.tombstones.remove(key)
+        else:
+            self.delta_out.setdefault(source, set()).add((destination, weight_int))
+            self.delta_in.setdefault(destination, set()).add((source, weight_int))
+        if self.union_find is not None:
+            self.union_find.union(source, destination)
+        self.edge_count += 1
+        return True
+
+    def add_nodes_from(self, node_names: Iterable[str]) -> int:
+        added = 0
+        for node_name in node_names:
+            if node_name not in self.nodes_to_index:
+                self.add_node(node_name)
+                added += 1
+        return added
+
+    def add_edges_from(self, edges: Iterable[tuple[str, str, Union[str, int]]]) -> tuple[int, int, int]:
+        if self.shared:
+            self._detach()
+        nodes_to_index = self.nodes_to_index
+        nodes_before = len(nodes_to_index)
+        added = duplicates = 0
+        for node1_name, node2_name, weight in edges:
+            source = nodes_to_index.get(node1_name)
+            if source is None:
+                self.add_node(node1_name)
+                source = nodes_to_index[node1_name]
+            destination = nodes_to_index.get(node2_name)
+            if destination is None:
+                self.add_node(node2_name)
+                destination = nodes_to_index[node2_name]
+            weight_int = int(weight) if self.is_weighted else 1
+            if self._insert_edge(source, destination, weight_int):
+                added += 1
+            else:
+                duplicates += 1
+        self._after_mutation(added)
+        return len(nodes_to_index) - nodes_before, added, duplicates
+
+    def remove_edge(self, node1_name: str, node2_name: str, weight="") -> Union[None, Error]:
+        resolved = self._resolve(node1_name, node2_name, weight)
+        if isinstance(resolved, Error):
+            return resolved
+        source, destination, weight_int = resolved
+        if not self._has_edge(source, destination, weight_int):
+            return Error(1, f"Edge from {node1_name} to {node2_name} does not exist")
+        self._unlink_edge(source, destination, weight_int)
+        self._after_mutation()
+        return None
+
+    def remove_node(self, node_name: str) -> Union[None, Error]:
+        if node_name not in self.nodes_to_index:
+            return Error(1, f"Node {node_name} does not exist")
+
+        index = self.nodes_to_index[node_name]
+        for destination, weight in list(self._out_edges(index)):
+            self._unlink_edge(index, destination, weight)
+        for source, weight in list(self._in_edges(index)):
+            self._unlink_edge(source, index, weight)
+
+        if self.shared:
+            self._detach()
+
+        del self.nodes_to_index[node_name]
+        self.index_to_name[index] = None
+        self.free_indices.append(index)
+        self.union_find = None
+        self._after_mutation()
+        return None
+
+    def list_edges(self, node1_name: str, node2_name: str):
+        if node1_name not in self.nodes_to_index:
+            return Error(1, f"Node {node1_name} does not exist")
+        if node2_name not in self.nodes_to_index:
+            return Error(1, f"Node {node2_name} does not exist")
+        source = self.nodes_to_index[node1_name]
+        destination = self.nodes_to_index[node2_name]
+        return [self._dump_edge(source, destination, weight)
+                for other, weight in self._out_edges(source, destination) if other == destination]
+
+    def list_edges_for_node(self, node_name: str):
+        if node_name not in self.nodes_to_index:
+            return Error(1, f"Node {node_name} does not exist")
+        index = self.nodes_to_index[node_name]
+        result = [self._dump_edge(index, destination, weight) for destination, weight in self._out_edges(index)]
+        if not self.is_directed:
+            result.extend(self._dump_edge(source, index, weight)
+                          for source, weight in self._in_edges(index) if source != index)
+        return result
+
+    def components(self) -> UnionFind:
+        # Kept up to date as nodes and edges are added; a removal drops it and
+        # the next call rebuilds it from the edges
+        union_find = self.union_find
+        if union_find is None:
+            union_find = self.union_find = UnionFind.from_edges(
+                len(self.index_to_name), self.number_of_nodes(), ((source, destination) for source, destination, _ in self.iter_edges())
+            )
+        return union_find
+
+    def connected(self, node1_name: str, node2_name: str) -> Union[bool, Error]:
+        index1 = self.nodes_to_index.get(node1_name)
+        if index1 is None:
+            return Error(1, f"Node {node1_name} does not exist")
+        index2 = self.nodes_to_index.get(node2_name)
+        if index2 is None:
+            return Error(1, f"Node {node2_name} does not exist")
+        union_find = self.components()
+        return union_find.find(index1) == union_find.find(index2)
+
+    def iter_edges(self) -> Iterator[tuple[int, int, int]]:
+        for source in range(len(self.index_to_name)):
+            for destination, weight in self._out_edges(source):
+                yield source, destination, weight
+
+    def compact(self):
+        size = len(self.index_to_name)
+        out_columns = self.build_columns(size, False, self.iter_edges)
+        in_columns = self.build_columns(size, True, self.iter_edges)
+        self.offsets, self.targets, self.weights = out_columns
+        self.in_offsets, self.in_sources, self.in_weights = in_columns
+        self.delta_out = {}
+        self.delta_in = {}
+        self.tombstones = set()
+        self.pending_changes = 0
+
+    def dump(self) -> dict:
+        return {
+            "alias": self.alias,
+            "is_directed": self.is_directed,
+            "is_weighted": self.is_weighted,
+            "is_compact": True,
+            "nodes": [node.dump() for node in self.nodes],
+            "edges": [edge.dump() for edge in self.edges]
+        }
+
+    @staticmethod
+    def load(data: dict):
+        graph = CompactGraph(data["alias"], data["is_directed"], data["is_weighted"])
+        graph.add_nodes_from(GraphNode.load(node_data).name for node_data in data["nodes"])
+        graph.add_edges_from((edge["source"], edge["destination"], edge["weight"]) for edge in data["edges"])
+        graph.compact()
+        return graph
+
+    @staticmethod
+    def from_arrays(alias: str, is_directed: bool, is_weighted: bool, names: list[str],
+                    sources: array, destinations: array, weights: array):
+        graph = CompactGraph(alias, is_directed, is_weighted)
+        graph.index_to_name = list(names)
+        graph.nodes_to_index = {name: index for index, name in enumerate(names)}
+        size = len(names)
+        graph.offsets, graph.targets, graph.weights = CompactGraph.build_columns(
+            size, False, lambda: zip(sources, destinations, weights)
+        )
+        graph.in_offsets, graph.in_sources, graph.in_weights = CompactGraph.build_columns(
+            size, True, lambda: zip(sources, destinations, weights)
+        )
+        graph.edge_count = len(sources)
+        return graph
+
+    def export_arrays(self) -> tuple[list[str], array, array, array]:
+        dense = array("i", [-1]) * len(self.index_to_name)
+        names = []
+        for index, name in enumerate(self.index_to_name):
+            if name is not None:
+                dense[index] = len(names)
+                names.append(name)
+        sources, destinations, weights = array("i"), array("i"), array("q")
+        for source, destination, weight in self.iter_edges():
+            sources.append(dense[source])
+            destinations.append(dense[destination])
+            weights.append(weight)
+        return names, sources, destinations, weights
+
+    def _dump_edge(self, source: int, destination: int, weight: int) -> dict:
+        return {
+            "source": self.index_to_name[source],
+            "destination": self.index_to_name[destination],
+            "weight": weight
+        }
+
+    def _has_edge(self, source: int, destination: int, weight: int) -> bool:
+        if (destination, weight) in self.delta_out.get(source, ()):
+            return True
+        if (source, destination, weight) in self.tombstones:
+            return False
+        low, high = self._row(self.offsets, source)
+        position = bisect_left(self.targets, destination, low, high)
+        while position < high and self.targets[position] == destination:
+            if self.weights[position] == weight:
+                return True
+            position += 1
+        return False
+
+    def _unlink_edge(self, source: int, destination: int, weight: int):
+        if self.shared:
+            self._detach()
+        pending = self.delta_out.get(source)
+        if pending is not None and (destination, weight) in pending:
+            pending.discard((destination, weight))
+            self.delta_in[destination].discard((source, weight))
+        else:
+            self.tombstones.add((source, destination, weight))
+        self.union_find = None
+        self.edge_count -= 1
+
+    def _out_edges(self, index: int, destination: Optional[int] = None) -> Iterator[tuple[int, int]]:
+        low, high = self._row(self.offsets, index)
+        if destination is not None:
+            low = bisect_left(self.targets, destination, low, high)
+        for position in range(low, high):
+            target = self.targets[position]
+            if destination is not None and target != destination:
+                break
+            weight = self.weights[position]
+            if (index, target, weight) not in self.tombstones:
+                yield target, weight
+        yield from self.delta_out.get(index, ())
+
+    def _in_edges(self, index: int) -> Iterator[tuple[int, int]]:
+        low, high = self._row(self.in_offsets, index)
+        for position in range(low, high):
+            source = self.in_sources[position]
+            weight = self.in_weights[position]
+            if (source, index, weight) not in self.tombstones:
+                yield source, weight
+        yield from self.delta_in.get(index, ())
+
+    @staticmethod
+    def _row(offsets: array, index: int) -> tuple[int, int]:
+        if index + 1 >= len(offsets):
+            return 0, 0
+        return offsets[index], offsets[index + 1]
+
+    def _after_mutation(self, changes: int = 1):
+        self.version += changes
+        self.pending_changes += changes
+        if self.pending_changes >= max(self.merge_threshold, self.edge_count // 8):
+            self.compact()
+
+    @staticmethod
+    def build_columns(size: int, by_destination: bool,
+                       edges: Callable[[], Iterable[tuple[int, int, int]]]) -> tuple[array, array, array]:
+        offsets = array("q", bytes(8 * (size + 1)))
+        for source, destination, _ in edges():
+            offsets[(destination if by_destination else source) + 1] += 1
+        for index in range(size):
+            offsets[index + 1] += offsets[index]
+
+        cursor = array("q", offsets)
+        others = array("i", bytes(4 * offsets[size]))
+        weights = array("q", bytes(8 * offsets[size]))
+        for source, destination, weight in edges():
+            row, other = (destination, source) if by_destination else (source, destination)
+            position = cursor[row]
+            others[position] = other
+            weights[position] = weight
+            cursor[row] = position + 1
+
+        for index in range(size):
+            low, high = offsets[index], offsets[index + 1]
+            if high - low > 1:
+                row_items = sorted(zip(others[low:high], weights[low:high]))
+                others[low:high] = array("i", [item[0] for item in row_items])
+                weights[low:high] = array("q", [item[1] for item in row_items])
+        return offsets, others, weights
@@ -1,17 +1,33 @@
+import copy
+from array import array
 from models.GraphEdge import GraphEdge
 from models.GraphNode import GraphNode
-from typing import Union
+from models.UnionFind import UnionFind
+from typing import Iterable, Iterator, Optional, Union
 from utils.error import Error
 
 class Graph:
     def __init__(self, alias: str, is_directed: bool=False, is_weighted: bool=False):
         self.nodes_to_index: dict[str, int] = {}
-        self.nodes: set[GraphNode] = set()
+        self.index_to_node: list[Optional[GraphNode]] = []
         self.edges: set[GraphEdge] = set()
+        self.edge_index: dict[tuple[int, int], dict[int, GraphEdge]] = {}
         self.adjacency_list: list[set] = []
+        self.incoming_list: list[set] = []
+        self.free_indices: list[int] = []
         self.is_directed: bool = is_directed
         self.is_weighted: bool = is_weighted
+        self.is_compact: bool = False
         self.alias: str = alias
+        self.version: int = 0
+        self.saved_version: int = -1
+        # Copy-on-write state, see snapshot()
+        self.shared: bool = False
+        self.owned_out: Optional[set[int]] = None
+        self.owned_in: Optional[set[int]] = None
+        self.owned_pairs: Optional[set[tuple[int, int]]] = None
+        # Weakly connected components, see components()
+        self.union_find: Optional[UnionFind] = None
 
     def __eq__(self, other):
         if not isinstance(other, Graph):
@@ -21,26 +37,116 @@ class Graph:
     def __hash__(self):
         return hash(self.alias)
 
+    @property
+    def is_dirty(self) -> bool:
+        return self.version != self.saved_version
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes_to_index)
+
+    def number_of_edges(self) -> int:
+        return len(self.edges)
+
+    @property
+    def nodes(self) -> Iterator[GraphNode]:
+        index_to_node = self.index_to_node
+        return (index_to_node[index] for index in self.nodes_to_index.values())
+
     def node_exists(self, name: str) -> bool:
-        node = GraphNode(name)
-        return node in self.nodes
+        return name in self.nodes_to_index
+
+    def neighbor_indices(self, index: int) -> list[int]:
+        # Indices of the nodes a node has edges to, either end for undirected
+        # graphs, in index order
+        nodes_to_index = self.nodes_to_index
+        if self.is_directed:
+            return sorted(nodes_to_index[edge.destination.name] for edge in self.adjacency_list[index])
+        name = self.index_to_node[index].name
+        return sorted(nodes_to_index[edge.source.name if edge.destination.name == name else edge.destination.name]
+                      for edge in self.adjacency_list[index])
+
+    def get_node(self, name: str) -> Optional[GraphNode]:
+        index = self.nodes_to_index.get(name)
+        if index is None:
+            return None
+        return self.index_to_node[index]
+
+    def snapshot(self) -> "Graph":
+        # Returns a read-only view sharing every container with this graph.
+        # The next write gives this graph its own top-level containers, and
+        # inner adjacency sets and weight dicts are copied the first time a
+        # write touches them, so the view never sees a later change.
+        view = copy.copy(self)
+        self.shared = True
+        return view
+
+    def release_snapshots(self):
+        # Called once no view returned by snapshot() is in use any more
+        self.shared = False
+        self.owned_out = self.owned_in = self.owned_pairs = None
+
+    def _detach(self):
+        self.nodes_to_index = dict(self.nodes_to_index)
+        self.index_to_node = list(self.index_to_node)
+        self.edges = set(self.edges)
+        self.edge_index = dict(self.edge_index)
+        self.adjacency_list = list(self.adjacency_list)
+        self.incoming_list = list(self.incoming_list)
+        self.free_indices = list(self.free_indices)
+        self.owned_out, self.owned_in, self.owned_pairs = set(), set(), set()
+        if self.union_find is not None:
+            self.union_find = self.union_find.copy()
+        self.shared = False
+
+    def _own_slots(self, index1: int, index2: int) -> Optional[dict[int, GraphEdge]]:
+        # Copies the inner containers an edge write touches, unless they were
+        # already copied since the last snapshot, and returns the pair's weights
+        owned_out = self.owned_out
+        if index1 not in owned_out:
+            owned_out.add(index1)
+            self.adjacency_list[index1] = set(self.adjacency_list[index1])
+        if not self.is_directed and index2 not in owned_out:
+            owned_out.add(index2)
+            self.adjacency_list[index2] = set(self.adjacency_list[index2])
+        if index2 not in self.owned_in:
+            self.owned_in.add(index2)
+            self.incoming_list[index2] = set(self.incoming_list[index2])
+        key = (index1, index2)
+        weights = self.edge_index.get(key)
+        if weights is not None and key not in self.owned_pairs:
+            self.owned_pairs.add(key)
+            weights = self.edge_index[key] = dict(weights)
+        return weights
 
     def add_node(self, node_name: str) -> Union[None, Error]:
-        if self.node_exists(node_name):
+        if node_name in self.nodes_to_index:
             return Error(1, f"Node {node_name} already exists")
+        if self.shared:
+            self._detach()
         node = GraphNode(node_name)
-        self.nodes.add(node)
-        self.nodes_to_index[node.name] = len(self.adjacency_list)
-        self.adjacency_list.append(set())
+        if self.free_indices:
+            index = self.free_indices.pop()
+            self.index_to_node[index] = node
+        else:
+            index = len(self.adjacency_list)
+            self.index_to_node.append(node)
+            self.adjacency_list.append(set())
+            self.incoming_list.append(set())
+            if self.owned_out is not None:
+                self.owned_out.add(index)
+                self.owned_in.add(index)
+        self.nodes_to_index[node_name] = index
+        if self.union_find is not None:
+            self.union_find.add(index)
+        self.version += 1
         return None
 
-    def add_edge(self, node1_name: str, node2_name: str, weight="") -> Union[None, Error]:
-        node1: GraphNode = GraphNode(node1_name)
-        node2: GraphNode = GraphNode(node2_name)
-
-        if node1 not in self.nodes:
+    def _resolve(self, node1_name: str, node2_name: str, weight) -> Union[tuple[int, int, int], Error]:
+        index1 = self.nodes_to_index.get(node1_name)
+        if index1 is None:
             return Error(1, f"Node {node1_name} does not exist")
-        if node2 not in self.nodes:
+        index2 = self.nodes_to_index.get(node2_name)
+        if index2 is None:
             return Error(1, f"Node {node2_name} does not exist")
 
         if not self.is_weighted:
@@ -50,45 +156,131 @@ class Graph:
             return Error(1, "Weight is required for weighted graph")
 
         weight_int = int(weight) if isinstance(weight, str) else weight
-        edge = GraphEdge(node1, node2, weight_int)
-        if edge in self.edges:
+        return index1, index2, weight_int
+
+    def edge_exists(self, node1_name: str, node2_name: str, weight=None) -> bool:
+        index1 = self.nodes_to_index.get(node1_name)
+        index2 = self.nodes_to_index.get(node2_name)
+        if index1 is None or index2 is None:
+            return False
+        weights = self.edge_index.get((index1, index2))
+        if not weights:
+            return False
+        return weight is None or weight in weights
+
+    def add_edge(self, node1_name: str, node2_name: str, weight="") -> Union[None, Error]:
+        resolved = self._resolve(node1_name, node2_name, weight)
+        if isinstance(resolved, Error):
+            return resolved
+        if not self._insert_edge(*resolved):
             return Error(1, f"Edge from {node1_name} to {node2_name} already exists")
-        self.edges.add(edge)
-        self.adjacency_list[self.nodes_to_index[node1.name]].add(edge)
-        if not self.is_directed:
-            self.adjacency_list[self.nodes_to_index[node2.name]].add(edge)
-            return None
         return None
 
-    def remove_edge(self, node1_name: str, node2_name: str, weight="") -> Union[None, Error]:
-        node1: GraphNode = GraphNode(node1_name)
-        node2: GraphNode = GraphNode(node2_name)
-
-        if node1 not in self.nodes:
-            return Error(1, f"Node {node1_name} does not exist")
-        if node2 not in self.nodes:
-            return Error(1, f"Node {node2_name} does not exist")
+    def _insert_edge(self, index1: int, index2: int, weight_int: int) -> bool:
+        weights = self.edge_index.get((index1, index2))
+        if weights is not None and weight_int in weights:
+            return False
+        if self.shared:
+            self._detach()
+        if self.owned_out is not None:
+            weights = self._own_slots(index1, index2)
+        if weights is None:
+            weights = self.edge_index[(index1, index2)] = {}
+            if self.owned_pairs is not None:
+                self.owned_pairs.add((index1, index2))
+        edge = GraphEdge(self.index_to_node[index1], self.index_to_node[index2], weight_int)
+        weights[weight_int] = edge
+        self.edges.add(edge)
+        self.adjacency_list[index1].add(edge)
+        self.incoming_list[index2].add(edge)
+        if not self.is_directed:
+            self.adjacency_list[index2].add(edge)
+        if self.union_find is not None:
+            self.union_find.union(index1, index2)
+        self.version += 1
+        return True
 
-        if not self.is_weighted:
-            weight = 1
+    def add_nodes_from(self, node_names: Iterable[str]) -> int:
+        added = 0
+        for node_name in node_names:
+            if node_name not in self.nodes_to_index:
+                self.add_node(node_name)
+                added += 1
+        return added
 
-        if self.is_weighted and weight == "":
-            return Error(1, "Weight is required for weighted graph")
+    def add_edges_from(self, edges: Iterable[tuple[str, str, Union[str, int]]]) -> tuple[int, int, int]:
+        # Records are expected to be validated by the caller; missing nodes are
+        # created and duplicate edges are counted instead of reported as errors.
+        if self.shared:
+            self._detach()
+        nodes_to_index = self.nodes_to_index
+        nodes_before = len(nodes_to_index)
+        added = duplicates = 0
+        for node1_name, node2_name, weight in edges:
+            index1 = nodes_to_index.get(node1_name)
+            if index1 is None:
+                self.add_node(node1_name)
+                index1 = nodes_to_index[node1_name]
+            index2 = nodes_to_index.get(node2_name)
+            if index2 is None:
+                self.add_node(node2_name)
+                index2 = nodes_to_index[node2_name]
+            weight_int = int(weight) if self.is_weighted else 1
+            if self._insert_edge(index1, index2, weight_int):
+                added += 1
+            else:
+                duplicates += 1
+        return len(nodes_to_index) - nodes_before, added, duplicates
 
-        weight_int = int(weight) if isinstance(weight, str) else weight
-        edge = GraphEdge(node1, node2, weight_int)
-        if edge not in self.edges:
+    def remove_edge(self, node1_name: str, node2_name: str, weight="") -> Union[None, Error]:
+        resolved = self._resolve(node1_name, node2_name, weight)
+        if isinstance(resolved, Error):
+            return resolved
+        index1, index2, weight_int = resolved
+        edge = self.edge_index.get((index1, index2), {}).get(weight_int)
+        if edge is None:
             return Error(1, f"Edge from {node1_name} to {node2_name} does not exist")
-        self.adjacency_list[self.nodes_to_index[node1.name]].remove(edge)
-        self.edges.remove(edge)
+        self._unlink_edge(edge)
+        return None
 
+    def _unlink_edge(self, edge: GraphEdge):
+        index1 = self.nodes_to_index[edge.source.name]
+        index2 = self.nodes_to_index[edge.destination.name]
+        if self.shared:
+            self._detach()
+        if self.owned_out is not None:
+            self._own_slots(index1, index2)
+        weights = self.edge_index[(index1, index2)]
+        del weights[edge.weight]
+        if not weights:
+            del self.edge_index[(index1, index2)]
+        self.edges.remove(edge)
+        self.adjacency_list[index1].discard(edge)
+        self.incoming_list[index2].discard(edge)
         if not self.is_directed:
-            rev_edge = GraphEdge(node2, node1, weight_int)
-            self.adjacency_list[self.nodes_to_index[node2.name]].remove(rev_edge)
-            self.edges.remove(rev_edge)
-            return None
+            self.adjacency_list[index2].discard(edge)
+        self.union_find = None
+        self.version += 1
 
-        return None
+    def components(self) -> UnionFind:
+        # Kept up to date as nodes and edges are added; a removal drops it and
+        # the next call rebuilds it from the edges
+        union_find = self.union_find
+        if union_find is None:
+            union_find = self.union_find = UnionFind.from_edges(
+                len(self.index_to_node), self.number_of_nodes(), self.edge_index
+            )
+        return union_find
+
+    def connected(self, node1_name: str, node2_name: str) -> Union[bool, Error]:
+        index1 = self.nodes_to_index.get(node1_name)
+        if index1 is None:
+            return Error(1, f"Node {node1_name} does not exist")
+        index2 = self.nodes_to_index.get(node2_name)
+        if index2 is None:
+            return Error(1, f"Node {node2_name} does not exist")
+        union_find = self.components()
+        return union_find.find(index1) == union_find.find(index2)
 
     def dump(self) -> dict:
         return {
@@ -112,57 +304,83 @@ class Graph:
             )
         return graph
 
+    @staticmethod
+    def from_arrays(alias: str, is_directed: bool, is_weighted: bool, names: list[str],
+                    sources: array, destinations: array, weights: array):
+        # Bulk constructor for trusted snapshot data: node names are unique and
+        # every (source, destination, weight) triple appears at most once.
+        graph = Graph(alias, is_directed, is_weighted)
+        nodes = [GraphNode(name) for name in names]
+        adjacency_list = [set() for _ in nodes]
+        incoming_list = [set() for _ in nodes]
+        edge_index = graph.edge_index
+        edges = []
+        for source, destination, weight in zip(sources, destinations, weights):
+            edge = GraphEdge(nodes[source], nodes[destination], weight)
+            edges.append(edge)
+            adjacency_list[source].add(edge)
+            incoming_list[destination].add(edge)
+            if not is_directed:
+                adjacency_list[destination].add(edge)
+            weights_by_pair = edge_index.get((source, destination))
+            if weights_by_pair is None:
+                edge_index[(source, destination)] = {weight: edge}
+            else:
+                weights_by_pair[weight] = edge
+        graph.index_to_node = nodes
+        graph.nodes_to_index = {name: index for index, name in enumerate(names)}
+        graph.adjacency_list = adjacency_list
+        graph.incoming_list = incoming_list
+        graph.edges = set(edges)
+        return graph
+
+    def export_arrays(self) -> tuple[list[str], array, array, array]:
+        dense = array("i", [-1]) * len(self.index_to_node)
+        names = []
+        for index, node in enumerate(self.index_to_node):
+            if node is not None:
+                dense[index] = len(names)
+                names.append(node.name)
+        sources, destinations, weights = array("i"), array("i"), array("q")
+        nodes_to_index = self.nodes_to_index
+        for edge in self.edges:
+            sources.append(dense[nodes_to_index[edge.source.name]])
+            destinations.append(dense[nodes_to_index[edge.destination.name]])
+            weights.append(edge.weight)
+        return names, sources, destinations, weights
+
     def list_edges(self, node1_name: str, node2_name: str):
-        node1_obj: GraphNode = GraphNode(node1_name)
-        node2_obj: GraphNode = GraphNode(node2_name)
-        if node1_obj not in self.nodes:
+        index1 = self.nodes_to_index.get(node1_name)
+        if index1 is None:
             return Error(1, f"Node {node1_name} does not exist")
-        if node2_obj not in self.nodes:
+        index2 = self.nodes_to_index.get(node2_name)
+        if index2 is None:
             return Error(1, f"Node {node2_name} does not exist")
-        return [edge.dump() for edge in self.adjacency_list[self.nodes_to_index[node1_obj.name]] if edge.destination == node2_obj]
+        weights = self.edge_index.get((index1, index2), {})
+        return [edge.dump() for edge in weights.values()]
 
     def list_edges_for_node(self, node_name: str):
-        node_obj: GraphNode = GraphNode(node_name)
-        if node_obj not in self.nodes:
+        index = self.nodes_to_index.get(node_name)
+        if index is None:
             return Error(1, f"Node {node_name} does not exist")
-        return [edge.dump() for edge in self.adjacency_list[self.nodes_to_index[node_obj.name]]]
+        return [edge.dump() for edge in self.adjacency_list[index]]
 
     def remove_node(self, node_name: str) -> Union[None, Error]:
-        node = GraphNode(node_name)
-        if node not in self.nodes:
+        index = self.nodes_to_index.get(node_name)
+        if index is None:
             return Error(1, f"Node {node_name} does not exist")
-        
-        edges_to_remove = []
-        for edge in self.edges:
-            if edge.source == node or edge.destination == node:
-                edges_to_remove.append(edge)
-        
-        for edge in edges_to_remove:
-            self.edges.remove(edge)
-            if edge.source in self.nodes:
-                source_idx = self.nodes_to_index[edge.source.name]
-                if edge in self.adjacency_list[source_idx]:
-                    self.adjacency_list[source_idx].remove(edge)
-            if edge.destination in self.nodes:
-                dest_idx = self.nodes_to_index[edge.destination.name]
-                if edge in self.adjacency_list[dest_idx]:
-                    self.adjacency_list[dest_idx].remove(edge)
-        
-        self.nodes.remove(node)
-        
-        self.adjacency_list.clear()
-        for i, n in enumerate(self.nodes):
-            self.nodes_to_index[n.name] = i
-            self.adjacency_list.append(set())
-        
-        for edge in self.edges:
-            if edge.source in self.nodes and edge.destination in self.nodes:
-                source_idx = self.nodes_to_index[edge.source.name]
-                self.adjacency_list[source_idx].add(edge)
-                if not self.is_directed:
-                    dest_idx = self.nodes_to_index[edge.destination.name]
-                    self.adjacency_list[dest_idx].add(edge)
-        
+
+        for edge in list(self.adjacency_list[index] | self.incoming_list[index]):
+            self._unlink_edge(edge)
+
+        if self.shared:
+            self._detach()
+
+        del self.nodes_to_index[node_name]
+        self.index_to_node[index] = None
+        self.free_indices.append(index)
+        self.union_find = None
+        self.version += 1
         return None
 
 def empty_graph() -> Graph:
@@ -1,10 +1,13 @@
 from models.GraphNode import GraphNode
 
 class GraphEdge:
+    __slots__ = ("source", "destination", "weight", "hash_value")
+
     def __init__(self, source: GraphNode, destination: GraphNode, weight=1):
         self.source = source
         self.destination = destination
         self.weight = weight
+        self.hash_value = hash((source.name, destination.name, weight))
 
     def __eq__(self, other):
         if not isinstance(other, GraphEdge):
@@ -14,7 +17,7 @@ class GraphEdge:
                 self.weight == other.weight)
 
     def __hash__(self):
-        return hash((self.source, self.destination, self.weight))
+        return self.hash_value
 
     def clone(self):
         return GraphEdge(self.source, self.destination, self.weight)
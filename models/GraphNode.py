@@ -1,4 +1,6 @@
 class GraphNode:
+    __slots__ = ("name",)
+
     def __init__(self, name: str) -> None:
         self.name = name
 
@@ -0,0 +1,53 @@
+from array import array
+from typing import Iterable
+
+
+class UnionFind:
+    # Disjoint sets over node indices with path halving and union by rank.
+    # count is the number of sets among live nodes; free node slots are left
+    # as singletons that are not counted.
+    def __init__(self, size: int, count: int):
+        self.parent = array("i", range(size))
+        self.rank = bytearray(size)
+        self.count = count
+
+    @staticmethod
+    def from_edges(size: int, count: int, pairs: Iterable[tuple[int, int]]) -> "UnionFind":
+        union_find = UnionFind(size, count)
+        union = union_find.union
+        for index1, index2 in pairs:
+            union(index1, index2)
+        return union_find
+
+    def copy(self) -> "UnionFind":
+        other = UnionFind(0, self.count)
+        other.parent = array("i", self.parent)
+        other.rank = bytearray(self.rank)
+        return other
+
+    def add(self, index: int):
+        # Registers a new node, either in a free slot or at the end
+        if index == len(self.parent):
+            self.parent.append(index)
+            self.rank.append(0)
+        self.count += 1
+
+    def find(self, index: int) -> int:
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(self, index1: int, index2: int) -> bool:
+        root1, root2 = self.find(index1), self.find(index2)
+        if root1 == root2:
+            return False
+        rank = self.rank
+        if rank[root1] < rank[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        if rank[root1] == rank[root2]:
+            rank[root1] += 1
+        self.count -= 1
+        return True
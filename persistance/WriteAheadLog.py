@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Iterator, Optional
+
+
+class WriteAheadLog:
+    # Every record is written as one JSON line carrying a monotonically
+    # increasing log sequence number (lsn). Records are flushed to the OS on
+    # every append and fsynced in groups of sync_batch records or every
+    # sync_interval seconds, whichever comes first; a timer syncs the last
+    # group once the interval is up if no append does. A checkpoint rotates the
+    # log: records logged so far move to the retired segment, which is
+    # deleted once the checkpoint's snapshot is on disk and replayed before
+    # the live log otherwise.
+    def __init__(self, filename: str, sync_batch: int = 64, sync_interval: float = 1.0):
+        self.filename = filename
+        self.retired_filename = filename + ".1"
+        self.sync_batch = max(1, sync_batch)
+        self.sync_interval = sync_interval
+        self.lsn = 0
+        self.records = 0
+        self.retired_records = 0
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.file = None
+        self.timer: Optional[threading.Timer] = None
+        self.lock = threading.Lock()
+
+    def open(self) -> bool:
+        try:
+            self.file = open(self.filename, "a", encoding="utf-8")
+            if self.file.tell() > 0 and not self._ends_with_newline(self.filename):
+                self.file.write("\n")
+                self.file.flush()
+            return True
+        except OSError as e:
+            logging.error(f"Failed to open write-ahead log {self.filename}: {e}")
+            self.file = None
+            return False
+
+    def replay(self) -> Iterator[dict]:
+        self.retired_records = 0
+        self.records = 0
+        for record in self._read(self.retired_filename):
+            self.retired_records += 1
+            yield record
+        for record in self._read(self.filename):
+            self.records += 1
+            yield record
+
+    def _read(self, filename: str) -> Iterator[dict]:
+        if not os.path.exists(filename):
+            return
+        with open(filename, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Ignoring torn write-ahead log record at {filename}:{line_number}")
+                    continue
+                self.lsn = max(self.lsn, record.get("lsn", 0))
+                yield record
+
+    def append(self, op: str, **fields):
+        with self.lock:
+            if self.file is None:
+                return
+            self.lsn += 1
+            record = {"lsn": self.lsn, "op": op}
+            record.update(fields)
+            self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self.file.flush()
+            self.records += 1
+            self.pending += 1
+            elapsed = time.monotonic() - self.last_sync
+            if self.pending >= self.sync_batch or elapsed >= self.sync_interval:
+                self._sync()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.sync_interval - elapsed, self.sync)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def sync(self):
+        with self.lock:
+            self._sync()
+
+    def _sync(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.file is None or self.pending == 0:
+            return
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def rotate(self) -> int:
+        # Starts an empty log and returns the number of retired records. A
+        # segment left over by a failed checkpoint is kept and appended to.
+        with self.lock:
+            if self.file is None:
+                return 0
+            self._sync()
+            self.file.close()
+            try:
+                if os.path.exists(self.retired_filename):
+                    with open(self.filename, "rb") as source, open(self.retired_filename, "ab") as target:
+                        if target.tell() > 0 and not self._ends_with_newline(self.retired_filename):
+                            target.write(b"\n")
+                        shutil.copyfileobj(source, target)
+                        target.flush()
+                        os.fsync(target.fileno())
+                    os.remove(self.filename)
+                else:
+                    os.replace(self.filename, self.retired_filename)
+                self.retired_records += self.records
+                self.records = 0
+            except OSError as e:
+                # The records stay in the live log, which is replayed as well
+                logging.error(f"Failed to rotate write-ahead log {self.filename}: {e}")
+            self.file = open(self.filename, "a", encoding="utf-8")
+            return self.retired_records
+
+    def discard_retired(self):
+        with self.lock:
+            if os.path.exists(self.retired_filename):
+                os.remove(self.retired_filename)
+            self.retired_records = 0
+
+    def _ends_with_newline(self, filename: str) -> bool:
+        with open(filename, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def size(self) -> int:
+        if self.file is None:
+            return 0
+        return self.file.tell()
+
+    def close(self):
+        with self.lock:
+            if self.file is None:
+                return
+            self._sync()
+            self.file.close()
+            self.file = None
+
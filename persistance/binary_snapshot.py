@@ -0,0 +1,103 @@
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Union
+
+from models.Graph import Graph, empty_graph
+from models.CompactGraph import CompactGraph
+from utils.error import Error
+from utils.file import write_chunks_to_file
+
+BINARY_SNAPSHOT_EXTENSION = ".gdbl"
+BINARY_SNAPSHOT_MAGIC = b"GDBL"
+BINARY_SNAPSHOT_VERSION = 1
+
+FLAG_DIRECTED = 1
+FLAG_WEIGHTED = 2
+FLAG_COMPACT = 4
+
+# magic, version, flags, wal_lsn, alias length, node count, names blob length, edge count
+HEADER = struct.Struct("<4sHHQIIQQ")
+
+
+def is_binary_snapshot(file_name: str) -> bool:
+    return file_name.lower().endswith(BINARY_SNAPSHOT_EXTENSION)
+
+def to_little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def read_bytes(f: BinaryIO, count: int) -> bytes:
+    data = f.read(count)
+    if len(data) != count:
+        raise EOFError("truncated snapshot")
+    return data
+
+def read_array(f: BinaryIO, typecode: str, count: int) -> array:
+    values = array(typecode)
+    values.frombytes(read_bytes(f, values.itemsize * count))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def write_binary_snapshot(data: Union[Graph, CompactGraph], file_name: str, wal_lsn: int = 0):
+    names, sources, destinations, weights = data.export_arrays()
+    encoded_names = [name.encode("utf-8") for name in names]
+    name_lengths = array("I", [len(name) for name in encoded_names])
+    names_blob = b"".join(encoded_names)
+    alias = data.alias.encode("utf-8")
+    flags = ((FLAG_DIRECTED if data.is_directed else 0) |
+             (FLAG_WEIGHTED if data.is_weighted else 0) |
+             (FLAG_COMPACT if data.is_compact else 0))
+    header = HEADER.pack(BINARY_SNAPSHOT_MAGIC, BINARY_SNAPSHOT_VERSION, flags, wal_lsn,
+                         len(alias), len(names), len(names_blob), len(sources))
+    write_chunks_to_file([
+        header,
+        alias,
+        to_little_endian(name_lengths),
+        names_blob,
+        to_little_endian(sources),
+        to_little_endian(destinations),
+        to_little_endian(weights)
+    ], file_name)
+
+def read_binary_snapshot(file_name: str) -> tuple[Union[Graph, CompactGraph], int, Error]:
+    # Every section must have its full length and every edge must name
+    # existing nodes, so a corrupt file is reported instead of loaded
+    try:
+        with open(file_name, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return empty_graph(), 0, Error(1, "truncated snapshot header")
+            magic, version, flags, wal_lsn, alias_length, node_count, names_length, edge_count = HEADER.unpack(header)
+            if magic != BINARY_SNAPSHOT_MAGIC:
+                return empty_graph(), 0, Error(1, "not a GraphDBLite binary snapshot")
+            if version != BINARY_SNAPSHOT_VERSION:
+                return empty_graph(), 0, Error(1, f"unsupported binary snapshot version {version}")
+            alias = read_bytes(f, alias_length).decode("utf-8")
+            name_lengths = read_array(f, "I", node_count)
+            if sum(name_lengths) != names_length:
+                raise ValueError("node name lengths do not match the names section")
+            names_blob = read_bytes(f, names_length)
+            sources = read_array(f, "i", edge_count)
+            destinations = read_array(f, "i", edge_count)
+            weights = read_array(f, "q", edge_count)
+        for ids in (sources, destinations):
+            if ids and (min(ids) < 0 or max(ids) >= node_count):
+                raise ValueError("edge refers to a node id out of range")
+        names = []
+        position = 0
+        for length in name_lengths:
+            names.append(names_blob[position:position + length].decode("utf-8"))
+            position += length
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate node name")
+    except (OSError, EOFError, ValueError, struct.error) as e:
+        return empty_graph(), 0, Error(1, str(e))
+
+    graph_class = CompactGraph if flags & FLAG_COMPACT else Graph
+    graph = graph_class.from_arrays(alias, bool(flags & FLAG_DIRECTED), bool(flags & FLAG_WEIGHTED),
+                                    names, sources, destinations, weights)
+    return graph, wal_lsn, Error(0, "")
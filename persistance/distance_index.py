@@ -0,0 +1,75 @@
+import os
+import struct
+from array import array
+from typing import Optional
+
+from algorithms.LandmarkIndex import LandmarkIndex
+from persistance.binary_snapshot import read_array, to_little_endian
+from utils.error import Error
+from utils.file import write_chunks_to_file
+
+DISTANCE_INDEX_EXTENSION = ".landmarks"
+DISTANCE_INDEX_MAGIC = b"GDLM"
+DISTANCE_INDEX_VERSION = 1
+
+FLAG_DIRECTED = 1
+
+# magic, version, flags, wal_lsn of the graph snapshot, node count, landmark count, names blob length
+HEADER = struct.Struct("<4sHHQIIQ")
+
+
+def write_distance_index(index: LandmarkIndex, file_name: str, wal_lsn: int):
+    # Written next to the graph's snapshot file and tagged with its wal_lsn,
+    # so it is only read back together with the snapshot it was built for
+    encoded_names = [name.encode("utf-8") for name in index.names]
+    name_lengths = array("I", [len(name) for name in encoded_names])
+    names_blob = b"".join(encoded_names)
+    header = HEADER.pack(DISTANCE_INDEX_MAGIC, DISTANCE_INDEX_VERSION,
+                         FLAG_DIRECTED if index.is_directed else 0, wal_lsn,
+                         len(index.names), len(index.landmarks), len(names_blob))
+    tables = index.from_landmarks + index.to_landmarks if index.is_directed else index.from_landmarks
+    write_chunks_to_file([
+        header,
+        to_little_endian(name_lengths),
+        names_blob,
+        to_little_endian(array("i", index.landmarks)),
+        *(to_little_endian(table) for table in tables)
+    ], file_name)
+
+def read_distance_index(file_name: str, wal_lsn: int, graph_version: int) -> tuple[Optional[LandmarkIndex], Error]:
+    # Reads the index only if it was written with the given snapshot
+    try:
+        with open(file_name, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None, Error(1, "truncated distance index header")
+            magic, version, flags, index_lsn, node_count, landmark_count, names_length = HEADER.unpack(header)
+            if magic != DISTANCE_INDEX_MAGIC:
+                return None, Error(1, "not a GraphDBLite distance index")
+            if version != DISTANCE_INDEX_VERSION:
+                return None, Error(1, f"unsupported distance index version {version}")
+            if index_lsn != wal_lsn:
+                return None, Error(1, "distance index belongs to another snapshot")
+            name_lengths = read_array(f, "I", node_count)
+            names_blob = f.read(names_length)
+            landmarks = read_array(f, "i", landmark_count)
+            from_landmarks = [read_array(f, "q", node_count) for _ in range(landmark_count)]
+            is_directed = bool(flags & FLAG_DIRECTED)
+            if is_directed:
+                to_landmarks = [read_array(f, "q", node_count) for _ in range(landmark_count)]
+            else:
+                to_landmarks = from_landmarks
+    except (OSError, EOFError) as e:
+        return None, Error(1, str(e))
+
+    names = []
+    position = 0
+    for length in name_lengths:
+        names.append(names_blob[position:position + length].decode("utf-8"))
+        position += length
+    index = LandmarkIndex(names, list(landmarks), from_landmarks, to_landmarks, is_directed, graph_version)
+    return index, Error(0, "")
+
+def remove_distance_index(file_name: str):
+    if os.path.exists(file_name):
+        os.remove(file_name)
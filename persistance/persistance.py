@@ -1,66 +1,233 @@
+import json
 import logging
-from typing import Union
+import os
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Union
 
 from models.Graph import Graph, empty_graph
+from models.CompactGraph import CompactGraph
 from models.GraphNode import GraphNode
-from utils.constants import save_file_path
+from persistance.binary_snapshot import (
+    BINARY_SNAPSHOT_EXTENSION, is_binary_snapshot, read_binary_snapshot, write_binary_snapshot
+)
+from persistance.distance_index import DISTANCE_INDEX_EXTENSION
+from utils.constants import save_file_path, snapshot_dir, snapshot_format
 from utils.error import Error
-from utils.file import write_json_to_file, read_json_from_file
+from utils.file import write_chunks_to_file, write_json_to_file
+from utils.json_stream import JsonStreamReader
 
+MANIFEST_FORMAT = 2
+GRAPH_HEADER_FIELDS = ("alias", "is_directed", "is_weighted")
+GRAPH_SECTIONS = ("nodes", "edges")
+JSON_BATCH_SIZE = 4096
 
-def dump_data_to_storage(data: list[Graph]):
-    json_data = {
-        "graphs": [get_json_from_graph(graph) for graph in data]
+
+def get_snapshot_file(alias: str) -> str:
+    extension = BINARY_SNAPSHOT_EXTENSION if snapshot_format == "binary" else ".json"
+    return os.path.join(snapshot_dir, f"{_file_stem(alias)}{extension}")
+
+def get_distance_index_file(alias: str) -> str:
+    return os.path.join(snapshot_dir, f"{_file_stem(alias)}{DISTANCE_INDEX_EXTENSION}")
+
+def _file_stem(alias: str) -> str:
+    # Other aliases are hex encoded behind a prefix no alphanumeric alias has
+    return alias if alias.isalnum() else "x_" + alias.encode("utf-8").hex()
+
+def get_manifest_entry(data: Graph, file_name: str) -> dict:
+    return {
+        "alias": data.alias,
+        "is_directed": data.is_directed,
+        "is_weighted": data.is_weighted,
+        "is_compact": data.is_compact,
+        "nodes": data.number_of_nodes(),
+        "edges": data.number_of_edges(),
+        "file": os.path.relpath(file_name, os.path.dirname(os.path.abspath(save_file_path)))
     }
-    write_json_to_file(json_data, save_file_path)
 
-def load_data_from_storage() -> list[Graph]:
-    data = read_json_from_file(save_file_path)
-    if not isinstance(data, dict) or "graphs" not in data:
-        logging.warning("Invalid JSON structure: missing 'graphs' key")
-        return []
-    
+def dump_data_to_storage(data: list[Graph], wal_lsn: int = 0, catalog: Iterable[dict] = ()) -> list[Graph]:
+    # Catalog entries describe graphs that were never materialized; their
+    # snapshot files are still current, so the entries are carried over as is.
+    os.makedirs(snapshot_dir, exist_ok=True)
+    entries = list(catalog)
+    written = []
+    for graph in data:
+        file_name = get_snapshot_file(graph.alias)
+        if graph.is_dirty or not os.path.exists(file_name):
+            write_graph_snapshot(graph, file_name, wal_lsn)
+            written.append(graph)
+        entries.append(get_manifest_entry(graph, file_name))
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "wal_lsn": wal_lsn,
+        "graphs": entries
+    }
+    write_json_to_file(manifest, save_file_path)
+    return written
+
+def load_catalog_from_storage() -> tuple[list[dict], list[tuple[Graph, int]], int]:
+    # Only the manifest is read here. Graphs stored in their own snapshot files
+    # are returned as catalog entries; legacy inline graphs are streamed out of
+    # the manifest and are returned materialized.
+    catalog = []
     graphs = []
-    for graph_data in data["graphs"]:
-        graph, error = get_graph_from_json(graph_data)
-        if not error.is_empty():
-            logging.warning(f"Failed to load graph: {error.message}")
-            continue
-        graphs.append(graph)
-    
-    return graphs
+    wal_lsn = 0
+    has_graphs = False
+    try:
+        with open(save_file_path, "r") as f:
+            reader = JsonStreamReader(f)
+            if reader.peek() is None:
+                return [], [], 0
+            for key in reader.iter_object():
+                if key != "graphs":
+                    value = reader.read_value()
+                    if key == "wal_lsn":
+                        wal_lsn = value
+                    continue
+                has_graphs = True
+                for _ in reader.iter_array():
+                    entry, graph, error = read_graph_object(reader)
+                    if "file" in entry:
+                        catalog.append(entry)
+                    elif not error.is_empty():
+                        logging.warning(f"Failed to load graph: {error.message}")
+                    else:
+                        graphs.append(graph)
+    except FileNotFoundError:
+        return [], [], 0
+    except (OSError, ValueError) as e:
+        logging.warning(f"Failed to read {save_file_path}: {e}")
+        return [], [], 0
+    if not has_graphs:
+        logging.warning("Invalid JSON structure: missing 'graphs' key")
+        return [], [], 0
+
+    return catalog, [(graph, wal_lsn) for graph in graphs], wal_lsn
+
+def read_catalog_graph(entry: dict, default_lsn: int = 0) -> tuple[Graph, int, Error]:
+    file_name = os.path.join(os.path.dirname(os.path.abspath(save_file_path)), entry["file"])
+    graph, graph_lsn, error = read_graph_snapshot(file_name, default_lsn)
+    if error.is_empty():
+        graph.saved_version = graph.version
+    return graph, graph_lsn, error
 
 def get_json_from_graph(data: Graph):
     return {
         "alias": data.alias,
         "is_directed": data.is_directed,
         "is_weighted": data.is_weighted,
+        "is_compact": data.is_compact,
         "nodes": [node.dump() for node in data.nodes],
         "edges": [edge.dump() for edge in data.edges]
     }
 
+def iter_graph_json(data: Graph, wal_lsn: Optional[int] = None) -> Iterator[bytes]:
+    # Encodes the document get_json_from_graph describes a batch of records at
+    # a time. The whole graph is never built as one dict, and other threads get
+    # the interpreter between batches instead of waiting for one long encode.
+    header = {
+        "alias": data.alias,
+        "is_directed": data.is_directed,
+        "is_weighted": data.is_weighted,
+        "is_compact": data.is_compact
+    }
+    if wal_lsn is not None:
+        header["wal_lsn"] = wal_lsn
+    yield json.dumps(header)[:-1].encode("utf-8") + b', "nodes": ['
+    yield from iter_json_records(node.dump() for node in data.nodes)
+    yield b'], "edges": ['
+    yield from iter_json_records(edge.dump() for edge in data.edges)
+    yield b']}'
+
+def iter_json_records(records: Iterable[dict], batch_size: int = JSON_BATCH_SIZE) -> Iterator[bytes]:
+    records = iter(records)
+    separator = b""
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield separator + json.dumps(batch)[1:-1].encode("utf-8")
+        separator = b", "
+
 def save_graph_to_storage(data: Graph, file_name: str):
-    json_data = get_json_from_graph(data)
-    write_json_to_file(json_data, file_name)
+    if is_binary_snapshot(file_name):
+        write_binary_snapshot(data, file_name)
+        return
+    write_chunks_to_file(iter_graph_json(data), file_name)
 
 def get_graph_from_storage(file_name: str) -> tuple[Graph, Error]:
-    data = read_json_from_file(file_name)
-    return get_graph_from_json(data)
+    graph, _, error = read_graph_snapshot(file_name)
+    return graph, error
 
-def get_graph_from_json(data: dict) -> tuple[Graph, Error]:
-    validation_result = validate_graph_json(data)
+def write_graph_snapshot(data: Graph, file_name: str, wal_lsn: int):
+    if is_binary_snapshot(file_name):
+        write_binary_snapshot(data, file_name, wal_lsn)
+        return
+    write_chunks_to_file(iter_graph_json(data, wal_lsn), file_name)
+
+def read_graph_snapshot(file_name: str, default_lsn: int = 0) -> tuple[Graph, int, Error]:
+    if is_binary_snapshot(file_name):
+        if not os.path.exists(file_name):
+            return empty_graph(), 0, Error(1, f"File {file_name} does not exist")
+        return read_binary_snapshot(file_name)
+    try:
+        with open(file_name, "r") as f:
+            header, graph, error = read_graph_object(JsonStreamReader(f))
+    except FileNotFoundError:
+        return empty_graph(), 0, Error(1, f"File {file_name} does not exist")
+    except (OSError, ValueError) as e:
+        return empty_graph(), 0, Error(1, f"Invalid graph file {file_name}: {e}")
+    if not error.is_empty():
+        return empty_graph(), 0, error
+    return graph, header.get("wal_lsn", default_lsn), error
+
+def read_graph_object(reader: JsonStreamReader) -> tuple[dict, Optional[Graph], Error]:
+    # Scalar fields are returned as the header while node and edge records are
+    # added to the graph as they are decoded. Manifest entries carry node and
+    # edge counts instead of arrays and come back without a graph.
+    header = {}
+    sections = {}
+    graph = None
+    buffered = []
+    for key in reader.iter_object():
+        if key not in GRAPH_SECTIONS or reader.peek() != "[":
+            header[key] = reader.read_value()
+            continue
+        if graph is None and all(field in header for field in GRAPH_HEADER_FIELDS):
+            graph = new_graph_from_header(header)
+        if graph is None or (key == "edges" and "nodes" not in sections):
+            # Records that come before the header fields or before the nodes
+            # they refer to have to wait for them
+            buffered.append((key, list(reader.iter_values())))
+        else:
+            add_graph_records(graph, key, reader.iter_values())
+        sections[key] = True
+    if "file" in header:
+        return header, None, Error(0, "")
+
+    validation_result = validate_graph_json({**sections, **header})
     if isinstance(validation_result, Error):
-        return empty_graph(), validation_result
-    graph = Graph(data["alias"], data["is_directed"], data["is_weighted"])
-    for node in data["nodes"]:
-        graph.add_node(GraphNode.load(node).name)
-    for edge in data["edges"]:
-        graph.add_edge(
-            edge["source"],
-            edge["destination"],
-            edge["weight"]
-        )
-    return graph, Error(0, "")
+        return header, None, validation_result
+    if graph is None:
+        graph = new_graph_from_header(header)
+    for key, records in sorted(buffered, key=lambda section: GRAPH_SECTIONS.index(section[0])):
+        add_graph_records(graph, key, records)
+    if graph.is_compact:
+        graph.compact()
+    return header, graph, Error(0, "")
+
+def new_graph_from_header(header: dict) -> Union[Graph, CompactGraph]:
+    if header.get("is_compact", False):
+        return CompactGraph(header["alias"], header["is_directed"], header["is_weighted"])
+    return Graph(header["alias"], header["is_directed"], header["is_weighted"])
+
+def add_graph_records(graph: Union[Graph, CompactGraph], key: str, records: Iterable[dict]):
+    if key == "nodes":
+        graph.add_nodes_from(GraphNode.load(node).name for node in records)
+    elif graph.is_compact:
+        graph.add_edges_from((edge["source"], edge["destination"], edge["weight"]) for edge in records)
+    else:
+        for edge in records:
+            graph.add_edge(edge["source"], edge["destination"], edge["weight"])
 
 def validate_graph_json(data: dict) -> Union[bool, Error]:
     if "alias" not in data:
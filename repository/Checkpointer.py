@@ -0,0 +1,66 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from repository.GraphRepository import GraphRepository
+from utils.error import Error
+
+FAILURE_BACKOFF_SECONDS = 30.0
+
+
+class Checkpointer:
+    # Checkpoints the repository from a background thread once interval
+    # seconds have passed since the last checkpoint with changes pending, or
+    # as soon as dirty_records log records are pending. A trigger set to 0 is
+    # disabled. Checkpoints only lock the graphs while they are snapshotted,
+    # so commands keep running while the files are written.
+    def __init__(self, repository: GraphRepository, interval: float, dirty_records: int,
+                 poll_interval: float = 1.0):
+        self.repository = repository
+        self.interval = interval
+        self.dirty_records = dirty_records
+        self.poll_interval = min(poll_interval, interval) if interval > 0 else poll_interval
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0 or self.dirty_records > 0
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.thread is not None or not self.enabled:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="checkpointer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        # Waits for a checkpoint in progress to finish
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def due(self) -> bool:
+        pending = self.repository.pending_changes()
+        if pending == 0:
+            return False
+        if 0 < self.dirty_records <= pending:
+            return True
+        return self.interval > 0 and time.monotonic() - self.repository.last_checkpoint_time >= self.interval
+
+    def run(self):
+        wait = self.poll_interval
+        while not self.stop_event.wait(wait):
+            wait = self.poll_interval
+            try:
+                if self.due() and isinstance(self.repository.checkpoint(background=True), Error):
+                    wait = FAILURE_BACKOFF_SECONDS
+            except Exception as e:
+                logging.error(f"Background checkpoint failed: {e}")
+                wait = FAILURE_BACKOFF_SECONDS
@@ -1,132 +1,642 @@
+import itertools
 import logging
-from typing import Union
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
 from models.Graph import Graph
-from persistance.persistance import load_data_from_storage, get_graph_from_storage, dump_data_to_storage
+from models.CompactGraph import CompactGraph
+from persistance.distance_index import read_distance_index, remove_distance_index, write_distance_index
+from persistance.persistance import (
+    load_catalog_from_storage, read_catalog_graph, get_graph_from_storage, dump_data_to_storage,
+    save_graph_to_storage, get_snapshot_file, get_distance_index_file
+)
+from persistance.WriteAheadLog import WriteAheadLog
+from utils.constants import save_file_path, wal_file_path, wal_sync_batch, wal_sync_interval
 from utils.error import Error
+from utils.locks import ReadWriteLock
+
+# get_derived() name of the landmark distance index, which checkpoints write
+# next to the graph's snapshot file
+DISTANCE_INDEX = "distance"
+# Most nodes or edges one write-ahead log record of a bulk command carries
+WAL_BULK_CHUNK = 65536
 
 
 class GraphRepository:
+    # Locking: each graph has a ReadWriteLock in self.locks, so readers of a
+    # graph run in parallel while its writers are serialized. self.lock is
+    # held exclusively to create, load and checkpoint graphs, and
+    # self.catalog_lock guards materializing graphs out of the catalog. Locks
+    # are always taken in that order: repository, graph, catalog, snapshot.
+    #
+    # Snapshots: pin_snapshot() returns an id and a copy-on-write view of a
+    # graph that stays stable while writers continue. Views are reclaimed
+    # when released; once a graph has no pinned view its writers stop copying.
+    # get_derived() caches data built from a snapshot, such as the adjacency
+    # arrays algorithms run on, until the graph's next write. A distance index
+    # is also saved by checkpoints and restored with the graph's snapshot.
     def __init__(self, load_from_disk: bool = False):
+        self.lock = ReadWriteLock()
+        self.catalog_lock = threading.Lock()
+        self.checkpoint_lock = threading.Lock()
+        self.snapshot_lock = threading.Lock()
+        self.snapshots: dict[int, tuple[Union[Graph, CompactGraph], Union[Graph, CompactGraph]]] = {}
+        self.snapshot_ids = itertools.count(1)
+        self.derived: dict[tuple[str, str], tuple[Union[Graph, CompactGraph], int, Any]] = {}
+        self.saved_indexes: dict[str, tuple[Any, int]] = {}
+        self.checkpoints = 0
+        self.background_checkpoints = 0
+        self.failed_checkpoints = 0
+        self.last_checkpoint: Optional[dict] = None
+        self.last_checkpoint_error: Optional[str] = None
+        self.last_checkpoint_time = time.monotonic()
+        self.locks: dict[str, ReadWriteLock] = {}
         self.graphs: dict[str, Graph] = {}
+        self.catalog: dict[str, dict] = {}
+        self.graph_lsns: dict[str, int] = {}
+        self.snapshot_lsn: int = 0
+        self.wal: Optional[WriteAheadLog] = None
         if load_from_disk:
+            self.wal = WriteAheadLog(wal_file_path, wal_sync_batch, wal_sync_interval)
             self.load()
+            if not self.wal.open():
+                self.wal = None
 
     def load(self):
-        graphs_list = load_data_from_storage()
-        graphs = {}
-        for graph in graphs_list:
-            graphs[graph.alias] = graph
-        self.graphs = graphs
-
-    def create_graph(self, alias: str, is_directed: bool = False, is_weighted: bool = False):
-        graph = Graph(alias, is_directed, is_weighted)
-        self.graphs[alias] = graph
+        # Graphs with their own snapshot file stay in the catalog until a
+        # command touches them; only graphs with log records to replay are
+        # materialized here.
+        catalog, graphs_list, snapshot_lsn = load_catalog_from_storage()
+        self.catalog = {entry["alias"]: entry for entry in catalog}
+        self.graphs = {}
+        self.graph_lsns = {}
+        self.snapshot_lsn = snapshot_lsn
+        for graph, graph_lsn in graphs_list:
+            self.graphs[graph.alias] = graph
+            self.graph_lsns[graph.alias] = graph_lsn
+        if self.wal is not None:
+            self.replay_log()
+        self.locks = {alias: ReadWriteLock() for alias in self.list_graphs()}
+
+    def replay_log(self):
+        replayed = 0
+        for record in self.wal.replay():
+            alias = record.get("alias")
+            if alias in self.catalog:
+                self._materialize(alias)
+            if record["lsn"] <= self.graph_lsns.get(alias, self.snapshot_lsn):
+                continue
+            try:
+                self._apply_log_record(record)
+                replayed += 1
+            except (KeyError, ValueError) as e:
+                logging.warning(f"Skipping write-ahead log record {record.get('lsn')}: {e}")
+        self.wal.lsn = max(self.wal.lsn, self.snapshot_lsn)
+        if replayed:
+            logging.info(f"Replayed {replayed} write-ahead log record(s) from {self.wal.filename}")
+
+    def _apply_log_record(self, record: dict):
+        op = record["op"]
+        if op == "create_graph":
+            self.graphs[record["alias"]] = self._new_graph(
+                record["alias"], record["is_directed"], record["is_weighted"], record["is_compact"]
+            )
+            return
+        if op == "load_graph":
+            graph, error = get_graph_from_storage(record["filename"])
+            if error.is_empty():
+                self.catalog.pop(graph.alias, None)
+                self.graphs[graph.alias] = graph
+            return
+        graph = self.graphs[record["alias"]]
+        if op == "add_node":
+            graph.add_node(record["node"])
+        elif op == "add_nodes":
+            graph.add_nodes_from(record["nodes"])
+        elif op == "add_edges":
+            graph.add_edges_from(record["edges"])
+        elif op == "remove_node":
+            graph.remove_node(record["node"])
+        elif op == "add_edge":
+            graph.add_edge(record["source"], record["destination"], record["weight"])
+        elif op == "bulk_add_edge":  # one record per edge, as older versions logged bulk input
+            graph.add_edges_from([(record["source"], record["destination"], record["weight"])])
+        elif op == "remove_edge":
+            graph.remove_edge(record["source"], record["destination"], record["weight"])
+        else:
+            raise ValueError(f"unknown operation {op}")
+
+    def _log(self, op: str, **fields):
+        if self.wal is not None:
+            self.wal.append(op, **fields)
+
+    def _logged_nodes(self, alias: str, node_names: Iterable[str]) -> Iterator[str]:
+        # Bulk input is logged one record per WAL_BULK_CHUNK items, each
+        # logged before its items are applied. Repeats within a chunk are
+        # logged once; replaying them would only add duplicates again.
+        for chunk in self._chunks(node_names):
+            self.wal.append("add_nodes", alias=alias, nodes=list(dict.fromkeys(chunk)))
+            yield from chunk
+
+    def _logged_edges(self, alias: str, edges: Iterable[tuple[str, str, str]]) -> Iterator[tuple[str, str, str]]:
+        for chunk in self._chunks(edges):
+            self.wal.append("add_edges", alias=alias, edges=list(dict.fromkeys(chunk)))
+            yield from chunk
+
+    @staticmethod
+    def _chunks(items: Iterable) -> Iterator[list]:
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == WAL_BULK_CHUNK:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _new_graph(alias: str, is_directed: bool, is_weighted: bool, is_compact: bool) -> Union[Graph, CompactGraph]:
+        if is_compact:
+            return CompactGraph(alias, is_directed, is_weighted)
+        return Graph(alias, is_directed, is_weighted)
+
+    def _locked(self, alias: str, write: bool = False) -> "LockedGraph":
+        return LockedGraph(self, alias, write)
+
+    def create_graph(self, alias: str, is_directed: bool = False, is_weighted: bool = False, is_compact: bool = False):
+        with self.lock.write():
+            self.graphs[alias] = self._new_graph(alias, is_directed, is_weighted, is_compact)
+            self.locks.setdefault(alias, ReadWriteLock())
+            self._log("create_graph", alias=alias, is_directed=is_directed, is_weighted=is_weighted, is_compact=is_compact)
 
     def create_edge(self, alias: str, node1: str, node2: str, weight: str = "") -> Union[None, Error]:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return Error(1, f"Graph {alias} does not exist")
+        with self._locked(alias, write=True) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
 
-        if not graph.node_exists(node1):
-            return Error(1, f"Node {node1} does not exist in graph {alias}")
+            if not graph.node_exists(node1):
+                return Error(1, f"Node {node1} does not exist in graph {alias}")
 
-        if not graph.node_exists(node2):
-            return Error(1, f"Node {node2} does not exist in graph {alias}")
+            if not graph.node_exists(node2):
+                return Error(1, f"Node {node2} does not exist in graph {alias}")
 
-        return graph.add_edge(node1, node2, weight)
+            result = graph.add_edge(node1, node2, weight)
+            if result is None:
+                self._log("add_edge", alias=alias, source=node1, destination=node2, weight=weight)
+            return result
 
     def add_node(self, alias: str, node_name: str) -> Union[None, Error]:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return Error(1, f"Graph {alias} does not exist")
-        return self.graphs[alias].add_node(node_name)
+        with self._locked(alias, write=True) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            result = graph.add_node(node_name)
+            if result is None:
+                self._log("add_node", alias=alias, node=node_name)
+            return result
+
+    def add_nodes_bulk(self, alias: str, node_names: Iterable[str]) -> Union[int, Error]:
+        with self._locked(alias, write=True) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            if self.wal is None:
+                return graph.add_nodes_from(node_names)
+            added = graph.add_nodes_from(self._logged_nodes(alias, node_names))
+            self.wal.sync()
+            return added
+
+    def add_edges_bulk(self, alias: str, edges: Iterable[tuple[str, str, str]]) -> Union[tuple[int, int, int], Error]:
+        with self._locked(alias, write=True) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            if self.wal is None:
+                return graph.add_edges_from(edges)
+            counts = graph.add_edges_from(self._logged_edges(alias, edges))
+            self.wal.sync()
+            return counts
 
     def remove_edge(self, alias: str, node1: str, node2: str, weight: str = "") -> Union[None, Error]:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return Error(1, f"Graph {alias} does not exist")
-        return self.graphs[alias].remove_edge(node1, node2, weight)
+        with self._locked(alias, write=True) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            result = graph.remove_edge(node1, node2, weight)
+            if result is None:
+                self._log("remove_edge", alias=alias, source=node1, destination=node2, weight=weight)
+            return result
 
     def remove_node(self, alias: str, node_name: str) -> Union[None, Error]:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return Error(1, f"Graph {alias} does not exist")
-        return self.graphs[alias].remove_node(node_name)
+        with self._locked(alias, write=True) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            result = graph.remove_node(node_name)
+            if result is None:
+                self._log("remove_node", alias=alias, node=node_name)
+            return result
+
+    def _materialize(self, alias: str) -> Union[Error, Graph, CompactGraph]:
+        graph, graph_lsn, error = read_catalog_graph(self.catalog[alias], self.snapshot_lsn)
+        if not error.is_empty():
+            del self.catalog[alias]
+            logging.warning(f"Failed to load graph {alias}: {error.message}")
+            return Error(1, f"Failed to load graph {alias}: {error.message}")
+        # Publish the graph before dropping the catalog entry so the alias never disappears
+        self.graphs[alias] = graph
+        self.graph_lsns[alias] = graph_lsn
+        del self.catalog[alias]
+        self._restore_distance_index(alias, graph, graph_lsn)
+        return graph
+
+    def _restore_distance_index(self, alias: str, graph: Union[Graph, CompactGraph], graph_lsn: int):
+        file_name = get_distance_index_file(alias)
+        if not os.path.exists(file_name):
+            return
+        index, error = read_distance_index(file_name, graph_lsn, graph.version)
+        if not error.is_empty():
+            logging.info(f"Not restoring distance index of graph {alias}: {error.message}")
+            return
+        with self.snapshot_lock:
+            self.derived[(alias, DISTANCE_INDEX)] = (graph, graph.version, index)
+        self.saved_indexes[alias] = (index, graph_lsn)
 
-    def get_graph(self, alias: str) -> Union[Error, Graph]:
-        if alias not in self.graphs:
-            return Error(1, f"Graph {alias} does not exist")
-        return self.graphs[alias]
+    def get_graph(self, alias: str) -> Union[Error, Graph, CompactGraph]:
+        graph = self.graphs.get(alias)
+        if graph is not None:
+            return graph
+        with self.catalog_lock:
+            graph = self.graphs.get(alias)
+            if graph is not None:
+                return graph
+            if alias in self.catalog:
+                return self._materialize(alias)
+        return Error(1, f"Graph {alias} does not exist")
 
     def graph_exists(self, alias: str) -> bool:
-        return alias in self.graphs
+        return alias in self.graphs or alias in self.catalog
 
     def node_exists(self, alias: str, node_name: str) -> bool:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return False
-        return graph.node_exists(node_name)
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return False
+            return graph.node_exists(node_name)
+
+    def edge_exists(self, alias: str, node1: str, node2: str) -> bool:
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return False
+            return graph.edge_exists(node1, node2)
 
     def is_weighted(self, alias: str) -> bool:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return False
-        return graph.is_weighted
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return False
+            return graph.is_weighted
 
     def is_directed(self, alias: str) -> bool:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return False
-        return graph.is_directed
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return False
+            return graph.is_directed
 
     def list_graphs(self) -> list[str]:
-        return list(self.graphs.keys())
+        with self.catalog_lock:
+            return list(self.graphs.keys()) + list(self.catalog.keys())
+
+    def describe_graph(self, alias) -> Union[Error, tuple[str, bool, bool, int, int]]:
+        entry = self.catalog.get(alias)
+        if entry is not None and "nodes" in entry and "edges" in entry:
+            return alias, entry["is_directed"], entry["is_weighted"], entry["nodes"], entry["edges"]
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            return graph.alias, graph.is_directed, graph.is_weighted, graph.number_of_nodes(), graph.number_of_edges()
 
-    def describe_graph(self, alias)  -> Union[Error, tuple[str, bool, bool]]:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return Error(1, f"Graph {alias} does not exist")
-        return graph.alias, graph.is_directed, graph.is_weighted
+    def count_components(self, alias: str) -> Union[tuple[int, int], Error]:
+        # (weakly connected components, nodes); see Graph.components()
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            return graph.components().count, graph.number_of_nodes()
+
+    def connected(self, alias: str, node1: str, node2: str) -> Union[bool, Error]:
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            return graph.connected(node1, node2)
 
     def list_nodes(self, alias):
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return Error(1, f"Graph {alias} does not exist")
-        return [node.name for node in graph.nodes]
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            return [node.name for node in graph.nodes]
 
     def list_edges(self, alias: str, node1: str, node2: str):
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return Error(1, f"Graph {alias} does not exist")
-        if len(node1) == 0 and len(node2) == 0:
-            return [edge.dump() for edge in graph.edges]
-        elif len(node1) != 0 and len(node2) != 0:
-            return graph.list_edges(node1, node2)
-        else:
-            return graph.list_edges_for_node(node1 if len(node1) != 0 else node2)
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            if len(node1) == 0 and len(node2) == 0:
+                return [edge.dump() for edge in graph.edges]
+            elif len(node1) != 0 and len(node2) != 0:
+                return graph.list_edges(node1, node2)
+            else:
+                return graph.list_edges_for_node(node1 if len(node1) != 0 else node2)
+
+    def pin_snapshot(self, alias: str) -> Union[tuple[int, Union[Graph, CompactGraph]], Error]:
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            with self.snapshot_lock:
+                return self._pin(graph)
+
+    def _pin(self, graph: Union[Graph, CompactGraph]) -> tuple[int, Union[Graph, CompactGraph]]:
+        snapshot_id = next(self.snapshot_ids)
+        view = graph.snapshot()
+        self.snapshots[snapshot_id] = (graph, view)
+        return snapshot_id, view
+
+    def get_snapshot(self, snapshot_id: int) -> Union[Graph, CompactGraph, Error]:
+        with self.snapshot_lock:
+            pinned = self.snapshots.get(snapshot_id)
+        if pinned is None:
+            return Error(1, f"Snapshot {snapshot_id} does not exist")
+        return pinned[1]
+
+    def release_snapshot(self, snapshot_id: int):
+        # The last release resets the graph's copy-on-write state, which its
+        # writers use, so that happens under the graph's write lock. It is
+        # taken after snapshot_lock is dropped and the pins are checked again.
+        with self.snapshot_lock:
+            pinned = self.snapshots.pop(snapshot_id, None)
+            if pinned is None:
+                return
+            graph = pinned[0]
+            if any(other is graph for other, _ in self.snapshots.values()):
+                return
+        lock = self.locks.get(graph.alias)
+        if lock is None or self.graphs.get(graph.alias) is not graph:
+            return
+        with lock.write():
+            with self.snapshot_lock:
+                if not any(other is graph for other, _ in self.snapshots.values()):
+                    graph.release_snapshots()
+
+    def snapshot(self, alias: str) -> "PinnedSnapshot":
+        return PinnedSnapshot(self, alias)
+
+    def get_derived(self, alias: str, name: str,
+                    build: Optional[Callable[[Union[Graph, CompactGraph]], Any]] = None) -> Any:
+        # Returns build(snapshot) for the graph's current version. The build
+        # runs on a pinned snapshot without holding the graph's lock. Without
+        # a build function, returns None unless a current value is cached.
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            with self.snapshot_lock:
+                cached = self.derived.get((alias, name))
+                if cached is not None and cached[0] is graph and cached[1] == graph.version:
+                    return cached[2]
+                if build is None:
+                    return None
+                snapshot_id, view = self._pin(graph)
+        try:
+            value = build(view)
+        finally:
+            self.release_snapshot(snapshot_id)
+        with self.snapshot_lock:
+            cached = self.derived.get((alias, name))
+            if cached is None or cached[0] is not graph or cached[1] < view.version:
+                self.derived[(alias, name)] = (graph, view.version, value)
+        return value
+
+    def has_derived(self, alias: str, name: str) -> bool:
+        # Whether a value was ever cached for this graph, current or not
+        graph = self.graphs.get(alias)
+        with self.snapshot_lock:
+            cached = self.derived.get((alias, name))
+        return graph is not None and cached is not None and cached[0] is graph
+
+    def put_derived(self, alias: str, name: str, version: int, value: Any) -> Union[None, Error]:
+        # Caches a value built by the caller from the given graph version
+        with self._locked(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            with self.snapshot_lock:
+                self.derived[(alias, name)] = (graph, version, value)
+        return None
+
+    def save_graph(self, alias: str, filename: str) -> Union[None, Error]:
+        with self.snapshot(alias) as graph:
+            if isinstance(graph, Error):
+                return Error(1, f"Graph {alias} does not exist")
+            save_graph_to_storage(graph, filename)
+            return None
 
     def load_graph(self, filename: str) -> Union[None, Error]:
+        # The log record names the loaded file, which may change or go away
+        # later, so a checkpoint writes the graph's own snapshot before the
+        # load returns. Replay reads the file only after a crash in between.
         graph, error = get_graph_from_storage(filename)
-        if error.is_empty():
-            self.graphs[graph.alias] = graph
-            return None
-        else:
+        if not error.is_empty():
             logging.error(error)
             return error
-    
+        with self.lock.write():
+            lock = self.locks.setdefault(graph.alias, ReadWriteLock())
+            with lock.write():
+                with self.catalog_lock:
+                    self.graphs[graph.alias] = graph
+                    self.catalog.pop(graph.alias, None)
+                self._log("load_graph", filename=os.path.abspath(filename))
+        if self.wal is not None:
+            result = self.checkpoint()
+            if isinstance(result, Error):
+                return result
+        return None
+
     def load_graphs(self) -> Union[None, Error]:
-        graphs_list = load_data_from_storage()
-        graphs = {}
-        for graph in graphs_list:
-            graphs[graph.alias] = graph
-        self.graphs = graphs
+        with self.lock.write():
+            self.load()
         return None
 
     def save_all_graphs(self) -> Union[None, Error]:
+        result = self.checkpoint()
+        if isinstance(result, Error):
+            return result
+        return None
+
+    def checkpoint(self, background: bool = False) -> Union[tuple[int, int], Error]:
+        # Locks are held only while every graph is snapshotted and the log is
+        # rotated, so the snapshots match the log position exactly. They are
+        # written with no lock held; records logged meanwhile go to the new
+        # log segment and are replayed on top of them after a restart.
+        with self.checkpoint_lock:
+            started = time.perf_counter()
+            with self.lock.write():
+                graph_locks = [self.locks[alias] for alias in sorted(self.locks)]
+                for lock in graph_locks:
+                    lock.acquire_read()
+                try:
+                    with self.catalog_lock:
+                        graphs_list = list(self.graphs.values())
+                        catalog = list(self.catalog.values())
+                    with self.snapshot_lock:
+                        pinned = [self._pin(graph) for graph in graphs_list]
+                    wal_lsn = 0
+                    compacted = 0
+                    if self.wal is not None:
+                        compacted = self.wal.rotate()
+                        wal_lsn = self.wal.lsn
+                finally:
+                    for lock in graph_locks:
+                        lock.release_read()
+            try:
+                result = self._checkpoint(graphs_list, [view for _, view in pinned], catalog, wal_lsn, compacted)
+            finally:
+                for snapshot_id, _ in pinned:
+                    self.release_snapshot(snapshot_id)
+            self._record_checkpoint(result, background, started, len(graphs_list) + len(catalog))
+            return result if isinstance(result, Error) else result[:2]
+
+    def _checkpoint(self, graphs_list: list, views: list, catalog: list[dict],
+                    wal_lsn: int, compacted: int) -> Union[tuple[int, int, int], Error]:
         try:
-            graphs_list = list(self.graphs.values())
-            dump_data_to_storage(graphs_list)
-            return None
+            written = dump_data_to_storage(views, wal_lsn, catalog)
+            size = os.path.getsize(save_file_path)
+            size += sum(os.path.getsize(get_snapshot_file(graph.alias)) for graph in written)
         except Exception as e:
+            # The retired log segment is kept and replayed, so nothing is lost
             logging.error(f"Failed to save graphs: {e}")
             return Error(1, f"Failed to save graphs: {str(e)}")
+        for graph, view in zip(graphs_list, views):
+            graph.saved_version = view.version
+        for view in written:
+            self.graph_lsns[view.alias] = wal_lsn
+        try:
+            size += self._save_distance_indexes(graphs_list, views)
+        except Exception as e:
+            # The index is optional; a failure only means it is rebuilt later
+            logging.warning(f"Failed to save distance index: {e}")
+        if self.wal is not None:
+            self.wal.discard_retired()
+        return len(written), compacted, size
+
+    def _save_distance_indexes(self, graphs_list: list, views: list) -> int:
+        # Writes each graph's distance index if it matches the snapshot just
+        # saved, and removes the file of an index that no longer does
+        size = 0
+        for graph, view in zip(graphs_list, views):
+            alias = view.alias
+            with self.snapshot_lock:
+                cached = self.derived.get((alias, DISTANCE_INDEX))
+            file_name = get_distance_index_file(alias)
+            graph_lsn = self.graph_lsns.get(alias, self.snapshot_lsn)
+            if cached is None or cached[0] is not graph or cached[1] != view.version:
+                if alias in self.saved_indexes and self.saved_indexes[alias][1] != graph_lsn:
+                    remove_distance_index(file_name)
+                    del self.saved_indexes[alias]
+                continue
+            index = cached[2]
+            if self.saved_indexes.get(alias) == (index, graph_lsn):
+                continue
+            write_distance_index(index, file_name, graph_lsn)
+            self.saved_indexes[alias] = (index, graph_lsn)
+            size += os.path.getsize(file_name)
+        return size
+
+    def _record_checkpoint(self, result: Union[tuple[int, int, int], Error], background: bool,
+                           started: float, graphs: int):
+        if isinstance(result, Error):
+            self.failed_checkpoints += 1
+            self.last_checkpoint_error = result.message
+            return
+        written, compacted, size = result
+        self.checkpoints += 1
+        if background:
+            self.background_checkpoints += 1
+        self.last_checkpoint_time = time.monotonic()
+        self.last_checkpoint = {
+            "finished": time.time(),
+            "seconds": time.perf_counter() - started,
+            "background": background,
+            "graphs": graphs,
+            "written": written,
+            "records": compacted,
+            "bytes": size
+        }
+
+    def pending_changes(self) -> int:
+        # Log records since the last checkpoint, or dirty graphs when there is no log
+        if self.wal is not None:
+            return self.wal.records
+        return sum(1 for graph in list(self.graphs.values()) if graph.is_dirty)
+
+    def checkpoint_status(self) -> dict:
+        return {
+            "count": self.checkpoints,
+            "background": self.background_checkpoints,
+            "failures": self.failed_checkpoints,
+            "last": self.last_checkpoint,
+            "last_error": self.last_checkpoint_error,
+            "pending": self.pending_changes()
+        }
+
+    def lock_stats(self) -> list[tuple[str, dict]]:
+        stats = [("repository", self.lock.stats())]
+        for alias in sorted(self.locks):
+            stats.append((alias, self.locks[alias].stats()))
+        return stats
+
+    def close(self):
+        if self.wal is not None:
+            self.wal.close()
+
+
+class LockedGraph:
+    # Context manager that holds a graph's read or write lock and yields the
+    # graph, or an Error when the alias is unknown.
+    __slots__ = ("repository", "alias", "write", "lock")
+
+    def __init__(self, repository: GraphRepository, alias: str, write: bool):
+        self.repository = repository
+        self.alias = alias
+        self.write = write
+        self.lock = None
+
+    def __enter__(self) -> Union[Error, Graph, CompactGraph]:
+        lock = self.repository.locks.get(self.alias)
+        if lock is None:
+            return Error(1, f"Graph {self.alias} does not exist")
+        if self.write:
+            lock.acquire_write()
+        else:
+            lock.acquire_read()
+        self.lock = lock
+        return self.repository.get_graph(self.alias)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.lock is None:
+            return
+        if self.write:
+            self.lock.release_write()
+        else:
+            self.lock.release_read()
+
+
+class PinnedSnapshot:
+    # Context manager that pins a snapshot of a graph and yields the view, or
+    # an Error when the alias is unknown. The snapshot is released on exit.
+    __slots__ = ("repository", "alias", "snapshot_id")
+
+    def __init__(self, repository: GraphRepository, alias: str):
+        self.repository = repository
+        self.alias = alias
+        self.snapshot_id = None
+
+    def __enter__(self) -> Union[Error, Graph, CompactGraph]:
+        pinned = self.repository.pin_snapshot(self.alias)
+        if isinstance(pinned, Error):
+            return pinned
+        self.snapshot_id, view = pinned
+        return view
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.snapshot_id is not None:
+            self.repository.release_snapshot(self.snapshot_id)
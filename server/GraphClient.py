@@ -0,0 +1,61 @@
+import json
+import socket
+from typing import Iterable, Optional
+
+from utils.constants import DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT
+
+
+class GraphClient:
+    # Blocking client for GraphServer. Each response is a dict with the
+    # request's "line" number, the "command", an "ok" flag, the status
+    # "messages" and any listed "output" lines.
+    def __init__(self, host: str = DEFAULT_SERVER_HOST, port: int = DEFAULT_SERVER_PORT,
+                 unix_path: Optional[str] = None, timeout: Optional[float] = None):
+        if unix_path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(unix_path)
+        else:
+            self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.socket.makefile("rwb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def execute(self, command: str) -> dict:
+        return self.pipeline([command])[0]
+
+    def pipeline(self, commands: Iterable[str], batch_size: int = 1024) -> list[dict]:
+        # Commands are sent batch_size at a time, so neither side can fill its
+        # socket buffer while the other is still writing.
+        responses = []
+        batch = []
+        for command in commands:
+            batch.append(command)
+            if len(batch) >= batch_size:
+                responses.extend(self._round_trip(batch))
+                batch = []
+        if batch:
+            responses.extend(self._round_trip(batch))
+        return responses
+
+    def _round_trip(self, commands: list[str]) -> list[dict]:
+        payload = "".join(command.replace("\n", " ") + "\n" for command in commands)
+        self.file.write(payload.encode("utf-8"))
+        self.file.flush()
+        responses = []
+        for _ in commands:
+            line = self.file.readline()
+            if not line:
+                break
+            responses.append(json.loads(line))
+        if len(responses) < len(commands) and not (responses and responses[-1]["command"].strip().upper() == "EXIT"):
+            raise ConnectionError("server closed the connection")
+        return responses
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
@@ -0,0 +1,131 @@
+import asyncio
+import io
+import logging
+import os
+import signal
+import stat
+from typing import Optional
+
+from cli.cli import GraphDBLiteCLI
+from cli.output import JsonLinesOutput
+from utils.constants import DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT
+
+READ_SIZE = 1 << 16
+MAX_REQUEST_BYTES = 1 << 20
+
+
+class GraphServer:
+    # Serves the CLI command grammar on a local TCP or Unix socket. Every line
+    # a client sends is one command and gets exactly one JSON line back, in
+    # order. Clients may pipeline: all complete lines already received are
+    # executed back to back and their responses go out in a single write.
+    # Commands run on the event loop thread, so they are serialized across
+    # connections against the one in-memory repository held by the CLI.
+    def __init__(self, cli: GraphDBLiteCLI, host: str = DEFAULT_SERVER_HOST, port: int = DEFAULT_SERVER_PORT,
+                 unix_path: Optional[str] = None):
+        self.cli = cli
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.connections = 0
+        self.requests = 0
+
+    @property
+    def address(self) -> str:
+        if self.unix_path is not None:
+            return self.unix_path
+        if self.server is not None and self.server.sockets:
+            host, port = self.server.sockets[0].getsockname()[:2]
+            return f"{host}:{port}"
+        return f"{self.host}:{self.port}"
+
+    async def start(self):
+        if self.unix_path is not None:
+            if os.path.exists(self.unix_path) and stat.S_ISSOCK(os.stat(self.unix_path).st_mode):
+                os.unlink(self.unix_path)
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=self.unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        logging.info(f"GraphDBLite server listening on {self.address}")
+
+    async def serve_forever(self):
+        await self.start()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.server.close)
+            except (NotImplementedError, RuntimeError):
+                pass
+        self.cli.print_info(f"Listening on {self.address}")
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self.server is None:
+            return
+        self.server.close()
+        await self.server.wait_closed()
+        self.server = None
+        if self.unix_path is not None and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        pending = b""
+        request_number = 0
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                *lines, pending = (pending + data).split(b"\n")
+                if len(pending) > MAX_REQUEST_BYTES:
+                    logging.warning(f"Closing connection: request larger than {MAX_REQUEST_BYTES} bytes")
+                    break
+                if not lines:
+                    continue
+                commands = []
+                for line in lines:
+                    request_number += 1
+                    commands.append((request_number, line.decode("utf-8", errors="replace").strip()))
+                response, closing = self.execute(commands)
+                writer.write(response)
+                await writer.drain()
+                if closing:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def execute(self, commands: list[tuple[int, str]]) -> tuple[bytes, bool]:
+        # EXIT closes the client's connection rather than the server
+        buffer = io.StringIO()
+        output = JsonLinesOutput(buffer)
+        previous_output = self.cli.output
+        self.cli.output = output
+        closing = False
+        try:
+            for request_number, command in commands:
+                output.begin_command(command, request_number)
+                success = self.cli.execute_command(command)
+                output.end_command(success or self.cli.should_exit)
+                self.requests += 1
+                if self.cli.should_exit:
+                    self.cli.should_exit = False
+                    closing = True
+                    break
+        finally:
+            self.cli.output = previous_output
+        output.flush()
+        return buffer.getvalue().encode("utf-8"), closing
@@ -1,16 +1,46 @@
-from typing import Union
+import os
+import random
+import weakref
+from itertools import islice
+from typing import Any, Callable, Iterator, Optional, Sequence, Union
 
+from algorithms.betweenness import betweenness_centrality, has_zero_weight_cycle
+from algorithms.centrality import (
+    HAS_NUMPY, EdgeArrays, degree_centrality, eigenvector_centrality, pagerank, top_scores
+)
+from algorithms.CsrGraph import CsrGraph
+from algorithms.LandmarkIndex import LandmarkIndex
+from algorithms.ReachabilityIndex import ReachabilityIndex
+from algorithms.SnapshotAdjacency import SnapshotAdjacency
+from algorithms.TriangleCounts import TriangleCounts
+from algorithms.random_walks import generate_walks
+from algorithms.similarity import similar_nodes
+from algorithms.shortest_path import bidirectional_bfs, shortest_path
+from algorithms.traversal import bfs, dfs, k_hop_neighbors
 from models.Graph import Graph
-from repository.GraphRepository import GraphRepository
+from repository.GraphRepository import DISTANCE_INDEX, GraphRepository
 from utils.error import Error
+from utils.file import iter_file_lines, write_chunks_to_file
+from validators.graph_validators import validate_edge_record
+
+REACHABILITY_INDEX = "reachability"
+EDGE_ARRAYS = "edges"
+TRIANGLE_COUNTS = "triangles"
+
+
+def iter_edge_records(filename: str) -> Iterator[list[str]]:
+    for line in iter_file_lines(filename):
+        fields = line.split()
+        if fields and not fields[0].startswith("#"):
+            yield fields
 
 
 class GraphService:
     def __init__(self, graph_repository: GraphRepository):
         self.graph_repository = graph_repository
 
-    def create_graph(self, alias: str, is_directed: bool = False, is_weighted: bool = False):
-        return self.graph_repository.create_graph(alias, is_directed, is_weighted)
+    def create_graph(self, alias: str, is_directed: bool = False, is_weighted: bool = False, is_compact: bool = False):
+        return self.graph_repository.create_graph(alias, is_directed, is_weighted, is_compact)
 
     def create_edge(self, alias: str, node1: str, node2: str, weight: str = "") -> Union[None, Error]:
 
@@ -28,6 +58,40 @@ class GraphService:
 
         return self.graph_repository.create_edge(alias, node1, node2, weight)
 
+    def add_nodes_bulk(self, alias: str, node_names: Sequence[str]) -> Union[int, Error]:
+        return self.graph_repository.add_nodes_bulk(alias, node_names)
+
+    def add_edges_bulk(self, alias: str, edges: Sequence[Sequence[str]]) -> Union[tuple[int, int, int], Error]:
+        if not self.graph_repository.graph_exists(alias):
+            return Error(1, f"Graph {alias} does not exist")
+
+        is_weighted = self.graph_repository.is_weighted(alias)
+        for fields in edges:
+            validation_result = validate_edge_record(list(fields), is_weighted)
+            if isinstance(validation_result, Error):
+                return validation_result
+
+        return self.graph_repository.add_edges_bulk(
+            alias, ((fields[0], fields[1], fields[2] if len(fields) > 2 else "") for fields in edges)
+        )
+
+    def add_edges_bulk_from_file(self, alias: str, filename: str) -> Union[tuple[int, int, int], Error]:
+        if not self.graph_repository.graph_exists(alias):
+            return Error(1, f"Graph {alias} does not exist")
+        if not os.path.isfile(filename):
+            return Error(1, f"File {filename} does not exist")
+
+        # The file is read once; all records are validated before any is added
+        is_weighted = self.graph_repository.is_weighted(alias)
+        records = []
+        for line_number, fields in enumerate(iter_edge_records(filename), start=1):
+            validation_result = validate_edge_record(fields, is_weighted)
+            if isinstance(validation_result, Error):
+                return Error(1, f"{filename}: record {line_number}: {validation_result.message}")
+            records.append((fields[0], fields[1], fields[2] if len(fields) > 2 else ""))
+
+        return self.graph_repository.add_edges_bulk(alias, records)
+
     def remove_edge(self, alias: str, node1: str, node2: str, weight: str = "") -> Union[None, Error]:
         return self.graph_repository.remove_edge(alias, node1, node2, weight)
 
@@ -43,7 +107,10 @@ class GraphService:
     def list_graphs(self):
         return self.graph_repository.list_graphs()
 
-    def describe_graph(self, alias: str) -> Union[Error, tuple[str, bool, bool]]:
+    def graph_exists(self, alias: str) -> bool:
+        return self.graph_repository.graph_exists(alias)
+
+    def describe_graph(self, alias: str) -> Union[Error, tuple[str, bool, bool, int, int]]:
         return self.graph_repository.describe_graph(alias)
 
     def list_nodes(self, alias: str) -> Union[Error, list[str]]:
@@ -55,6 +122,9 @@ class GraphService:
     def node_exists(self, alias: str, node_name: str) -> bool:
         return self.graph_repository.node_exists(alias, node_name)
 
+    def edge_exists(self, alias: str, node1: str, node2: str) -> bool:
+        return self.graph_repository.edge_exists(alias, node1, node2)
+
     def load(self, filename: str):
         return self.graph_repository.load_graph(filename)
 
@@ -62,16 +132,294 @@ class GraphService:
         return self.graph_repository.load_graphs()
 
     def save_graph(self, alias: str, filename: str) -> Union[None, Error]:
-        graph = self.get_graph(alias)
-        if isinstance(graph, Error):
-            return Error(1, f"Graph {alias} does not exist")
-        
         try:
-            from persistance.persistance import save_graph_to_storage
-            save_graph_to_storage(graph, filename)
-            return None
+            return self.graph_repository.save_graph(alias, filename)
         except Exception as e:
             return Error(1, f"Failed to save graph: {str(e)}")
 
     def save_all_graphs(self) -> Union[None, Error]:
         return self.graph_repository.save_all_graphs()
+
+    def checkpoint(self) -> Union[tuple[int, int], Error]:
+        return self.graph_repository.checkpoint()
+
+    def is_directed(self, alias: str) -> bool:
+        return self.graph_repository.is_directed(alias)
+
+    def count_components(self, alias: str) -> Union[tuple[int, int], Error]:
+        return self.graph_repository.count_components(alias)
+
+    def connected(self, alias: str, node1: str, node2: str) -> Union[bool, Error]:
+        return self.graph_repository.connected(alias, node1, node2)
+
+    def graph_view(self, alias: str) -> Union[CsrGraph, Error]:
+        # Integer-indexed adjacency arrays, rebuilt after the graph changes
+        return self.graph_repository.get_derived(alias, "csr", CsrGraph.from_graph)
+
+    def _node_ids(self, graph: Union[CsrGraph, SnapshotAdjacency], alias: str, node_names: Sequence[str]) -> Union[list[int], Error]:
+        ids = []
+        for node_name in node_names:
+            node = graph.index.get(node_name)
+            if node is None:
+                return Error(1, f"Node {node_name} does not exist in graph {alias}")
+            ids.append(node)
+        return ids
+
+    def shortest_path(self, alias: str, source: str, target: str, algorithm: str = "",
+                      max_cost: Optional[int] = None) -> Union[None, tuple[int, list[str]], Error]:
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        ids = self._node_ids(graph, alias, (source, target))
+        if isinstance(ids, Error):
+            return ids
+        if graph.min_weight < 0 and algorithm.upper() != "BFS":
+            return Error(1, f"Graph {alias} has negative edge weights; only ALGORITHM BFS is supported")
+        estimate = None
+        if algorithm.upper() in ("", "ASTAR"):
+            index = self.distance_index(alias, graph)
+            if isinstance(index, Error):
+                return index
+            if index is not None:
+                estimate = index.estimator(ids[0], ids[1])
+            elif algorithm:
+                return Error(1, f"Graph {alias} has no current distance index; run BUILD INDEX DISTANCE first")
+        path = shortest_path(graph, ids[0], ids[1], algorithm, max_cost, estimate)
+        if path is None:
+            return None
+        cost, nodes = path
+        return cost, [graph.names[node] for node in nodes]
+
+    def traverse(self, alias: str, start: str, order: str = "BFS", max_depth: Optional[int] = None,
+                 limit: Optional[int] = None) -> Union[Iterator[tuple[str, int]], Error]:
+        # Streams (node, depth) pairs in BFS or DFS order from the start node
+        return self._traversal(alias, start, lambda graph, node: islice(
+            (dfs if order.upper() == "DFS" else bfs)(graph, node, max_depth), limit))
+
+    def neighbors(self, alias: str, node: str, hops: int = 1) -> Union[Iterator[tuple[str, int]], Error]:
+        # Streams (node, hops) pairs for the nodes within hops edges of node
+        return self._traversal(alias, node, lambda graph, start: k_hop_neighbors(graph, start, hops))
+
+    def _traversal(self, alias: str, start: str,
+                   traverse: Callable[[Union[CsrGraph, SnapshotAdjacency], int], Iterator[tuple[int, int]]]
+                   ) -> Union[Iterator[tuple[str, int]], Error]:
+        # Traversals use the CSR view only while it is current. After a write
+        # they read a pinned snapshot in place instead, so they cost what they
+        # visit rather than a rebuild of the whole view; the snapshot stays
+        # pinned until the traversal is exhausted, closed or dropped.
+        graph = self.graph_repository.get_derived(alias, "csr")
+        if isinstance(graph, Error):
+            return graph
+        snapshot_id = None
+        if graph is None:
+            pinned = self.graph_repository.pin_snapshot(alias)
+            if isinstance(pinned, Error):
+                return pinned
+            snapshot_id, view = pinned
+            graph = SnapshotAdjacency(view)
+        ids = self._node_ids(graph, alias, (start,))
+        if isinstance(ids, Error):
+            if snapshot_id is not None:
+                self.graph_repository.release_snapshot(snapshot_id)
+            return ids
+        named = self._named(graph, traverse(graph, ids[0]), snapshot_id)
+        if snapshot_id is not None:
+            # Also released when a traversal is dropped without being started
+            weakref.finalize(named, self.graph_repository.release_snapshot, snapshot_id)
+        return named
+
+    def _named(self, graph: Union[CsrGraph, SnapshotAdjacency], pairs: Iterator[tuple[int, int]],
+               snapshot_id: Optional[int] = None) -> Iterator[tuple[str, int]]:
+        names = graph.names
+        try:
+            for node, depth in pairs:
+                yield names[node], depth
+        finally:
+            if snapshot_id is not None:
+                self.graph_repository.release_snapshot(snapshot_id)
+
+    def reachable(self, alias: str, source: str, target: str) -> Union[bool, Error]:
+        # Undirected graphs answer from their components. Directed graphs use
+        # their reachability index once one was built, rebuilding it on the
+        # first query after a change, and otherwise search.
+        if not self.is_directed(alias):
+            return self.connected(alias, source, target)
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        ids = self._node_ids(graph, alias, (source, target))
+        if isinstance(ids, Error):
+            return ids
+        if not self.graph_repository.has_derived(alias, REACHABILITY_INDEX):
+            return bidirectional_bfs(graph, ids[0], ids[1]) is not None
+        index = self.graph_repository.get_derived(alias, REACHABILITY_INDEX)
+        if isinstance(index, Error):
+            return index
+        if index is None or index.version != graph.version:
+            index = self._build_reachability_index(alias, graph)
+        return index.reachable(ids[0], ids[1])
+
+    def build_reachability_index(self, alias: str) -> Union[ReachabilityIndex, Error]:
+        if not self.is_directed(alias):
+            return Error(1, f"Graph {alias} is undirected; REACHABLE answers from its components without an index")
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        return self._build_reachability_index(alias, graph)
+
+    def _build_reachability_index(self, alias: str, graph: CsrGraph) -> ReachabilityIndex:
+        index = ReachabilityIndex.build(graph)
+        self.graph_repository.put_derived(alias, REACHABILITY_INDEX, graph.version, index)
+        return index
+
+    def build_distance_index(self, alias: str, landmarks: int) -> Union[LandmarkIndex, Error]:
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        if graph.min_weight < 0:
+            return Error(1, f"Graph {alias} has negative edge weights; a distance index needs non-negative ones")
+        index = LandmarkIndex.build(graph, landmarks)
+        result = self.graph_repository.put_derived(alias, DISTANCE_INDEX, graph.version, index)
+        if isinstance(result, Error):
+            return result
+        return index
+
+    def distance_index(self, alias: str, graph: CsrGraph) -> Union[None, LandmarkIndex, Error]:
+        # The graph's landmark index if one was built for this version of it;
+        # any write to the graph makes it stale until it is built again
+        index = self.graph_repository.get_derived(alias, DISTANCE_INDEX)
+        if index is None or isinstance(index, Error):
+            return index
+        current = index.for_graph(graph)
+        if current is not None and current is not index:
+            # Restored with a different node order; keep the reordered tables
+            self.graph_repository.put_derived(alias, DISTANCE_INDEX, current.version, current)
+        return current
+
+    def centrality(self, alias: str, measure: str, max_iterations: int, tolerance: float,
+                   top: Optional[int] = None) -> Union[tuple[list[tuple[str, float]], int, int, bool], Error]:
+        # PAGERANK, DEGREE or EIGENVECTOR scores as (node, score) pairs, highest
+        # first, with the number of nodes scored, the iterations run and
+        # whether the scores converged
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        if measure == "DEGREE":
+            scores, iterations, converged = degree_centrality(graph), 0, True
+        else:
+            if graph.min_weight < 0:
+                return Error(1, f"Graph {alias} has negative edge weights; {measure} needs non-negative ones")
+            edges = self._edge_arrays(alias, graph)
+            if isinstance(edges, Error):
+                return edges
+            rank = pagerank if measure == "PAGERANK" else eigenvector_centrality
+            scores, iterations, converged = rank(graph, edges, max_iterations, tolerance)
+        names = graph.names
+        ranking = [(names[node], score) for node, score in top_scores(scores, top)]
+        return ranking, len(names), iterations, converged
+
+    def betweenness(self, alias: str, sample: Optional[int] = None, workers: int = 1,
+                    top: Optional[int] = None) -> Union[tuple[list[tuple[str, float]], int, int, int], Error]:
+        # Highest scoring (node, score) pairs first, with the number of nodes,
+        # of sources searched and of worker processes used
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        if graph.min_weight < 0:
+            return Error(1, f"Graph {alias} has negative edge weights; BETWEENNESS needs non-negative ones")
+        if graph.is_weighted and graph.min_weight == 0 and has_zero_weight_cycle(graph):
+            return Error(1, f"Graph {alias} has a cycle of zero-weight edges; BETWEENNESS cannot order its shortest paths")
+        scores, sources, workers = betweenness_centrality(graph, sample, workers)
+        names = graph.names
+        ranking = [(names[node], score) for node, score in top_scores(scores, top)]
+        return ranking, len(names), sources, workers
+
+    def _edge_arrays(self, alias: str, graph: CsrGraph) -> Union[None, EdgeArrays, Error]:
+        # NumPy edge arrays for the graph's current version; None when NumPy
+        # is not installed
+        if not HAS_NUMPY:
+            return None
+        return self._derived_view(alias, graph, EDGE_ARRAYS, EdgeArrays)
+
+    def triangles(self, alias: str) -> Union[tuple[int, int], Error]:
+        # Triangles with edge directions ignored, and the number of nodes
+        counts = self._triangle_counts(alias)
+        if isinstance(counts, Error):
+            return counts
+        return counts.total, len(counts.degree)
+
+    def clustering(self, alias: str, node: Optional[str] = None) -> Union[tuple[float, int], Error]:
+        # A node's clustering coefficient and triangles, or without a node
+        # the graph's average coefficient and number of nodes
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        counts = self._triangle_counts(alias, graph)
+        if isinstance(counts, Error):
+            return counts
+        if node is None:
+            return counts.average_clustering(), len(counts.degree)
+        ids = self._node_ids(graph, alias, (node,))
+        if isinstance(ids, Error):
+            return ids
+        return counts.clustering(ids[0]), int(counts.triangles[ids[0]])
+
+    def similar(self, alias: str, nodes: Sequence[str], metric: str,
+                limit: int) -> Union[list[tuple[str, list[tuple[str, float, int]]]], Error]:
+        # For each distinct node, the nodes sharing neighbors with it as
+        # (node, score, common neighbors), best first
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        nodes = list(dict.fromkeys(nodes))
+        ids = self._node_ids(graph, alias, nodes)
+        if isinstance(ids, Error):
+            return ids
+        names = graph.names
+        return [(node, [(names[other], score, common) for other, score, common in ranking])
+                for node, ranking in zip(nodes, similar_nodes(graph, ids, metric, limit))]
+
+    def random_walks(self, alias: str, walks_per_node: int, length: int, filename: str, p: float = 1.0,
+                     q: float = 1.0, seed: Optional[int] = None, workers: int = 1) -> Union[tuple[int, int], Error]:
+        # Streams the walks to the file and returns how many were written and
+        # the seed that reproduces them
+        graph = self.graph_view(alias)
+        if isinstance(graph, Error):
+            return graph
+        if graph.min_weight < 0:
+            return Error(1, f"Graph {alias} has negative edge weights; random walks need non-negative ones")
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        walks = generate_walks(graph, walks_per_node, length, p, q, seed, workers)
+        try:
+            write_chunks_to_file((text.encode() for text in walks), filename)
+        except OSError as e:
+            return Error(1, f"Could not write random walks to {filename}: {e}")
+        return graph.number_of_nodes() * walks_per_node, seed
+
+    def _triangle_counts(self, alias: str, graph: Optional[CsrGraph] = None) -> Union[TriangleCounts, Error]:
+        if graph is None:
+            graph = self.graph_view(alias)
+            if isinstance(graph, Error):
+                return graph
+        return self._derived_view(alias, graph, TRIANGLE_COUNTS, TriangleCounts.build)
+
+    def _derived_view(self, alias: str, graph: CsrGraph, name: str, build: Callable[[CsrGraph], Any]) -> Any:
+        # A value built from the graph's CSR view and cached until the graph
+        # next changes
+        value = self.graph_repository.get_derived(alias, name)
+        if isinstance(value, Error):
+            return value
+        if value is None or value.version != graph.version:
+            value = build(graph)
+            self.graph_repository.put_derived(alias, name, graph.version, value)
+        return value
+
+    def checkpoint_status(self) -> dict:
+        return self.graph_repository.checkpoint_status()
+
+    def lock_stats(self) -> list[tuple[str, dict]]:
+        return self.graph_repository.lock_stats()
+
+    def close(self):
+        self.graph_repository.close()
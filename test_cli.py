@@ -4,15 +4,40 @@ Test script for GraphDBLite CLI
 This script tests the CLI functionality by simulating user commands
 """
 
+import json
 import os
 import sys
 import tempfile
 import shutil
+import struct
+import asyncio
+import threading
+import subprocess
+import time
 from io import StringIO
 from typing import Optional
 from unittest.mock import patch
+
+# Keep the snapshot and write-ahead log used by the tests out of the real data directory
+TEST_DATA_DIR = tempfile.mkdtemp()
+os.environ["SAVE_FILE_PATH"] = os.path.join(TEST_DATA_DIR, "graphs.json")
+os.environ["WAL_FILE_PATH"] = os.path.join(TEST_DATA_DIR, "graphs.json.wal")
+
+from algorithms.centrality import HAS_NUMPY, EdgeArrays, pagerank, top_scores
 from cli.cli import GraphDBLiteCLI
+from cli.output import ConsoleOutput, JsonLinesOutput
 from main import process_command
+from persistance.binary_snapshot import HEADER
+from persistance.persistance import get_distance_index_file, get_snapshot_file
+from persistance.WriteAheadLog import WriteAheadLog
+from repository.Checkpointer import Checkpointer
+from repository.GraphRepository import GraphRepository
+from server.GraphClient import GraphClient
+from server.GraphServer import GraphServer
+import service.GraphService as graph_service_module
+from service.GraphService import GraphService
+from utils.error import Error
+from utils.locks import ReadWriteLock
 from utils.constants import save_file_path
 
 class CLITester:
@@ -44,8 +69,11 @@ class CLITester:
             shutil.move(self.backup_file, save_file_path)
             print("Restored original data file")
         
-        # Clean up temp directory
+        # Clean up temp directories
+        self.cli.checkpointer.stop()
+        self.cli.service.close()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
+        shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
         print("Test environment cleaned up.")
         
     def test_command(self, command: str, expected_success: bool = True, expected_output_contains: Optional[str] = None):
@@ -255,6 +283,657 @@ class CLITester:
             self.test_command("LIST NODES g6", True, "c")
             # Delete a non-existent edge
             self.test_command("DEL EDGE g6 b c", False, "does not exist")
+            # Delete a node with incoming edges in a directed graph, then reuse its slot
+            self.test_command("CREATE GRAPH g8 DIRECTED", True, "Created graph 'g8'")
+            self.test_command("ADD EDGE g8 x y", True, "Added edge from 'x' to 'y'")
+            self.test_command("ADD EDGE g8 z y", True, "Added edge from 'z' to 'y'")
+            self.test_command("ADD EDGE g8 x z", True, "Added edge from 'x' to 'z'")
+            self.test_command("DEL NODE g8 y", True, "Removed node 'y'")
+            self.test_command("LIST EDGES g8 x", True, "x -> z")
+            self.test_command("LIST EDGES g8 z", True, "No edges found")
+            self.test_command("ADD EDGE g8 w x", True, "Added edge from 'w' to 'x'")
+            self.test_command("LIST EDGES g8 w x", True, "w -> x")
+            self.test_command("LIST EDGES g8 x", True, "x -> z")
+            # Delete an edge in an undirected graph
+            self.test_command("ADD EDGE g6 b c", True, "Added edge from 'b' to 'c'")
+            self.test_command("DEL EDGE g6 b c", True, "Removed edge from 'b' to 'c'")
+            self.test_command("LIST EDGES g6 c", True, "No edges found")
+            # Pair lookups only return edges stored in that direction
+            self.test_command("ADD EDGE g6 c c", True, "Added edge from 'c' to 'c'")
+            self.test_command("ADD EDGE g6 b c", True, "Added edge from 'b' to 'c'")
+            self.test_command("LIST EDGES g6 b c", True, "b -> c")
+            self.test_command("LIST EDGES g6 c b", True, "No edges found")
+            self.test_command("LIST EDGES g6 c c", True, "c -> c")
+            self.test_command("DEL NODE g6 c", True, "Removed node 'c'")
+            self.test_command("LIST EDGES g6 b", True, "No edges found")
+            # Compact storage engine
+            self.test_command("CREATE GRAPH c1 DIRECTED WEIGHTED COMPACT", True, "Created graph 'c1'")
+            self.test_command("ADD EDGE c1 p q 4", True, "Added edge from 'p' to 'q'")
+            self.test_command("ADD EDGE c1 q r 2", True, "Added edge from 'q' to 'r'")
+            self.test_command("ADD EDGE c1 p q 4", False, "already exists")
+            self.test_command("LIST EDGES c1 p q", True, "p -> q (weight: 4)")
+            self.test_command("DEL NODE c1 q", True, "Removed node 'q'")
+            self.test_command("LIST EDGES c1", True, "No edges found")
+            self.test_command("LIST NODES c1", True, "r")
+            test_file3 = os.path.join(self.temp_dir, "c1.json")
+            self.test_command("ADD EDGE c1 p r 7", True, "Added edge from 'p' to 'r'")
+            self.test_command(f"SAVE GRAPH c1 {test_file3}", True, "Saved graph 'c1'")
+            self.test_command(f"LOAD GRAPH {test_file3}", True, "Loaded graph from")
+            self.test_command("LIST EDGES c1 p", True, "p -> r (weight: 7)")
+            # Graph files are streamed; header fields may follow the records
+            streamed_file = os.path.join(self.temp_dir, "s1.json")
+            with open(streamed_file, "w") as f:
+                f.write('{"edges": [{"source": "x", "destination": "y", "weight": 2.5e1}],\n'
+                        ' "nodes": [{"name": "x"}, {"name": "y"}], "is_weighted": true,\n'
+                        ' "alias": "s1", "is_directed": true}')
+            self.test_command(f"LOAD GRAPH {streamed_file}", True, "Loaded graph from")
+            self.test_command("LIST EDGES s1 x y", True, "x -> y (weight: 25")
+            with open(streamed_file, "w") as f:
+                f.write('{"alias": "s2", "is_directed": true, "is_weighted": false, "nodes": [{"name": "x"}, ')
+            self.test_command(f"LOAD GRAPH {streamed_file}", False, "Failed to load graph")
+            self.test_command("LIST GRAPHS", True, "s1")
+            # Bulk loading
+            self.test_command("CREATE GRAPH b1 DIRECTED WEIGHTED", True, "Created graph 'b1'")
+            self.test_command("BULK ADD NODES b1 n1 n2 n3", True, "Added 3 node(s) to graph 'b1'")
+            self.test_command("BULK ADD NODES b1 n3 n4", True, "(1 already existed)")
+            self.test_command("BULK ADD EDGES b1 n1:n2:4 n2:n5:1 n1:n2:4", True, "Added 2 edge(s) to graph 'b1' (1 new node(s), 1 duplicate(s) skipped)")
+            self.test_command("BULK ADD EDGES b1 n1:n3", False, "Weight is required")
+            self.test_command("BULK ADD EDGES b1 n1:n3:x", False, "Invalid edge record")
+            self.test_command("LIST EDGES b1 n2 n5", True, "n2 -> n5 (weight: 1)")
+            edges_file = os.path.join(self.temp_dir, "edges.txt")
+            with open(edges_file, "w") as f:
+                f.write("# source destination weight\nn5 n6 2\n\nn6 n1 3\nn1 n2 4\n")
+            self.test_command(f"BULK ADD EDGES b1 FROM {edges_file}", True, "Added 2 edge(s) to graph 'b1' (1 new node(s), 1 duplicate(s) skipped)")
+            self.test_command("LIST EDGES b1 n6", True, "n6 -> n1 (weight: 3)")
+            with open(edges_file, "a") as f:
+                f.write("n7 n8\n")
+            self.test_command(f"BULK ADD EDGES b1 FROM {edges_file}", False, "record 4: Weight is required")
+            self.test_command("LIST NODES b1", True, "n6")
+            self.test_command("BULK ADD EDGES b1 FROM", False, "Usage: BULK ADD EDGES")
+            self.test_command("BULK ADD EDGES nonexistent a:b", False, "does not exist")
+            # Write-ahead log replay and checkpointing
+            replayed = GraphRepository(load_from_disk=True)
+            replayed.close()
+            if replayed.list_edges("b1", "n6", "n1") == [{"source": "n6", "destination": "n1", "weight": 3}] \
+                    and sorted(replayed.list_nodes("c1")) == sorted(self.cli.service.list_nodes("c1")) \
+                    and replayed.edge_exists("s1", "x", "y"):
+                print("✓ Write-ahead log replay restored uncheckpointed changes")
+                self.test_results.append(True)
+            else:
+                print("✗ Write-ahead log replay did not restore uncheckpointed changes")
+                self.test_results.append(False)
+            bulk_records = []
+            for log_file in (os.environ["WAL_FILE_PATH"] + ".1", os.environ["WAL_FILE_PATH"]):
+                if os.path.exists(log_file):
+                    with open(log_file) as f:
+                        bulk_records += [record for record in map(json.loads, f)
+                                         if record.get("alias") == "b1" and record["op"] != "create_graph"]
+            if [record["op"] for record in bulk_records] == ["add_nodes", "add_nodes", "add_edges", "add_edges"] \
+                    and bulk_records[2]["edges"] == [["n1", "n2", "4"], ["n2", "n5", "1"]]:
+                print("✓ Bulk commands are logged as one write-ahead log record each")
+                self.test_results.append(True)
+            else:
+                print(f"✗ Bulk commands were logged record by record: {[r['op'] for r in bulk_records]}")
+                self.test_results.append(False)
+            with open(edges_file, "w") as f:
+                f.write("n5 n6 2\nn6 n1 3\n")
+            reads = []
+            read_records = graph_service_module.iter_edge_records
+            with patch.object(graph_service_module, "iter_edge_records",
+                              lambda filename: reads.append(filename) or read_records(filename)):
+                counts = self.cli.service.add_edges_bulk_from_file("b1", edges_file)
+            if counts == (0, 0, 2) and len(reads) == 1:
+                print("✓ Bulk edge files are read once")
+                self.test_results.append(True)
+            else:
+                print(f"✗ Bulk edge file was read {len(reads)} time(s): {counts}")
+                self.test_results.append(False)
+            self.test_command("CHECKPOINT", True, "Checkpoint complete")
+            self.test_command("CHECKPOINT", True, "0 log record(s) compacted")
+            self.test_command("CHECKPOINT", True, "Checkpoint complete: 0 of")
+            self.test_command("ADD EDGE b1 n7 n8 9", True, "Added edge from 'n7' to 'n8'")
+            replayed = GraphRepository(load_from_disk=True)
+            replayed.close()
+            if replayed.list_edges("b1", "n7", "n8") == [{"source": "n7", "destination": "n8", "weight": 9}] \
+                    and replayed.list_edges("b1", "n1", "n2") == [{"source": "n1", "destination": "n2", "weight": 4}]:
+                print("✓ Snapshot plus write-ahead log tail restored the graph")
+                self.test_results.append(True)
+            else:
+                print("✗ Snapshot plus write-ahead log tail did not restore the graph")
+                self.test_results.append(False)
+            self.test_command("CHECKPOINT", True, "Checkpoint complete: 1 of")
+            with open(save_file_path) as f:
+                manifest = json.load(f)
+            entry = next((e for e in manifest["graphs"] if e["alias"] == "b1"), None)
+            if entry is not None and entry["nodes"] == 8 and entry["edges"] == 5 \
+                    and os.path.exists(os.path.join(TEST_DATA_DIR, entry["file"])):
+                print("✓ Manifest lists per-graph snapshot files")
+                self.test_results.append(True)
+            else:
+                print("✗ Manifest does not list per-graph snapshot files")
+                self.test_results.append(False)
+            # Graphs are loaded lazily from the manifest catalog
+            lazy = GraphRepository(load_from_disk=True)
+            lazy.close()
+            listed_before_load = "b1" in lazy.list_graphs() and not lazy.graphs
+            described = lazy.describe_graph("b1")
+            if listed_before_load and described == ("b1", True, True, 8, 5) and not lazy.graphs \
+                    and lazy.list_edges("b1", "n7", "n8") == [{"source": "n7", "destination": "n8", "weight": 9}] \
+                    and "b1" in lazy.graphs and "c1" not in lazy.graphs:
+                print("✓ Graphs are listed from the catalog and loaded on first use")
+                self.test_results.append(True)
+            else:
+                print("✗ Graphs were not loaded lazily from the catalog")
+                self.test_results.append(False)
+            # Binary snapshot format is picked by file extension
+            binary_file = os.path.join(self.temp_dir, "b1.gdbl")
+            self.test_command(f"SAVE GRAPH b1 {binary_file}", True, "Saved graph 'b1'")
+            self.test_command("DEL NODE b1 n6", True, "Removed node 'n6'")
+            self.test_command(f"LOAD GRAPH {binary_file}", True, "Loaded graph from")
+            self.test_command("LIST EDGES b1 n6 n1", True, "n6 -> n1 (weight: 3)")
+            self.test_command("DESCRIBE GRAPH b1", True, "Edges: 5")
+            binary_file = os.path.join(self.temp_dir, "c1.gdbl")
+            self.test_command(f"SAVE GRAPH c1 {binary_file}", True, "Saved graph 'c1'")
+            self.test_command(f"LOAD GRAPH {binary_file}", True, "Loaded graph from")
+            self.test_command("LIST EDGES c1 p", True, "p -> r (weight: 7)")
+            self.test_command(f"LOAD GRAPH {os.path.join(self.temp_dir, 'missing.gdbl')}", False, "Failed to load graph")
+            with open(binary_file, "rb") as f:
+                snapshot_bytes = f.read()
+            _, _, _, _, alias_length, node_count, names_length, _ = HEADER.unpack_from(snapshot_bytes)
+            sources_at = HEADER.size + alias_length + 4 * node_count + names_length
+            corrupt_file = os.path.join(self.temp_dir, "corrupt.gdbl")
+            for corrupt, message in (
+                    (snapshot_bytes[:-3], "truncated snapshot"),
+                    (snapshot_bytes[:HEADER.size] + b"\xff" + snapshot_bytes[HEADER.size + 1:],
+                     "'utf-8' codec can't decode"),
+                    (snapshot_bytes[:sources_at] + struct.pack("<i", node_count) + snapshot_bytes[sources_at + 4:],
+                     "edge refers to a node id out of range"),
+                    (snapshot_bytes[:HEADER.size - 16] + struct.pack("<Q", names_length + 1)
+                     + snapshot_bytes[HEADER.size - 8:], "node name lengths do not match")):
+                with open(corrupt_file, "wb") as f:
+                    f.write(corrupt)
+                self.test_command(f"LOAD GRAPH {corrupt_file}", False, f"Failed to load graph: {message}")
+            # Scripts run through EXEC and batch mode
+            script_file = os.path.join(self.temp_dir, "script.gdb")
+            with open(script_file, "w") as f:
+                f.write("# build a small graph\nCREATE GRAPH e1 DIRECTED\n\nADD NODE e1 a\nADD NODE e1 b\n"
+                        "ADD EDGE e1 a b\nLIST EDGES e1\n")
+            self.test_command(f"EXEC {script_file}", True, "5 command(s) succeeded")
+            self.test_command(f"EXEC {script_file}", False, "1 failed")
+            self.test_command(f"EXEC {script_file} CONTINUE", False, "1 command(s) succeeded, 4 failed")
+            self.test_command(f"EXEC {script_file}", False, "already exists")
+            self.test_command("EXEC", False, "Usage: EXEC")
+            self.test_command(f"EXEC {os.path.join(self.temp_dir, 'missing.gdb')}", False, "does not exist")
+            with open(script_file, "w") as f:
+                f.write(f"ADD NODE e1 c\nEXEC {script_file}\n")
+            self.test_command(f"EXEC {script_file}", False, "is already running")
+            self.test_command("LIST NODES e1", True, "c")
+            with open(script_file, "w") as f:
+                f.write("ADD NODE e1 d\nEXIT\nADD NODE e1 e\n")
+            self.test_command(f"EXEC {script_file}", True, "1 command(s) succeeded")
+            self.test_command("LIST GRAPHS", True, "e1")
+            json_output = StringIO()
+            self.cli.output = JsonLinesOutput(json_output)
+            self.cli.run_script(["ADD NODE e1 f", "ADD NODE e1 f", "LIST NODES e1"], stop_on_error=False)
+            self.cli.output.flush()
+            self.cli.output = ConsoleOutput()
+            records = [json.loads(line) for line in json_output.getvalue().splitlines()]
+            if [record["ok"] for record in records] == [True, False, True] \
+                    and records[1]["messages"][0]["level"] == "error" and "  - f" in records[2]["output"]:
+                print("✓ JSON lines output has one record per command")
+                self.test_results.append(True)
+            else:
+                print("✗ JSON lines output is wrong")
+                self.test_results.append(False)
+            batch_dir = os.path.join(self.temp_dir, "batch")
+            os.makedirs(batch_dir)
+            batch_env = dict(os.environ, SAVE_FILE_PATH=os.path.join(batch_dir, "graphs.json"),
+                             WAL_FILE_PATH=os.path.join(batch_dir, "graphs.json.wal"))
+            batch = subprocess.run([sys.executable, "main.py", "--batch", "--output", "json"],
+                                   input="CREATE GRAPH x1\nADD NODE x1 a\nADD NODE x1 a\nLIST NODES x1\n",
+                                   capture_output=True, text=True, env=batch_env,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+            records = [json.loads(line) for line in batch.stdout.splitlines()]
+            if batch.returncode == 1 and [record.get("ok") for record in records[:3]] == [True, True, False] \
+                    and os.path.exists(os.path.join(batch_dir, "graphs.json")):
+                print("✓ Batch mode stops at the first failure and saves on exit")
+                self.test_results.append(True)
+            else:
+                print("✗ Batch mode did not behave as expected")
+                print(f"  Actual output: {batch.stdout.strip()} {batch.stderr.strip()}")
+                self.test_results.append(False)
+            # Socket server with pipelined requests
+            loop = asyncio.new_event_loop()
+            server_thread = threading.Thread(target=loop.run_forever, daemon=True)
+            server_thread.start()
+            server = GraphServer(self.cli, "127.0.0.1", 0)
+            asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=10)
+            port = server.server.sockets[0].getsockname()[1]
+            try:
+                with GraphClient("127.0.0.1", port, timeout=10) as client:
+                    responses = client.pipeline(["CREATE GRAPH srv", "ADD NODE srv a", "ADD NODE srv a",
+                                                 "", "LIST NODES srv", "BOGUS"])
+                    described = client.execute("DESCRIBE GRAPH srv")
+                    with GraphClient("127.0.0.1", port, timeout=10) as other:
+                        shared = other.execute("LIST GRAPHS")
+                    closed = client.pipeline(["EXIT", "LIST GRAPHS"])
+                if [response["ok"] for response in responses] == [True, True, False, True, True, False] \
+                        and [response["line"] for response in responses] == [1, 2, 3, 4, 5, 6] \
+                        and responses[2]["messages"][0]["message"] == "Node a already exists" \
+                        and responses[4]["output"] == ["  - a"] \
+                        and "  Nodes: 1" in described["output"] and "  - srv" in shared["output"] \
+                        and len(closed) == 1:
+                    print("✓ Server answers pipelined requests in order with JSON responses")
+                    self.test_results.append(True)
+                else:
+                    print("✗ Server responses are wrong")
+                    print(f"  Actual output: {responses} {described} {shared} {closed}")
+                    self.test_results.append(False)
+            finally:
+                asyncio.run_coroutine_threadsafe(server.close(), loop).result(timeout=10)
+                loop.call_soon_threadsafe(loop.stop)
+                server_thread.join(timeout=10)
+                loop.close()
+            self.test_command("LIST NODES srv", True, "a")
+            # Reader/writer locks
+            self.test_command("LOCK STATS", True, "  - srv: ")
+            shared_repository = GraphRepository()
+            shared_repository.create_graph("t1")
+            shared_repository.create_graph("t2")
+            failures = []
+
+            def write_nodes(alias, prefix):
+                for i in range(500):
+                    if shared_repository.add_node(alias, f"{prefix}{i}") is not None:
+                        failures.append(alias)
+
+            def read_nodes(alias):
+                for _ in range(200):
+                    if isinstance(shared_repository.list_nodes(alias), Error):
+                        failures.append(alias)
+
+            workers = [threading.Thread(target=write_nodes, args=(alias, prefix))
+                       for alias in ("t1", "t2") for prefix in ("a", "b")]
+            workers += [threading.Thread(target=read_nodes, args=(alias,)) for alias in ("t1", "t2")]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            stats = dict(shared_repository.lock_stats())
+            if not failures and len(shared_repository.list_nodes("t1")) == 1000 \
+                    and len(shared_repository.list_nodes("t2")) == 1000 \
+                    and stats["t1"]["writes"] == 1000 and stats["repository"]["writes"] == 2:
+                print("✓ Concurrent readers and writers keep graphs consistent")
+                self.test_results.append(True)
+            else:
+                print(f"✗ Concurrent access lost updates: {failures} {stats}")
+                self.test_results.append(False)
+            lock = ReadWriteLock()
+            lock.acquire_read()
+            second_reader = threading.Thread(target=lock.acquire_read)
+            second_reader.start()
+            second_reader.join(timeout=5)
+            writer = threading.Thread(target=lock.acquire_write)
+            writer.start()
+            writer.join(timeout=0.2)
+            if not second_reader.is_alive() and writer.is_alive() and lock.readers == 2:
+                lock.release_read()
+                lock.release_read()
+                writer.join(timeout=5)
+                if not writer.is_alive() and lock.writer and lock.stats()["contended_writes"] == 1:
+                    print("✓ Readers share the lock and writers wait for them")
+                    self.test_results.append(True)
+                else:
+                    print("✗ Writer was not granted the lock after readers left")
+                    self.test_results.append(False)
+            else:
+                print("✗ Read/write lock did not let readers share")
+                self.test_results.append(False)
+            # Copy-on-write snapshots
+            shared_repository.add_edges_bulk("t1", [("a1", "a2", ""), ("a2", "a3", ""), ("a3", "a1", "")])
+            shared_repository.create_graph("t3", is_directed=True, is_weighted=True, is_compact=True)
+            shared_repository.add_edges_bulk("t3", [("x", "y", "4"), ("y", "z", "5")])
+            pinned = [shared_repository.pin_snapshot(alias) for alias in ("t1", "t3")]
+            shared_repository.remove_node("t1", "a2")
+            shared_repository.create_edge("t1", "a1", "b1")
+            shared_repository.remove_edge("t3", "x", "y", "4")
+            shared_repository.add_node("t3", "w")
+            (t1_id, t1_view), (t3_id, t3_view) = pinned
+            view_edges = sorted((e["source"], e["destination"]) for e in t1_view.list_edges_for_node("a2"))
+            if view_edges == [("a1", "a2"), ("a2", "a3")] and t1_view.number_of_nodes() == 1000 \
+                    and t3_view.edge_exists("x", "y", 4) and not t3_view.node_exists("w") \
+                    and not shared_repository.node_exists("t1", "a2") \
+                    and shared_repository.edge_exists("t1", "a1", "b1") and not t1_view.edge_exists("a1", "b1") \
+                    and not shared_repository.edge_exists("t3", "x", "y"):
+                print("✓ Pinned snapshots keep a stable view while writers continue")
+                self.test_results.append(True)
+            else:
+                print("✗ Pinned snapshots changed under writers")
+                self.test_results.append(False)
+            for snapshot_id, _ in pinned:
+                shared_repository.release_snapshot(snapshot_id)
+            live = shared_repository.get_graph("t1")
+            if isinstance(shared_repository.get_snapshot(t1_id), Error) and not live.shared \
+                    and live.owned_out is None and not shared_repository.snapshots:
+                print("✓ Released snapshots are reclaimed")
+                self.test_results.append(True)
+            else:
+                print("✗ Released snapshots were not reclaimed")
+                self.test_results.append(False)
+            stop_pinning = threading.Event()
+
+            def pin_and_release():
+                try:
+                    while not stop_pinning.is_set():
+                        snapshot_id, _ = shared_repository.pin_snapshot("t1")
+                        shared_repository.release_snapshot(snapshot_id)
+                except Exception as e:
+                    failures.append(e)
+
+            def toggle_edges():
+                try:
+                    for i in range(50000):
+                        error = shared_repository.create_edge("t1", "a1", f"b{i % 50}") if i % 2 == 0 \
+                            else shared_repository.remove_edge("t1", "a1", f"b{i % 50 - 1}", "")
+                        if isinstance(error, Error):
+                            failures.append(error.message)
+                except Exception as e:
+                    failures.append(e)
+                finally:
+                    stop_pinning.set()
+
+            # Frequent thread switches make the window between a writer's
+            # copy-on-write checks and a concurrent release likely to be hit
+            switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+            workers = [threading.Thread(target=pin_and_release) for _ in range(2)]
+            workers.append(threading.Thread(target=toggle_edges))
+            try:
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            finally:
+                sys.setswitchinterval(switch_interval)
+            if not failures and not shared_repository.snapshots and not live.shared:
+                print("✓ Writers and concurrent snapshot releases do not race")
+                self.test_results.append(True)
+            else:
+                print(f"✗ Snapshot releases raced with writers: {failures[:3]}")
+                self.test_results.append(False)
+            repository = self.cli.service.graph_repository
+            self.test_command("ADD EDGE b1 n8 n7 6", True, "Added edge from 'n8' to 'n7'")
+            repository.wal.rotate()
+            self.test_command("ADD EDGE b1 n8 n6 7", True, "Added edge from 'n8' to 'n6'")
+            replayed = GraphRepository(load_from_disk=True)
+            replayed.close()
+            retired = repository.wal.retired_filename
+            if os.path.exists(retired) and replayed.edge_exists("b1", "n8", "n7") \
+                    and replayed.edge_exists("b1", "n8", "n6"):
+                print("✓ A checkpoint's retired log segment is replayed until the snapshot is written")
+                self.test_results.append(True)
+            else:
+                print("✗ Retired log segment was not replayed")
+                self.test_results.append(False)
+            if get_snapshot_file("-") != get_snapshot_file("2d") \
+                    and get_distance_index_file("-") != get_distance_index_file("2d") \
+                    and os.path.basename(get_snapshot_file("-")).startswith("x_2d."):
+                print("✓ Snapshot files of encoded aliases cannot collide with plain aliases")
+                self.test_results.append(True)
+            else:
+                print("✗ Snapshot file names of different aliases collide")
+                self.test_results.append(False)
+            timed_log = WriteAheadLog(os.path.join(self.temp_dir, "timed.wal"), sync_batch=100, sync_interval=0.05)
+            timed_log.open()
+            timed_log.append("add_node", alias="t", node="a")
+            unsynced = timed_log.pending
+            deadline = time.monotonic() + 5
+            while timed_log.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+            timed_log.close()
+            if unsynced == 1 and timed_log.pending == 0 and timed_log.timer is None:
+                print("✓ Write-ahead log syncs the last records once the sync interval is up")
+                self.test_results.append(True)
+            else:
+                print("✗ Write-ahead log left the last records unsynced")
+                self.test_results.append(False)
+            self.test_command("CHECKPOINT", True, "Checkpoint complete")
+            if not os.path.exists(retired) and not repository.snapshots:
+                print("✓ Checkpoint discards the retired log segment")
+                self.test_results.append(True)
+            else:
+                print("✗ Checkpoint left the retired log segment behind")
+                self.test_results.append(False)
+            # Background checkpoints
+            self.test_command("CHECKPOINT STATUS", True, "Background checkpoints: running")
+            self.test_command("CHECKPOINT STATUS", True, "(manual), took")
+            checkpointer = Checkpointer(repository, 0, 2, poll_interval=0.02)
+            background_before = repository.background_checkpoints
+            checkpointer.start()
+            try:
+                self.test_command("ADD NODE b1 n9", True, "Added node 'n9'")
+                self.test_command("ADD EDGE b1 n9 n1 2", True, "Added edge from 'n9' to 'n1'")
+                deadline = time.monotonic() + 10
+                while repository.background_checkpoints == background_before and time.monotonic() < deadline:
+                    time.sleep(0.02)
+            finally:
+                checkpointer.stop()
+            if repository.background_checkpoints > background_before and repository.pending_changes() == 0 \
+                    and not checkpointer.running:
+                print("✓ Background checkpointer ran once the log record threshold was reached")
+                self.test_results.append(True)
+            else:
+                print("✗ Background checkpointer did not run")
+                self.test_results.append(False)
+            self.test_command("CHECKPOINT STATUS", True, "(background), took")
+            self.test_command("CHECKPOINT STATUS", True, "Pending log records: 0")
+            # Shortest paths
+            self.test_command("CREATE GRAPH sp DIRECTED WEIGHTED", True, "Created graph 'sp'")
+            self.test_command("BULK ADD EDGES sp a:b:4 b:c:3 a:c:10 c:d:1 e:a:1", True, "Added 5 edge(s)")
+            self.test_command("SHORTEST PATH sp a d", True, "cost 8, 3 hop(s)")
+            self.test_command("SHORTEST PATH sp a d", True, "a -> b -> c -> d")
+            self.test_command("SHORTEST PATH sp a d ALGORITHM dijkstra", True, "cost 8, 3 hop(s)")
+            self.test_command("SHORTEST PATH sp a d ALGORITHM BFS", True, "a -> c -> d")
+            self.test_command("SHORTEST PATH sp e d MAXCOST 8", True, "No path from 'e' to 'd' in graph 'sp' within cost 8")
+            self.test_command("SHORTEST PATH sp e d MAXCOST 9", True, "e -> a -> b -> c -> d")
+            self.test_command("SHORTEST PATH sp d a", True, "No path from 'd' to 'a'")
+            self.test_command("SHORTEST PATH sp a a", True, "cost 0, 0 hop(s)")
+            self.test_command("ADD EDGE sp b d 2", True, "Added edge from 'b' to 'd'")
+            self.test_command("SHORTEST PATH sp a d", True, "a -> b -> d")
+            self.test_command("SHORTEST PATH sp a zz", False, "Node zz does not exist in graph sp")
+            self.test_command("SHORTEST PATH sp a d ALGORITHM astar", False, "no current distance index")
+            self.test_command("SHORTEST PATH sp a d ALGORITHM greedy", False, "Usage: SHORTEST PATH")
+            self.test_command("SHORTEST PATH sp a d MAXCOST", False, "Usage: SHORTEST PATH")
+            self.test_command("SHORTEST PATH nonexistent a d", False, "does not exist")
+            self.test_command("CREATE GRAPH spu", True, "Created graph 'spu'")
+            self.test_command("BULK ADD EDGES spu a:b b:c c:d", True, "Added 3 edge(s)")
+            self.test_command("SHORTEST PATH spu d a", True, "d -> c -> b -> a")
+            self.test_command("SHORTEST PATH spu a d MAXCOST 2", True, "within cost 2")
+            # Traversals
+            self.test_command("CREATE GRAPH tr DIRECTED", True, "Created graph 'tr'")
+            self.test_command("BULK ADD EDGES tr a:b a:c b:d c:d d:e e:a", True, "Added 6 edge(s)")
+            self.test_command("TRAVERSE tr a BFS", True, "Visited 5 node(s)")
+            self.test_command("TRAVERSE tr a BFS", True, "d (depth 2)")
+            self.test_command("TRAVERSE tr a DFS", True, "e (depth 3)")
+            self.test_command("TRAVERSE tr a BFS DEPTH 1", True, "Visited 3 node(s)")
+            self.test_command("TRAVERSE tr a dfs LIMIT 2", True, "Visited 2 node(s)")
+            self.test_command("TRAVERSE tr a", False, "Usage: TRAVERSE")
+            self.test_command("TRAVERSE tr a BFS DEPTH x", False, "Usage: TRAVERSE")
+            self.test_command("TRAVERSE tr zz BFS", False, "Node zz does not exist in graph tr")
+            self.test_command("NEIGHBORS tr a HOPS 2", True, "Found 3 node(s) within 2 hop(s) of 'a'")
+            self.test_command("NEIGHBORS tr d", True, "e (1 hop(s))")
+            self.test_command("NEIGHBORS tr a HOPS 0", False, "Usage: NEIGHBORS")
+            self.test_command("NEIGHBORS nonexistent a", False, "does not exist")
+            self.test_command("CREATE GRAPH tw DIRECTED", True, "Created graph 'tw'")
+            self.test_command("BULK ADD EDGES tw a:b b:c", True, "Added 2 edge(s)")
+            self.test_command("ADD EDGE tw c d", True, "Added edge from 'c' to 'd'")
+            self.test_command("TRAVERSE tw a DFS", True, "d (depth 3)")
+            self.test_command("TRAVERSE tw zz DFS", False, "Node zz does not exist in graph tw")
+            self.test_command("CREATE GRAPH tc COMPACT", True, "Created graph 'tc'")
+            self.test_command("BULK ADD EDGES tc a:b b:c", True, "Added 2 edge(s)")
+            self.test_command("ADD EDGE tc d c", True, "Added edge from 'd' to 'c'")
+            self.test_command("NEIGHBORS tc d HOPS 3", True, "a (3 hop(s))")
+            repository = self.cli.service.graph_repository
+            if repository.get_derived("tw", "csr") is None and repository.get_derived("tc", "csr") is None \
+                    and not repository.snapshots:
+                print("✓ Traversals after a write read a snapshot without rebuilding the CSR view")
+                self.test_results.append(True)
+            else:
+                print("✗ Traversals after a write rebuilt the CSR view or kept their snapshot")
+                self.test_results.append(False)
+            # Connected components
+            self.test_command("COMPONENTS tr", True, "Graph 'tr' has 1 weakly connected component(s) over 5 node(s)")
+            self.test_command("BULK ADD EDGES tr x:y y:z", True, "Added 2 edge(s)")
+            self.test_command("ADD NODE tr w", True, "Added node 'w'")
+            self.test_command("COMPONENTS tr", True, "has 3 weakly connected component(s) over 9 node(s)")
+            self.test_command("CONNECTED tr z x", True, "'z' and 'x' are weakly connected in graph 'tr'")
+            self.test_command("CONNECTED tr a z", True, "'a' and 'z' are not weakly connected")
+            self.test_command("ADD EDGE tr z e", True, "Added edge from 'z' to 'e'")
+            self.test_command("CONNECTED tr a z", True, "'a' and 'z' are weakly connected")
+            self.test_command("DEL EDGE tr z e", True, "Removed edge")
+            self.test_command("CONNECTED tr x a", True, "are not weakly connected")
+            self.test_command("DEL NODE tr y", True, "Removed node 'y'")
+            self.test_command("COMPONENTS tr", True, "has 4 weakly connected component(s) over 8 node(s)")
+            self.test_command("COMPONENTS spu", True, "Graph 'spu' has 1 connected component(s)")
+            self.test_command("CONNECTED tr a zz", False, "Node zz does not exist")
+            self.test_command("CONNECTED tr a", False, "Usage: CONNECTED")
+            self.test_command("COMPONENTS nonexistent", False, "does not exist")
+            # Reachability
+            self.test_command("REACHABLE tr a e", True, "'a' can reach 'e' in graph 'tr'")
+            self.test_command("REACHABLE tr e a", True, "'e' can reach 'a'")
+            self.test_command("REACHABLE tr x z", True, "'x' cannot reach 'z'")
+            self.test_command("BUILD INDEX REACHABILITY tr", True, "4 strongly connected component(s), full closure")
+            self.test_command("REACHABLE tr c b", True, "'c' can reach 'b'")
+            self.test_command("REACHABLE tr a x", True, "'a' cannot reach 'x'")
+            self.test_command("ADD EDGE tr e x", True, "Added edge from 'e' to 'x'")
+            self.test_command("REACHABLE tr a x", True, "'a' can reach 'x'")
+            self.test_command("REACHABLE tr x a", True, "'x' cannot reach 'a'")
+            self.test_command("REACHABLE spu d a", True, "'d' can reach 'a'")
+            self.test_command("BUILD INDEX REACHABILITY spu", False, "is undirected")
+            self.test_command("REACHABLE tr a zz", False, "Node zz does not exist")
+            self.test_command("REACHABLE tr a", False, "Usage: REACHABLE")
+            self.test_command("BUILD INDEX REACHABILITY nonexistent", False, "does not exist")
+            # Centrality
+            self.test_command("CREATE GRAPH pr DIRECTED", True, "Created graph 'pr'")
+            self.test_command("BULK ADD EDGES pr a:b b:c c:a d:c", True, "Added 4 edge(s)")
+            self.test_command("PAGERANK pr", True, "PageRank scores for graph 'pr' (4 of 4 node(s))")
+            self.test_command("PAGERANK pr TOP 1", True, "c: 0.3326")
+            self.test_command("PAGERANK pr ITER 1", True, "Did not converge within 1 iteration(s)")
+            self.test_command("PAGERANK pr TOL 1e-9 TOP 2", True, "(2 of 4 node(s))")
+            self.test_command("CENTRALITY pr DEGREE TOP 1", True, "c: 1")
+            self.test_command("CENTRALITY pr eigenvector", True, "Eigenvector centrality scores")
+            self.test_command("ADD EDGE pr d a", True, "Added edge from 'd' to 'a'")
+            self.test_command("PAGERANK pr TOP 1", True, "a: 0.3264")
+            self.test_command("PAGERANK pr TOL 0", False, "Usage: PAGERANK")
+            self.test_command("PAGERANK pr TOP", False, "Usage: PAGERANK")
+            self.test_command("CENTRALITY pr CLOSENESS", False, "Usage: CENTRALITY")
+            self.test_command("PAGERANK nonexistent", False, "does not exist")
+            view = self.cli.service.graph_view("pr")
+            fallback = top_scores(pagerank(view, None, 100, 1e-9)[0])
+            vectorized = top_scores(pagerank(view, EdgeArrays(view) if HAS_NUMPY else None, 100, 1e-9)[0])
+            if [node for node, _ in fallback] == [node for node, _ in vectorized] and all(
+                    abs(score1 - score2) < 1e-9 for (_, score1), (_, score2) in zip(fallback, vectorized)):
+                print("✓ Vectorized and pure-Python PageRank agree")
+                self.test_results.append(True)
+            else:
+                print(f"✗ Vectorized and pure-Python PageRank differ: {vectorized} vs {fallback}")
+                self.test_results.append(False)
+            # Betweenness centrality
+            self.test_command("CREATE GRAPH bt", True, "Created graph 'bt'")
+            self.test_command("BULK ADD EDGES bt a:b b:c c:d d:e b:f", True, "Added 5 edge(s)")
+            self.test_command("BETWEENNESS bt", True, "b: 0.7")
+            self.test_command("BETWEENNESS bt TOP 2", True, "(2 of 6 node(s))")
+            self.test_command("BETWEENNESS bt WORKERS 2 TOP 2", True, "c: 0.6")
+            self.test_command("BETWEENNESS bt WORKERS 2", True, "Searched from 6 of 6 source node(s) with 2 worker(s)")
+            self.test_command("BETWEENNESS bt SAMPLE 3", True, "Searched from 3 of 6 source node(s)")
+            self.test_command("BETWEENNESS pr TOP 1", True, "Betweenness centrality scores for graph 'pr'")
+            self.test_command("BETWEENNESS bt WORKERS 0", False, "Usage: BETWEENNESS")
+            self.test_command("BETWEENNESS nonexistent", False, "does not exist")
+            self.test_command("CREATE GRAPH bz DIRECTED WEIGHTED", True, "Created graph 'bz'")
+            self.test_command("BULK ADD EDGES bz n3:n1:0 n3:n4:0 n4:n1:0", True, "Added 3 edge(s)")
+            self.test_command("BETWEENNESS bz", True, "n4: 0.25")
+            self.test_command("ADD EDGE bz n1 n3 0", True, "Added edge from 'n1' to 'n3'")
+            self.test_command("BETWEENNESS bz", False, "cycle of zero-weight edges")
+            # Triangles and clustering
+            self.test_command("CREATE GRAPH tg", True, "Created graph 'tg'")
+            self.test_command("BULK ADD EDGES tg a:b b:c c:a c:d d:a d:e", True, "Added 6 edge(s)")
+            self.test_command("TRIANGLES tg", True, "Graph 'tg' has 2 triangle(s) over 5 node(s)")
+            self.test_command("CLUSTERING tg", True, "Average clustering coefficient of graph 'tg': 0.533333")
+            self.test_command("CLUSTERING tg a", True, "'a' in graph 'tg': 0.666667 (2 triangle(s))")
+            self.test_command("CLUSTERING tg e", True, "'e' in graph 'tg': 0 (0 triangle(s))")
+            self.test_command("ADD EDGE tg b d", True, "Added edge")
+            self.test_command("TRIANGLES tg", True, "has 4 triangle(s)")
+            self.test_command("CREATE GRAPH td DIRECTED", True, "Created graph 'td'")
+            self.test_command("BULK ADD EDGES td a:b b:c c:a a:c", True, "Added 4 edge(s)")
+            self.test_command("TRIANGLES td", True, "has 1 triangle(s) over 3 node(s) (edge directions ignored)")
+            self.test_command("CLUSTERING td a", True, "'a' in graph 'td': 0.5 (1 triangle(s))")
+            self.test_command("CLUSTERING tg zz", False, "Node zz does not exist")
+            self.test_command("TRIANGLES tg a", False, "Usage: TRIANGLES")
+            self.test_command("CLUSTERING nonexistent", False, "does not exist")
+            # Neighbor similarity
+            self.test_command("CREATE GRAPH sm", True, "Created graph 'sm'")
+            self.test_command("BULK ADD EDGES sm a:x a:y a:z b:x b:y c:x d:z e:q", True, "Added 8 edge(s)")
+            self.test_command("SIMILAR sm a", True, "b: 0.666667 (2 common neighbor(s))")
+            self.test_command("SIMILAR sm a METRIC common TOP 1", True, "by COMMON (1 found)")
+            self.test_command("SIMILAR sm a b METRIC adamic_adar", True, "Scored similar nodes for 2 source node(s)")
+            self.test_command("SIMILAR sm b METRIC adamic_adar", True, "a: 2.35293")
+            self.test_command("SIMILAR sm e", True, "(0 found)")
+            self.test_command("CREATE GRAPH sw WEIGHTED", True, "Created graph 'sw'")
+            self.test_command("BULK ADD EDGES sw a:x:1 a:x:2 b:x:5", True, "Added 3 edge(s)")
+            self.test_command("SIMILAR sw a METRIC jaccard", True, "b: 1 (1 common neighbor(s))")
+            self.test_command("SIMILAR sw a METRIC common", True, "b: 1 (1 common neighbor(s))")
+            self.test_command("SIMILAR tr a TOP 2", True, "Nodes most similar to 'a' in graph 'tr'")
+            self.test_command("SIMILAR sm METRIC jaccard", False, "Usage: SIMILAR")
+            self.test_command("SIMILAR sm a METRIC cosine", False, "Usage: SIMILAR")
+            self.test_command("SIMILAR sm zz", False, "Node zz does not exist")
+            # Random walks
+            walks_file = os.path.join(self.temp_dir, "walks.txt")
+            parallel_walks_file = os.path.join(self.temp_dir, "walks2.txt")
+            self.test_command("CREATE GRAPH rw WEIGHTED", True, "Created graph 'rw'")
+            self.test_command("BULK ADD EDGES rw a:b:1 b:c:2 c:a:3 c:d:1", True, "Added 4 edge(s)")
+            self.test_command(f"RANDOM WALKS rw NUM 300 LENGTH 6 P 0.5 Q 2 SEED 7 TO {walks_file}", True,
+                              "Wrote 1200 walk(s) of up to 6 node(s) from graph 'rw'")
+            self.test_command(f"RANDOM WALKS rw NUM 300 LENGTH 6 P 0.5 Q 2 SEED 7 WORKERS 2 TO {parallel_walks_file}",
+                              True, "(seed 7)")
+            with open(walks_file) as f1, open(parallel_walks_file) as f2:
+                walks = f1.read().splitlines()
+                parallel_walks = f2.read()
+            if walks and "\n".join(walks) + "\n" == parallel_walks and all(
+                    len(walk.split()) == 6 and walk.split()[0] == "abcd"[index % 4] for index, walk in enumerate(walks)):
+                print("✓ Random walks with a seed are the same with and without workers")
+                self.test_results.append(True)
+            else:
+                print(f"✗ Random walks differ between runs or are malformed: {walks[:4]}")
+                self.test_results.append(False)
+            self.test_command(f"RANDOM WALKS tr NUM 1 LENGTH 3 TO {walks_file}", True, "Wrote 8 walk(s)")
+            self.test_command("RANDOM WALKS rw NUM 2 LENGTH 5", False, "Usage: RANDOM WALKS")
+            self.test_command(f"RANDOM WALKS rw NUM 0 LENGTH 5 TO {walks_file}", False, "Usage: RANDOM WALKS")
+            self.test_command(f"RANDOM WALKS rw NUM 1 LENGTH 5 Q -1 TO {walks_file}", False, "Usage: RANDOM WALKS")
+            self.test_command(f"RANDOM WALKS nonexistent NUM 1 LENGTH 5 TO {walks_file}", False, "does not exist")
+            # Landmark distance index
+            self.test_command("BUILD INDEX DISTANCE sp LANDMARKS 2", True, "2 landmark(s) over 5 node(s)")
+            self.test_command("SHORTEST PATH sp a d ALGORITHM astar", True, "a -> b -> d")
+            self.test_command("SHORTEST PATH sp e d", True, "cost 7, 3 hop(s)")
+            self.test_command("SHORTEST PATH sp e d MAXCOST 6", True, "within cost 6")
+            self.test_command("SHORTEST PATH sp d e", True, "No path from 'd' to 'e'")
+            self.test_command("ADD EDGE sp a d 1", True, "Added edge from 'a' to 'd'")
+            self.test_command("SHORTEST PATH sp a d ALGORITHM astar", False, "no current distance index")
+            self.test_command("SHORTEST PATH sp e d", True, "e -> a -> d")
+            self.test_command("BUILD INDEX DISTANCE spu", True, "4 landmark(s) over 4 node(s)")
+            self.test_command("SHORTEST PATH spu d a", True, "d -> c -> b -> a")
+            self.test_command("BUILD INDEX DISTANCE sp LANDMARKS 0", False, "Usage: BUILD INDEX DISTANCE")
+            self.test_command("BUILD INDEX DISTANCE nonexistent", False, "does not exist")
+            self.test_command("BUILD INDEX DISTANCE sp", True, "5 landmark(s)")
+            self.test_command("CHECKPOINT", True, "Checkpoint complete")
+            restored = GraphRepository(load_from_disk=True)
+            restored.close()
+            restored_path = GraphService(restored).shortest_path("sp", "e", "d", "ASTAR")
+            if restored_path == (2, ["e", "a", "d"]):
+                print("✓ Distance index is restored with the graph's snapshot")
+                self.test_results.append(True)
+            else:
+                print(f"✗ Distance index was not restored: {restored_path}")
+                self.test_results.append(False)
             # Delete a node from a graph with only one node
             self.test_command("CREATE GRAPH g7", True, "Created graph 'g7'")
             self.test_command("ADD NODE g7 solo", True, "Added node 'solo'")
@@ -4,4 +4,25 @@ from dotenv import load_dotenv
 load_dotenv()
 
 def get_save_file_path() -> str:
-    return os.getenv('SAVE_FILE_PATH', '/Users/graphs.json') 
\ No newline at end of file
+    return os.getenv('SAVE_FILE_PATH', '/Users/graphs.json')
+
+def get_snapshot_dir() -> str:
+    return os.getenv('SNAPSHOT_DIR') or f"{get_save_file_path()}.d"
+
+def get_snapshot_format() -> str:
+    return os.getenv('SNAPSHOT_FORMAT', 'json').lower()
+
+def get_wal_file_path() -> str:
+    return os.getenv('WAL_FILE_PATH') or f"{get_save_file_path()}.wal"
+
+def get_wal_sync_batch() -> int:
+    return int(os.getenv('WAL_SYNC_BATCH', '64'))
+
+def get_wal_sync_interval() -> float:
+    return float(os.getenv('WAL_SYNC_INTERVAL_SECONDS', '1.0'))
+
+def get_checkpoint_interval() -> float:
+    return float(os.getenv('CHECKPOINT_INTERVAL_SECONDS', '300'))
+
+def get_checkpoint_dirty_records() -> int:
+    return int(os.getenv('CHECKPOINT_DIRTY_RECORDS', '100000'))
@@ -1,6 +1,16 @@
-from utils.config import get_save_file_path
+from utils.config import (
+    get_save_file_path, get_snapshot_dir, get_snapshot_format, get_wal_file_path, get_wal_sync_batch,
+    get_wal_sync_interval, get_checkpoint_interval, get_checkpoint_dirty_records
+)
 
 save_file_path: str = get_save_file_path()
+snapshot_dir: str = get_snapshot_dir()
+snapshot_format: str = get_snapshot_format()
+wal_file_path: str = get_wal_file_path()
+wal_sync_batch: int = get_wal_sync_batch()
+wal_sync_interval: float = get_wal_sync_interval()
+checkpoint_interval: float = get_checkpoint_interval()
+checkpoint_dirty_records: int = get_checkpoint_dirty_records()
 
 error_message_invalid_input = "Invalid input"
 
@@ -21,10 +31,45 @@ LIST_EDGES_CMD = "LIST EDGES"
 DESCRIBE_GRAPH_CMD = "DESCRIBE GRAPH"
 LOAD_GRAPH_CMD = "LOAD GRAPH"
 SAVE_GRAPH_CMD = "SAVE GRAPH"
+BULK_ADD_NODES_CMD = "BULK ADD NODES"
+BULK_ADD_EDGES_CMD = "BULK ADD EDGES"
+CHECKPOINT_CMD = "CHECKPOINT"
+CHECKPOINT_STATUS_CMD = "CHECKPOINT STATUS"
+EXEC_CMD = "EXEC"
+LOCK_STATS_CMD = "LOCK STATS"
+SHORTEST_PATH_CMD = "SHORTEST PATH"
+BUILD_DISTANCE_INDEX_CMD = "BUILD INDEX DISTANCE"
+BUILD_REACHABILITY_INDEX_CMD = "BUILD INDEX REACHABILITY"
+REACHABLE_CMD = "REACHABLE"
+TRAVERSE_CMD = "TRAVERSE"
+NEIGHBORS_CMD = "NEIGHBORS"
+COMPONENTS_CMD = "COMPONENTS"
+CONNECTED_CMD = "CONNECTED"
+PAGERANK_CMD = "PAGERANK"
+CENTRALITY_CMD = "CENTRALITY"
+BETWEENNESS_CMD = "BETWEENNESS"
+TRIANGLES_CMD = "TRIANGLES"
+CLUSTERING_CMD = "CLUSTERING"
+SIMILAR_CMD = "SIMILAR"
+RANDOM_WALKS_CMD = "RANDOM WALKS"
 HELP_CMD = "HELP"
 EXIT_CMD = "EXIT"
 CLEAR_CMD = "CLEAR"
 
+PATH_ALGORITHMS = ("BFS", "DIJKSTRA", "BIDIRECTIONAL", "ASTAR")
+DEFAULT_LANDMARKS = 16
+TRAVERSAL_ORDERS = ("BFS", "DFS")
+CENTRALITY_MEASURES = ("DEGREE", "EIGENVECTOR")
+SIMILARITY_METRICS = ("JACCARD", "COMMON", "ADAMIC_ADAR")
+DEFAULT_SIMILAR = 10
+MEASURE_NAMES = {"PAGERANK": "PageRank", "DEGREE": "Degree centrality", "EIGENVECTOR": "Eigenvector centrality",
+                 "BETWEENNESS": "Betweenness centrality"}
+DEFAULT_ITERATIONS = 100
+DEFAULT_TOLERANCE = 1e-6
+
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 7379
+
 WELCOME_MESSAGE = "Welcome to GraphDBLite!"
 HELP_PROMPT = "Type 'HELP' for available commands or 'EXIT' to quit."
 GOODBYE_MESSAGE = "Goodbye!"
@@ -46,8 +91,53 @@ EDGE_REMOVED = "Removed edge from '{node1}' to '{node2}'{weight_text} in graph '
 GRAPH_LOADED = "Loaded graph from '{filename}'"
 NODE_REMOVED = "Removed node '{node}' from graph '{alias}'"
 GRAPH_SAVED = "Saved graph '{alias}' to '{filename}'"
+CHECKPOINT_DONE = "Checkpoint complete: {written} of {total} graph(s) rewritten, {records} log record(s) compacted"
+CHECKPOINT_STATUS_HEADER = "Checkpoint status:"
+CHECKPOINT_SCHEDULE = "  Background checkpoints: {state} (interval: {interval}, log record threshold: {records})"
+CHECKPOINT_TOTALS = "  Checkpoints: {count} ({background} in background), {failures} failed"
+CHECKPOINT_LAST = ("  Last checkpoint: {finished} ({trigger}), took {seconds:.3f} s, wrote {bytes} byte(s) "
+                   "for {written} of {graphs} graph(s), compacted {records} log record(s)")
+CHECKPOINT_NEVER = "  Last checkpoint: none"
+CHECKPOINT_LAST_FAILURE = "  Last failure: {message}"
+CHECKPOINT_PENDING = "  Pending log records: {pending}"
+NODES_BULK_ADDED = "Added {added} node(s) to graph '{alias}' ({skipped} already existed)"
+SCRIPT_EXECUTED = "Executed script '{filename}': {succeeded} command(s) succeeded"
+SCRIPT_FAILED = "Script '{filename}' had failures: {succeeded} command(s) succeeded, {failed} failed"
+SCRIPT_NOT_FOUND = "Script '{filename}' does not exist"
+SCRIPT_ALREADY_RUNNING = "Script '{filename}' is already running"
+EDGES_BULK_ADDED = "Added {added} edge(s) to graph '{alias}' ({created} new node(s), {duplicates} duplicate(s) skipped)"
+PATH_FOUND = "Shortest path from '{source}' to '{target}' in graph '{alias}': cost {cost}, {hops} hop(s)"
+NO_PATH_FOUND = "No path from '{source}' to '{target}' in graph '{alias}'"
+NO_PATH_WITHIN = "No path from '{source}' to '{target}' in graph '{alias}' within cost {max_cost}"
+TRAVERSAL_HEADER = "Traversal of graph '{alias}' from '{start}' ({order}):"
+TRAVERSAL_DONE = "Visited {count} node(s)"
+NEIGHBORS_HEADER = "Nodes within {hops} hop(s) of '{node}' in graph '{alias}':"
+NEIGHBORS_DONE = "Found {count} node(s) within {hops} hop(s) of '{node}'"
+COMPONENTS_FOUND = "Graph '{alias}' has {count} {kind} component(s) over {nodes} node(s)"
+NODES_CONNECTED = "'{node1}' and '{node2}' are {kind} in graph '{alias}'"
+NODES_NOT_CONNECTED = "'{node1}' and '{node2}' are not {kind} in graph '{alias}'"
+NODE_REACHABLE = "'{source}' can reach '{target}' in graph '{alias}'"
+NODE_NOT_REACHABLE = "'{source}' cannot reach '{target}' in graph '{alias}'"
+REACHABILITY_INDEX_BUILT = ("Built reachability index for graph '{alias}': {components} strongly connected "
+                            "component(s), {mode}, in {seconds:.3f} s")
+DISTANCE_INDEX_BUILT = ("Built distance index for graph '{alias}': {landmarks} landmark(s) over {nodes} node(s) "
+                        "in {seconds:.3f} s")
+SCORES_HEADER = "{measure} scores for graph '{alias}' ({count} of {nodes} node(s)):"
+SCORES_CONVERGED = "Converged after {iterations} iteration(s)"
+BETWEENNESS_DONE = "Searched from {sources} of {nodes} source node(s) with {workers} worker(s) in {seconds:.3f} s"
+TRIANGLES_FOUND = "Graph '{alias}' has {count} triangle(s) over {nodes} node(s){note}"
+NODE_CLUSTERING = "Clustering coefficient of '{node}' in graph '{alias}': {coefficient:.6g} ({triangles} triangle(s))"
+AVERAGE_CLUSTERING = "Average clustering coefficient of graph '{alias}': {coefficient:.6g} over {nodes} node(s)"
+SIMILAR_HEADER = "Nodes most similar to '{node}' in graph '{alias}' by {metric} ({count} found):"
+SIMILAR_DONE = "Scored similar nodes for {count} source node(s) in {seconds:.3f} s"
+RANDOM_WALKS_WRITTEN = ("Wrote {walks} walk(s) of up to {length} node(s) from graph '{alias}' to '{filename}' "
+                        "(seed {seed}) in {seconds:.3f} s")
+SCORES_NOT_CONVERGED = "Did not converge within {iterations} iteration(s); scores are approximate"
 
 AVAILABLE_GRAPHS = "Available graphs:"
+LOCK_STATS_HEADER = "Lock statistics:"
+LOCK_STATS_LINE = ("  - {name}: {reads} read(s), {writes} write(s), {contended_reads} contended read(s), "
+                   "{contended_writes} contended write(s), waited {wait_ms:.1f} ms (max {max_wait_ms:.1f} ms)")
 NODES_IN_GRAPH = "Nodes in graph '{alias}':"
 EDGES_IN_GRAPH = "Edges in graph '{alias}':"
 GRAPH_INFO = "Graph: {alias}"
@@ -56,13 +146,35 @@ WEIGHTED_INFO = "  Weighted: {weighted}"
 NODES_COUNT = "  Nodes: {count}"
 EDGES_COUNT = "  Edges: {count}"
 
-CREATE_GRAPH_USAGE = "Usage: CREATE GRAPH <alias> [DIRECTED] [WEIGHTED]"
+CREATE_GRAPH_USAGE = "Usage: CREATE GRAPH <alias> [DIRECTED] [WEIGHTED] [COMPACT]"
 LIST_NODES_USAGE = "Usage: LIST NODES <graph_alias>"
 LIST_EDGES_USAGE = "Usage: LIST EDGES <graph_alias> [node1] [node2]"
 DESCRIBE_GRAPH_USAGE = "Usage: DESCRIBE GRAPH <graph_alias>"
 LOAD_GRAPH_USAGE = "Usage: LOAD GRAPH <filename>"
 SAVE_GRAPH_USAGE = "Usage: SAVE GRAPH <graph_alias> <filename>"
 DEL_EDGE_USAGE = "Usage: DEL EDGE <graph_alias> <node1> <node2> [weight]"
+BULK_ADD_NODES_USAGE = "Usage: BULK ADD NODES <graph_alias> <node1> [node2 ...]"
+EXEC_USAGE = "Usage: EXEC <script_file> [CONTINUE]"
+SHORTEST_PATH_USAGE = ("Usage: SHORTEST PATH <graph_alias> <source> <target> "
+                       "[ALGORITHM BFS|DIJKSTRA|BIDIRECTIONAL|ASTAR] [MAXCOST <cost>]")
+TRAVERSE_USAGE = "Usage: TRAVERSE <graph_alias> <start> BFS|DFS [DEPTH <n>] [LIMIT <m>]"
+REACHABLE_USAGE = "Usage: REACHABLE <graph_alias> <source> <target>"
+BUILD_REACHABILITY_INDEX_USAGE = "Usage: BUILD INDEX REACHABILITY <graph_alias>"
+COMPONENTS_USAGE = "Usage: COMPONENTS <graph_alias>"
+CONNECTED_USAGE = "Usage: CONNECTED <graph_alias> <node1> <node2>"
+NEIGHBORS_USAGE = "Usage: NEIGHBORS <graph_alias> <node> [HOPS <k>]"
+PAGERANK_USAGE = "Usage: PAGERANK <graph_alias> [ITER <n>] [TOL <t>] [TOP <k>]"
+CENTRALITY_USAGE = "Usage: CENTRALITY <graph_alias> DEGREE|EIGENVECTOR [ITER <n>] [TOL <t>] [TOP <k>]"
+BETWEENNESS_USAGE = "Usage: BETWEENNESS <graph_alias> [SAMPLE <k>] [WORKERS <n>] [TOP <k>]"
+TRIANGLES_USAGE = "Usage: TRIANGLES <graph_alias>"
+CLUSTERING_USAGE = "Usage: CLUSTERING <graph_alias> [node]"
+SIMILAR_USAGE = ("Usage: SIMILAR <graph_alias> <node> [node ...] [METRIC JACCARD|COMMON|ADAMIC_ADAR] "
+                 "[TOP <k>]")
+RANDOM_WALKS_USAGE = ("Usage: RANDOM WALKS <graph_alias> NUM <n> LENGTH <l> [P <p>] [Q <q>] [SEED <s>] "
+                      "[WORKERS <w>] TO <filename>")
+BUILD_DISTANCE_INDEX_USAGE = "Usage: BUILD INDEX DISTANCE <graph_alias> [LANDMARKS <count>]"
+BULK_ADD_EDGES_USAGE = "Usage: BULK ADD EDGES <graph_alias> <node1>:<node2>[:weight] ... | BULK ADD EDGES <graph_alias> FROM <filename>"
+INVALID_EDGE_RECORD = "Invalid edge record {record!r}: expected <node1> <node2> [weight] with alphanumeric node names and a numeric weight"
 
 HELP_TEXT = """
 GraphDBLite - Lightweight Graph Database
@@ -71,7 +183,9 @@ Available Commands:
 ==================
 
 Graph Management:
-  CREATE GRAPH <alias> [DIRECTED] [WEIGHTED]  - Create a new graph
+  CREATE GRAPH <alias> [DIRECTED] [WEIGHTED] [COMPACT]
+                                              - Create a new graph (COMPACT uses
+                                                array-backed CSR storage)
   LIST GRAPHS                                 - List all graphs
   DESCRIBE GRAPH <alias>                      - Show graph properties
   LOAD GRAPH <filename>                       - Load graph from file
@@ -87,6 +201,78 @@ Edge Operations:
   DEL EDGE <graph_alias> <node1> <node2> [weight]  - Delete an edge
   LIST EDGES <graph_alias> [node1] [node2]         - List edges
 
+Queries:
+  SHORTEST PATH <graph_alias> <source> <target> [ALGORITHM BFS|DIJKSTRA|BIDIRECTIONAL|ASTAR]
+                [MAXCOST <cost>]               - Cheapest path between two nodes
+                                                 (BFS counts hops; default is ASTAR
+                                                 when the graph has a current distance
+                                                 index, otherwise BFS for unweighted
+                                                 graphs and bidirectional Dijkstra for
+                                                 weighted ones)
+  TRAVERSE <graph_alias> <start> BFS|DFS [DEPTH <n>] [LIMIT <m>]
+                                               - List the nodes reachable from start in
+                                                 BFS or DFS order, as they are found
+  NEIGHBORS <graph_alias> <node> [HOPS <k>]    - List the nodes within k edges (default
+                                                 1) of a node
+  COMPONENTS <graph_alias>                     - Count connected components (weakly
+                                                 connected for directed graphs)
+  CONNECTED <graph_alias> <node1> <node2>      - Check whether two nodes are in the same
+                                                 component
+  REACHABLE <graph_alias> <source> <target>    - Check whether a path leads from source
+                                                 to target
+  BUILD INDEX REACHABILITY <graph_alias>       - Index a directed graph's strongly
+                                                 connected components for REACHABLE;
+                                                 kept until the graph changes, then
+                                                 rebuilt by the next query
+  BUILD INDEX DISTANCE <graph_alias> [LANDMARKS <count>]
+                                               - Precompute landmark distances (default
+                                                 16) used as A* bounds until the graph
+                                                 next changes; saved by CHECKPOINT
+  PAGERANK <graph_alias> [ITER <n>] [TOL <t>] [TOP <k>]
+                                               - Rank nodes by PageRank (default 100
+                                                 iterations, tolerance 1e-6), highest
+                                                 first; TOP lists only the k best
+  CENTRALITY <graph_alias> DEGREE|EIGENVECTOR [ITER <n>] [TOL <t>] [TOP <k>]
+                                               - Rank nodes by degree or eigenvector
+                                                 centrality
+  BETWEENNESS <graph_alias> [SAMPLE <k>] [WORKERS <n>] [TOP <k>]
+                                               - Rank nodes by betweenness centrality,
+                                                 estimated from k random sources with
+                                                 SAMPLE, using n worker processes
+  TRIANGLES <graph_alias>                      - Count triangles (edge directions
+                                                 ignored)
+  CLUSTERING <graph_alias> [node]              - Clustering coefficient of a node, or
+                                                 the graph's average
+  SIMILAR <graph_alias> <node> [node ...] [METRIC JACCARD|COMMON|ADAMIC_ADAR] [TOP <k>]
+                                               - List the k nodes (default 10) sharing
+                                                 the most neighbors with each node,
+                                                 scored by the metric (default JACCARD)
+  RANDOM WALKS <graph_alias> NUM <n> LENGTH <l> [P <p>] [Q <q>] [SEED <s>] [WORKERS <w>] TO <filename>
+                                               - Write n weighted random walks of l nodes
+                                                 from every node to a file, one per line;
+                                                 P and Q bias them as in node2vec, and a
+                                                 SEED reproduces them
+
+Bulk Loading:
+  BULK ADD NODES <graph_alias> <node1> [node2 ...]            - Add many nodes
+  BULK ADD EDGES <graph_alias> <node1>:<node2>[:weight] ...   - Add many edges
+  BULK ADD EDGES <graph_alias> FROM <filename>                - Add edges from a
+                                                                file with one
+                                                                "node1 node2 [weight]"
+                                                                record per line
+
+Persistence:
+  CHECKPOINT                                   - Write a snapshot and compact the
+                                                 write-ahead log
+  CHECKPOINT STATUS                            - Show background checkpoint settings and
+                                                 the last checkpoint's duration and size
+  LOCK STATS                                   - Show lock acquisitions and contention
+
+Scripting:
+  EXEC <script_file> [CONTINUE]                - Run the commands in a file, one per
+                                                 line; stops at the first failure
+                                                 unless CONTINUE is given
+
 Utility:
   HELP                                         - Show this help
   CLEAR                                        - Clear screen
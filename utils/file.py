@@ -1,12 +1,26 @@
 import json
 import os
+from typing import Iterable, Iterator
 
 def write_json_to_file(data: dict, filename: str):
-    with open(filename, "w") as f:
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, "w") as f:
         json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_filename, filename)
 
     return
 
+def write_chunks_to_file(chunks: Iterable[bytes], filename: str):
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_filename, filename)
+
 def read_json_from_file(filename: str) -> dict:
     if not os.path.exists(filename):
         return {"graphs": []}
@@ -19,6 +33,11 @@ def read_json_from_file(filename: str) -> dict:
     except (json.JSONDecodeError, OSError):
         return {"graphs": []}
 
+def iter_file_lines(filename: str) -> Iterator[str]:
+    with open(filename, "r") as f:
+        for line in f:
+            yield line
+
 def read_file(filename: str) -> str:
     with open(filename, "r") as f:
         data = f.read()
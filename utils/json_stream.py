@@ -0,0 +1,125 @@
+import json
+from typing import Any, Iterator, Optional, TextIO
+
+WHITESPACE = " \t\n\r"
+# Characters that can continue a number cut off at the end of a chunk
+NUMBER_CHARACTERS = "0123456789.eE+-"
+
+
+class JsonStreamReader:
+    # Reads one JSON document incrementally. Objects and arrays are walked with
+    # iter_object / iter_array and everything below that is decoded with
+    # read_value, so only the element currently being decoded has to fit in
+    # the buffer. After iter_object yields a key (or iter_array yields), the
+    # caller must consume exactly one value before advancing the iterator.
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 16):
+        self.file = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> Optional[str]:
+        while True:
+            buffer = self.buffer
+            length = len(buffer)
+            position = self.position
+            while position < length and buffer[position] in WHITESPACE:
+                position += 1
+            self.position = position
+            if position < length:
+                return buffer[position]
+            if not self._fill():
+                return None
+
+    def _expect(self, expected: str) -> str:
+        character = self.peek()
+        if character is None:
+            raise ValueError("unexpected end of JSON input")
+        if character not in expected:
+            raise ValueError(f"expected one of {expected!r}, found {character!r}")
+        self.position += 1
+        return character
+
+    def read_value(self) -> Any:
+        if self.peek() is None:
+            raise ValueError("unexpected end of JSON input")
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"invalid JSON: {e.msg}") from e
+                self._fill()
+                continue
+            if self.eof or (end < len(self.buffer) and self.buffer[end] not in NUMBER_CHARACTERS):
+                self.position = end
+                return value
+            self._fill()
+
+    def iter_object(self) -> Iterator[str]:
+        self._expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ValueError("expected an object key")
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def iter_array(self) -> Iterator[None]:
+        self._expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield
+            if self._expect(",]") == "]":
+                return
+
+    def iter_values(self) -> Iterator[Any]:
+        # Same as reading every element of iter_array, with the common case of
+        # an element and its separator already in the buffer handled inline.
+        self._expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        decode = self.decoder.raw_decode
+        while True:
+            buffer = self.buffer
+            try:
+                value, end = decode(buffer, self.position)
+            except json.JSONDecodeError:
+                end = len(buffer)
+            if end + 2 < len(buffer) and buffer[end] not in NUMBER_CHARACTERS:
+                self.position = end
+            else:
+                value = self.read_value()
+                buffer = self.buffer
+                end = self.position
+            yield value
+            if end + 2 < len(buffer) and buffer[end] == ",":
+                if buffer[end + 1] not in WHITESPACE:
+                    self.position = end + 1
+                    continue
+                if buffer[end + 1] == " " and buffer[end + 2] not in WHITESPACE:
+                    self.position = end + 2
+                    continue
+            if self._expect(",]") == "]":
+                return
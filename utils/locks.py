@@ -0,0 +1,95 @@
+import threading
+import time
+
+
+class ReadWriteLock:
+    # Any number of readers or a single writer. A waiting writer keeps new
+    # readers out so a steady stream of readers cannot starve it. The lock is
+    # not reentrant: a thread holding it must not acquire it again.
+    def __init__(self):
+        self.mutex = threading.Lock()
+        self.condition = threading.Condition(self.mutex)
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+        self.reads = 0
+        self.writes = 0
+        self.contended_reads = 0
+        self.contended_writes = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _record_wait(self, started: float):
+        waited = time.perf_counter() - started
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def acquire_read(self):
+        with self.mutex:
+            if self.writer or self.waiting_writers:
+                started = time.perf_counter()
+                while self.writer or self.waiting_writers:
+                    self.condition.wait()
+                self.contended_reads += 1
+                self._record_wait(started)
+            self.readers += 1
+            self.reads += 1
+
+    def release_read(self):
+        with self.mutex:
+            self.readers -= 1
+            if self.readers == 0 and self.waiting_writers:
+                self.condition.notify_all()
+
+    def acquire_write(self):
+        with self.mutex:
+            if self.writer or self.readers:
+                started = time.perf_counter()
+                self.waiting_writers += 1
+                try:
+                    while self.writer or self.readers:
+                        self.condition.wait()
+                finally:
+                    self.waiting_writers -= 1
+                self.contended_writes += 1
+                self._record_wait(started)
+            self.writer = True
+            self.writes += 1
+
+    def release_write(self):
+        with self.mutex:
+            self.writer = False
+            self.condition.notify_all()
+
+    def read(self) -> "LockGuard":
+        return LockGuard(self.acquire_read, self.release_read)
+
+    def write(self) -> "LockGuard":
+        return LockGuard(self.acquire_write, self.release_write)
+
+    def stats(self) -> dict:
+        with self.mutex:
+            return {
+                "reads": self.reads,
+                "writes": self.writes,
+                "contended_reads": self.contended_reads,
+                "contended_writes": self.contended_writes,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "readers": self.readers,
+                "writer": self.writer
+            }
+
+
+class LockGuard:
+    __slots__ = ("acquire", "release")
+
+    def __init__(self, acquire, release):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
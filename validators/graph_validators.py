@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Callable, Union
 from utils.constants import (
     error_message_invalid_input,
     CREATE_GRAPH_USAGE,
@@ -8,6 +8,29 @@ from utils.constants import (
     LOAD_GRAPH_USAGE,
     SAVE_GRAPH_USAGE,
     DEL_EDGE_USAGE,
+    BULK_ADD_NODES_USAGE,
+    BULK_ADD_EDGES_USAGE,
+    EXEC_USAGE,
+    SHORTEST_PATH_USAGE,
+    BUILD_DISTANCE_INDEX_USAGE,
+    TRAVERSE_USAGE,
+    NEIGHBORS_USAGE,
+    COMPONENTS_USAGE,
+    CONNECTED_USAGE,
+    REACHABLE_USAGE,
+    BUILD_REACHABILITY_INDEX_USAGE,
+    PAGERANK_USAGE,
+    CENTRALITY_USAGE,
+    BETWEENNESS_USAGE,
+    TRIANGLES_USAGE,
+    CLUSTERING_USAGE,
+    SIMILAR_USAGE,
+    RANDOM_WALKS_USAGE,
+    SIMILARITY_METRICS,
+    TRAVERSAL_ORDERS,
+    CENTRALITY_MEASURES,
+    PATH_ALGORITHMS,
+    INVALID_EDGE_RECORD,
     correct_usage_message_delete_node
 )
 from utils.error import Error
@@ -42,7 +65,7 @@ def validate_create_graph(args: list[str]) -> Union[bool, Error]:
     if not args[0].isalnum():
         return Error(1, error_message_invalid_input)
     
-    valid_flags = {"DIRECTED", "WEIGHTED"}
+    valid_flags = {"DIRECTED", "WEIGHTED", "COMPACT"}
     for arg in args[1:]:
         if arg.upper() not in valid_flags:
             return Error(1, error_message_invalid_input)
@@ -125,3 +148,254 @@ def validate_save_graph(args: list[str]) -> Union[bool, Error]:
     return True
 
 
+
+
+def validate_bulk_add_nodes(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 2:
+        return Error(1, BULK_ADD_NODES_USAGE)
+
+    for arg in args:
+        if not arg.isalnum():
+            return Error(1, error_message_invalid_input)
+
+    return True
+
+def validate_bulk_add_edges(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 2:
+        return Error(1, BULK_ADD_EDGES_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    if args[1].upper() == "FROM":
+        if len(args) != 3 or not args[2].strip():
+            return Error(1, BULK_ADD_EDGES_USAGE)
+
+    return True
+
+def validate_edge_record(fields: list[str], is_weighted: bool) -> Union[bool, Error]:
+    if len(fields) < 2 or len(fields) > 3:
+        return Error(1, INVALID_EDGE_RECORD.format(record=" ".join(fields)))
+
+    if not fields[0].isalnum() or not fields[1].isalnum():
+        return Error(1, INVALID_EDGE_RECORD.format(record=" ".join(fields)))
+
+    if len(fields) == 3 and not fields[2].isnumeric():
+        return Error(1, INVALID_EDGE_RECORD.format(record=" ".join(fields)))
+
+    if is_weighted and len(fields) == 2:
+        return Error(1, "Weight is required for weighted graph")
+
+    return True
+
+def validate_exec(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 1 or len(args) > 2:
+        return Error(1, EXEC_USAGE)
+
+    if len(args) == 2 and args[1].upper() != "CONTINUE":
+        return Error(1, EXEC_USAGE)
+
+    return True
+
+def validate_options(args: list[str], options: dict[str, Callable[[str], bool]], usage: str) -> Union[bool, Error]:
+    # Trailing options are KEYWORD value pairs; each keyword may appear once
+    if len(args) % 2 != 0:
+        return Error(1, usage)
+
+    seen = set()
+    for keyword, value in zip(args[::2], args[1::2]):
+        check = options.get(keyword.upper())
+        if check is None or keyword.upper() in seen or not check(value):
+            return Error(1, usage)
+        seen.add(keyword.upper())
+
+    return True
+
+def validate_shortest_path(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 3:
+        return Error(1, SHORTEST_PATH_USAGE)
+
+    for arg in args[:3]:
+        if not arg.isalnum():
+            return Error(1, error_message_invalid_input)
+
+    return validate_options(args[3:], {
+        "ALGORITHM": lambda value: value.upper() in PATH_ALGORITHMS,
+        "MAXCOST": str.isnumeric
+    }, SHORTEST_PATH_USAGE)
+
+def validate_traverse(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 3 or args[2].upper() not in TRAVERSAL_ORDERS:
+        return Error(1, TRAVERSE_USAGE)
+
+    for arg in args[:2]:
+        if not arg.isalnum():
+            return Error(1, error_message_invalid_input)
+
+    return validate_options(args[3:], {
+        "DEPTH": str.isnumeric,
+        "LIMIT": str.isnumeric
+    }, TRAVERSE_USAGE)
+
+def validate_neighbors(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 2:
+        return Error(1, NEIGHBORS_USAGE)
+
+    for arg in args[:2]:
+        if not arg.isalnum():
+            return Error(1, error_message_invalid_input)
+
+    return validate_options(args[2:], {
+        "HOPS": lambda value: value.isnumeric() and int(value) > 0
+    }, NEIGHBORS_USAGE)
+
+def validate_components(args: list[str]) -> Union[bool, Error]:
+    if len(args) != 1:
+        return Error(1, COMPONENTS_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    return True
+
+def validate_connected(args: list[str]) -> Union[bool, Error]:
+    if len(args) != 3:
+        return Error(1, CONNECTED_USAGE)
+
+    for arg in args:
+        if not arg.isalnum():
+            return Error(1, error_message_invalid_input)
+
+    return True
+
+def validate_reachable(args: list[str]) -> Union[bool, Error]:
+    if len(args) != 3:
+        return Error(1, REACHABLE_USAGE)
+
+    for arg in args:
+        if not arg.isalnum():
+            return Error(1, error_message_invalid_input)
+
+    return True
+
+def validate_build_reachability_index(args: list[str]) -> Union[bool, Error]:
+    if len(args) != 1:
+        return Error(1, BUILD_REACHABILITY_INDEX_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    return True
+
+def validate_build_distance_index(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 1:
+        return Error(1, BUILD_DISTANCE_INDEX_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    return validate_options(args[1:], {
+        "LANDMARKS": lambda value: value.isnumeric() and int(value) > 0
+    }, BUILD_DISTANCE_INDEX_USAGE)
+
+def is_positive_number(value: str) -> bool:
+    # Accepts decimals and exponents such as 0.001 or 1e-6
+    try:
+        number = float(value)
+    except ValueError:
+        return False
+    return 0 < number < float("inf")
+
+def validate_ranking_options(args: list[str], usage: str) -> Union[bool, Error]:
+    return validate_options(args, {
+        "ITER": lambda value: value.isnumeric() and int(value) > 0,
+        "TOL": is_positive_number,
+        "TOP": lambda value: value.isnumeric() and int(value) > 0
+    }, usage)
+
+def validate_pagerank(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 1:
+        return Error(1, PAGERANK_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    return validate_ranking_options(args[1:], PAGERANK_USAGE)
+
+def validate_centrality(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 2 or args[1].upper() not in CENTRALITY_MEASURES:
+        return Error(1, CENTRALITY_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    return validate_ranking_options(args[2:], CENTRALITY_USAGE)
+
+def validate_betweenness(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 1:
+        return Error(1, BETWEENNESS_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    return validate_options(args[1:], {
+        "SAMPLE": lambda value: value.isnumeric() and int(value) > 0,
+        "WORKERS": lambda value: value.isnumeric() and int(value) > 0,
+        "TOP": lambda value: value.isnumeric() and int(value) > 0
+    }, BETWEENNESS_USAGE)
+
+def validate_triangles(args: list[str]) -> Union[bool, Error]:
+    if len(args) != 1:
+        return Error(1, TRIANGLES_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    return True
+
+def validate_clustering(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 1 or len(args) > 2:
+        return Error(1, CLUSTERING_USAGE)
+
+    for arg in args:
+        if not arg.isalnum():
+            return Error(1, error_message_invalid_input)
+
+    return True
+
+def validate_similar(args: list[str]) -> Union[bool, Error]:
+    # One or more node names come before the options
+    nodes_end = 1
+    while nodes_end < len(args) and args[nodes_end].upper() not in ("METRIC", "TOP"):
+        nodes_end += 1
+    if nodes_end < 2:
+        return Error(1, SIMILAR_USAGE)
+
+    for arg in args[:nodes_end]:
+        if not arg.isalnum():
+            return Error(1, error_message_invalid_input)
+
+    return validate_options(args[nodes_end:], {
+        "METRIC": lambda value: value.upper() in SIMILARITY_METRICS,
+        "TOP": lambda value: value.isnumeric() and int(value) > 0
+    }, SIMILAR_USAGE)
+
+def validate_random_walks(args: list[str]) -> Union[bool, Error]:
+    if len(args) < 1:
+        return Error(1, RANDOM_WALKS_USAGE)
+
+    if not args[0].isalnum():
+        return Error(1, error_message_invalid_input)
+
+    if not {"NUM", "LENGTH", "TO"} <= {keyword.upper() for keyword in args[1::2]}:
+        return Error(1, RANDOM_WALKS_USAGE)
+
+    return validate_options(args[1:], {
+        "NUM": lambda value: value.isnumeric() and int(value) > 0,
+        "LENGTH": lambda value: value.isnumeric() and int(value) > 0,
+        "P": is_positive_number,
+        "Q": is_positive_number,
+        "SEED": str.isnumeric,
+        "WORKERS": lambda value: value.isnumeric() and int(value) > 0,
+        "TO": lambda value: bool(value.strip())
+    }, RANDOM_WALKS_USAGE)